@@ -0,0 +1,136 @@
+"""Compare sort_by_expression with sort_by_array_expression.
+
+This must be run with hython.
+
+Usage: hython bench_sort_by_expression.py [--rows N] [--columns N]
+
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Python Imports
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "python")
+)
+
+# Houdini Toolbox Imports
+import ht.inline.api
+
+# Houdini Imports
+import hou
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def build_parser():
+    """Build the command line parser.
+
+    :return: The argument parser.
+    :rtype: argparse.ArgumentParser
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--columns", type=int, default=500)
+
+    return parser
+
+
+def build_sop(rows, columns):
+    """Build a SOP with a noisy grid of points to sort.
+
+    :param rows: The number of grid rows.
+    :type rows: int
+    :param columns: The number of grid columns.
+    :type columns: int
+    :return: The SOP node to sort the geometry of.
+    :rtype: hou.SopNode
+
+    """
+    container = hou.node("/obj").createNode("geo", "bench_sort_by_expression")
+
+    grid = container.createNode("grid")
+    grid.parm("rows").set(rows)
+    grid.parm("cols").set(columns)
+
+    mountain = grid.createOutputNode("mountain")
+
+    return mountain
+
+
+def time_sort(sop_node, func, expression):
+    """Time sorting a copy of the node's geometry.
+
+    :param sop_node: The node to sort the geometry of.
+    :type sop_node: hou.SopNode
+    :param func: The sort function.
+    :type func: callable
+    :param expression: The expression to sort by.
+    :type expression: str
+    :return: The sorting time in seconds and the sorted geometry.
+    :rtype: tuple(float, hou.Geometry)
+
+    """
+    geometry = hou.Geometry()
+    geometry.merge(sop_node.geometry())
+
+    start = time.time()
+
+    func(geometry, hou.geometryType.Points, expression)
+
+    return time.time() - start, geometry
+
+
+def main():
+    """Run the benchmark."""
+    args = build_parser().parse_args()
+
+    sop_node = build_sop(args.rows, args.columns)
+
+    # sort_by_expression evaluates the expression in the context of the
+    # current node.
+    hou.setPwd(sop_node)
+
+    num_points = len(sop_node.geometry().iterPoints())
+
+    print("Sorting {} points by height".format(num_points))
+
+    loop_time, loop_geometry = time_sort(
+        sop_node,
+        ht.inline.api.sort_by_expression,
+        "$TY"
+    )
+
+    print("sort_by_expression('$TY'): {:.3f}s".format(loop_time))
+
+    array_time, array_geometry = time_sort(
+        sop_node,
+        ht.inline.api.sort_by_array_expression,
+        "P[:, 1]"
+    )
+
+    print("sort_by_array_expression('P[:, 1]'): {:.3f}s".format(array_time))
+
+    print("Speedup: {:.1f}x".format(loop_time / array_time))
+
+    same = (
+        loop_geometry.pointFloatAttribValuesAsString("P") ==
+        array_geometry.pointFloatAttribValuesAsString("P")
+    )
+
+    print("Results match: {}".format(same))
+
+# =============================================================================
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Pick the fastest PointCloud backend for fixed radius queries.
+
+Each backend is built from uniformly scattered points and used to run a batch
+of radius queries.  The backend with the lowest combined build and query time
+is reported.
+
+Usage: python bench_backends.py [--points N] [--radius R] [--queries N]
+
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Python Imports
+import argparse
+
+# Benchmark Imports
+import common
+
+common.install_hou_stub()
+
+# Houdini Toolbox Imports
+from ht.geometry.pointcloud import PointCloud
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def build_parser():
+    """Build the command line parser.
+
+    :return: The argument parser.
+    :rtype: argparse.ArgumentParser
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+
+    parser.add_argument("--points", type=int, default=1000000)
+    parser.add_argument("--radius", type=float, default=0.01)
+    parser.add_argument("--queries", type=int, default=100000)
+    parser.add_argument("--leaf-size", type=int, default=16)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=["ckdtree", "grid"],
+        help="The backends to compare.  'kdtree' is much slower to build."
+    )
+
+    return parser
+
+
+def time_backend(backend, geometry, positions, radius, leaf_size):
+    """Time building a point cloud and running radius queries with it.
+
+    :param backend: The backend to time.
+    :type backend: str
+    :param geometry: The geometry to build the cloud from.
+    :type geometry: common.NumpyGeometry
+    :param positions: The query positions.
+    :type positions: numpy.ndarray
+    :param radius: The query radius.
+    :type radius: float
+    :param leaf_size: The tree leaf size.
+    :type leaf_size: int
+    :return: The build time, query time and the cloud size in bytes.
+    :rtype: tuple(float, float, int)
+
+    """
+    kwargs = {"backend": backend, "leaf_size": leaf_size}
+
+    # The grid is fastest when the cells match the search radius.
+    if backend == "grid":
+        kwargs["cell_size"] = radius
+
+    build_time, cloud = common.time_call(PointCloud, geometry, **kwargs)
+
+    query_time, _ = common.time_call(
+        cloud.find_all_close_point_numbers,
+        positions,
+        radius
+    )
+
+    return build_time, query_time, cloud.nbytes
+
+
+def main():
+    """Run the benchmark."""
+    args = build_parser().parse_args()
+
+    geometry = common.build_geometry(args.points)
+    positions = common.random_positions(args.queries, seed=1)
+
+    print(
+        "{} points, {} queries, radius {}".format(
+            args.points,
+            args.queries,
+            args.radius
+        )
+    )
+
+    results = {}
+
+    for backend in args.backends:
+        build_time, query_time, num_bytes = time_backend(
+            backend,
+            geometry,
+            positions,
+            args.radius,
+            args.leaf_size
+        )
+
+        results[backend] = build_time + query_time
+
+        print(
+            "{:>8}: build {:.3f}s, query {:.3f}s, {:.1f} MB".format(
+                backend,
+                build_time,
+                query_time,
+                num_bytes / (1024.0 * 1024.0)
+            )
+        )
+
+    fastest = min(results, key=results.get)
+
+    print("Fastest backend: {}".format(fastest))
+
+# =============================================================================
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""Measure PointCloud build and query scaling and write the results as JSON.
+
+For each point count the tree build time, memory use, single query latency and
+batch query throughput are measured for each backend.  Each measurement runs in
+a separate process so the reported peak memory only covers that run.  Results
+from different commits can be compared with --compare.
+
+Usage:
+    python bench_scaling.py --output results.json
+    python bench_scaling.py --output new.json --compare old.json
+
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Python Imports
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+import numpy
+
+# Benchmark Imports
+import common
+
+common.install_hou_stub()
+
+# Houdini Toolbox Imports
+from ht.geometry.pointcloud import PointCloud
+
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+# Point counts from 10^4 to 10^7.
+_DEFAULT_SIZES = [10 ** exponent for exponent in range(4, 8)]
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def build_parser():
+    """Build the command line parser.
+
+    :return: The argument parser.
+    :rtype: argparse.ArgumentParser
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+
+    parser.add_argument("--sizes", type=int, nargs="+", default=_DEFAULT_SIZES)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=["kdtree", "ckdtree", "grid"]
+    )
+    parser.add_argument("--queries", type=int, default=100000)
+    parser.add_argument("--single-queries", type=int, default=1000)
+    parser.add_argument("--num-points", type=int, default=8)
+    parser.add_argument("--output", help="The JSON file to write results to.")
+    parser.add_argument("--compare", help="A JSON results file to compare against.")
+
+    # Used internally to run a single measurement in a child process.
+    parser.add_argument(
+        "--run",
+        nargs=2,
+        metavar=("BACKEND", "POINTS"),
+        help=argparse.SUPPRESS
+    )
+
+    return parser
+
+
+def compare_results(results, baseline):
+    """Print the ratio of each measurement against a baseline.
+
+    Values above 1 mean the new results are slower or use more memory.
+
+    :param results: The new results.
+    :type results: dict
+    :param baseline: The results to compare against.
+    :type baseline: dict
+    :return:
+
+    """
+    baseline_runs = {
+        (run["backend"], run["points"]): run for run in baseline["runs"]
+    }
+
+    print("Compared to {}:".format(baseline.get("revision")))
+
+    for run in results["runs"]:
+        old_run = baseline_runs.get((run["backend"], run["points"]))
+
+        if old_run is None:
+            continue
+
+        ratios = []
+
+        for key in ("build_seconds", "nbytes", "single_query_seconds"):
+            ratios.append("{} x{:.2f}".format(key, run[key] / old_run[key]))
+
+        # Higher throughput is better so compare the inverse.
+        ratios.append(
+            "batch_seconds x{:.2f}".format(
+                old_run["batch_queries_per_second"] / run["batch_queries_per_second"]
+            )
+        )
+
+        print("{:>8} {:>9}: {}".format(run["backend"], run["points"], ", ".join(ratios)))
+
+
+def get_revision():
+    """Get the current git revision of the repository, if available.
+
+    :return: The revision hash.
+    :rtype: str|None
+
+    """
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=common.REPO_ROOT
+        ).decode("utf-8").strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(backend, num_points, args):
+    """Measure a single backend and point count.
+
+    :param backend: The backend to measure.
+    :type backend: str
+    :param num_points: The number of points to build the cloud from.
+    :type num_points: int
+    :param args: The parsed command line arguments.
+    :type args: argparse.Namespace
+    :return: The measurements.
+    :rtype: dict
+
+    """
+    geometry = common.build_geometry(num_points)
+
+    build_time, cloud = common.time_call(PointCloud, geometry, backend=backend)
+
+    positions = common.random_positions(args.queries, seed=1)
+
+    # Time individual queries to measure per-call overhead.
+    single_positions = positions[:args.single_queries]
+
+    start = time.time()
+
+    for position in single_positions:
+        cloud.find_nearest_point_numbers(position, args.num_points)
+
+    single_time = (time.time() - start) / len(single_positions)
+
+    batch_time, _ = common.time_call(
+        cloud.find_nearest_point_numbers,
+        positions,
+        args.num_points
+    )
+
+    return {
+        "backend": backend,
+        "batch_queries_per_second": args.queries / batch_time,
+        "build_seconds": build_time,
+        "nbytes": cloud.nbytes,
+        "peak_rss_bytes": common.get_peak_memory(),
+        "points": num_points,
+        "single_query_seconds": single_time,
+    }
+
+
+def run_benchmark_process(backend, num_points, args):
+    """Measure a single backend and point count in a new process.
+
+    The peak resident memory of a process never decreases so each measurement
+    is run separately to keep it from including earlier, larger runs.
+
+    :param backend: The backend to measure.
+    :type backend: str
+    :param num_points: The number of points to build the cloud from.
+    :type num_points: int
+    :param args: The parsed command line arguments.
+    :type args: argparse.Namespace
+    :return: The measurements.
+    :rtype: dict
+
+    """
+    command = [
+        sys.executable,
+        __file__,
+        "--run", backend, str(num_points),
+        "--queries", str(args.queries),
+        "--single-queries", str(args.single_queries),
+        "--num-points", str(args.num_points),
+    ]
+
+    output = subprocess.check_output(command)
+
+    return json.loads(output.decode("utf-8"))
+
+
+def main():
+    """Run the benchmarks."""
+    args = build_parser().parse_args()
+
+    if args.run:
+        backend, num_points = args.run
+
+        print(json.dumps(run_benchmark(backend, int(num_points), args)))
+
+        return
+
+    results = {
+        "numpy": numpy.__version__,
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "revision": get_revision(),
+        "runs": [],
+    }
+
+    for num_points in args.sizes:
+        for backend in args.backends:
+            run = run_benchmark_process(backend, num_points, args)
+
+            print(
+                "{:>8} {:>9}: build {:.3f}s, {:.1f} MB ({:.1f} MB peak), "
+                "single {:.1f}us, batch {:.0f} queries/s".format(
+                    backend,
+                    num_points,
+                    run["build_seconds"],
+                    run["nbytes"] / (1024.0 * 1024.0),
+                    run["peak_rss_bytes"] / (1024.0 * 1024.0),
+                    run["single_query_seconds"] * 1e6,
+                    run["batch_queries_per_second"]
+                )
+            )
+
+            results["runs"].append(run)
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=4, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as handle:
+            compare_results(results, json.load(handle))
+
+# =============================================================================
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Compare single threaded and multi-core PointCloud batch query throughput.
+
+Usage: python bench_workers.py [--points N] [--queries N] [--num-points K]
+
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Python Imports
+import argparse
+import multiprocessing
+
+# Benchmark Imports
+import common
+
+common.install_hou_stub()
+
+# Houdini Toolbox Imports
+from ht.geometry.pointcloud import PointCloud
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def build_parser():
+    """Build the command line parser.
+
+    :return: The argument parser.
+    :rtype: argparse.ArgumentParser
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+
+    parser.add_argument("--points", type=int, default=5000000)
+    parser.add_argument("--queries", type=int, default=1000000)
+    parser.add_argument("--num-points", type=int, default=8)
+    parser.add_argument("--radius", type=float, default=0.005)
+    parser.add_argument("--leaf-size", type=int, default=16)
+
+    return parser
+
+
+def main():
+    """Run the benchmark."""
+    args = build_parser().parse_args()
+
+    geometry = common.build_geometry(args.points)
+
+    build_time, cloud = common.time_call(
+        PointCloud,
+        geometry,
+        leaf_size=args.leaf_size,
+        backend="ckdtree"
+    )
+
+    print("Built {} point tree in {:.3f}s".format(args.points, build_time))
+
+    positions = common.random_positions(args.queries, seed=1)
+
+    num_cores = multiprocessing.cpu_count()
+
+    for workers in (1, -1):
+        label = "1 worker" if workers == 1 else "{} workers".format(num_cores)
+
+        elapsed, _ = common.time_call(
+            cloud.find_nearest_point_numbers,
+            positions,
+            args.num_points,
+            workers=workers
+        )
+
+        print(
+            "nearest {}: {:.3f}s ({:.0f} queries/s)".format(
+                label,
+                elapsed,
+                args.queries / elapsed
+            )
+        )
+
+        elapsed, _ = common.time_call(
+            cloud.find_all_close_point_numbers,
+            positions,
+            args.radius,
+            workers=workers
+        )
+
+        print(
+            "radius {}: {:.3f}s ({:.0f} queries/s)".format(
+                label,
+                elapsed,
+                args.queries / elapsed
+            )
+        )
+
+# =============================================================================
+
+if __name__ == "__main__":
+    main()
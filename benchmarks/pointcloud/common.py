@@ -0,0 +1,170 @@
+"""Shared helpers for the ht.geometry.pointcloud benchmarks.
+
+The benchmarks can be run with hython, or with a regular Python interpreter in
+which case a minimal stand-in for the hou module is installed so that
+ht.geometry.pointcloud can be imported.
+
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Python Imports
+import os
+import resource
+import sys
+import time
+import types
+
+import numpy
+
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+_PYTHON_ROOT = os.path.join(REPO_ROOT, "python")
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+class NumpyGeometry(object):
+    """A lightweight stand-in for hou.Geometry backed by a numpy array.
+
+    Only the methods used by ht.geometry.pointcloud are provided.
+
+    :param positions: An (N, 3) array of point positions.
+    :type positions: numpy.ndarray
+
+    """
+
+    def __init__(self, positions):
+        self._positions = numpy.ascontiguousarray(positions, dtype=numpy.float64)
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def globPoints(self, pattern):
+        raise NotImplementedError("Point patterns are not supported.")
+
+    def iterPoints(self):
+        return range(len(self._positions))
+
+    def pointFloatAttribValuesAsString(self, name, float_type=None):
+        if name != "P":
+            raise ValueError("Only 'P' is supported.")
+
+        hou = sys.modules["hou"]
+
+        if float_type == hou.numericData.Float64:
+            return self._positions.tobytes()
+
+        return self._positions.astype(numpy.float32).tobytes()
+
+    def sopNode(self):
+        return None
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def build_geometry(num_points, seed=0):
+    """Build geometry with points uniformly scattered in the unit cube.
+
+    :param num_points: The number of points to create.
+    :type num_points: int
+    :param seed: The random seed.
+    :type seed: int
+    :return: The stand-in geometry.
+    :rtype: NumpyGeometry
+
+    """
+    return NumpyGeometry(random_positions(num_points, seed))
+
+
+def get_peak_memory():
+    """Get the peak resident memory of the current process.
+
+    :return: The peak memory use, in bytes.
+    :rtype: int
+
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes while macOS reports bytes.
+    if sys.platform != "darwin":
+        peak *= 1024
+
+    return peak
+
+
+def install_hou_stub():
+    """Make 'hou' and 'ht' importable outside of Houdini.
+
+    If the real hou module can be imported nothing is installed.
+
+    :return: Whether or not the stand-in module was installed.
+    :rtype: bool
+
+    """
+    if _PYTHON_ROOT not in sys.path:
+        sys.path.insert(0, _PYTHON_ROOT)
+
+    try:
+        import hou  # pylint: disable=unused-variable
+
+    except ImportError:
+        pass
+
+    else:
+        return False
+
+    hou = types.ModuleType("hou")
+
+    class OperationFailed(Exception):
+        pass
+
+    class numericData(object):
+        Float32 = "Float32"
+        Float64 = "Float64"
+
+    hou.OperationFailed = OperationFailed
+    hou.numericData = numericData
+
+    sys.modules["hou"] = hou
+
+    return True
+
+
+def random_positions(num_points, seed=0):
+    """Generate random positions in the unit cube.
+
+    :param num_points: The number of positions to generate.
+    :type num_points: int
+    :param seed: The random seed.
+    :type seed: int
+    :return: An (N, 3) array of positions.
+    :rtype: numpy.ndarray
+
+    """
+    return numpy.random.RandomState(seed).random_sample((num_points, 3))
+
+
+def time_call(func, *args, **kwargs):
+    """Time a single call of a function.
+
+    :param func: The function to call.
+    :type func: callable
+    :return: The elapsed time in seconds and the result of the call.
+    :rtype: tuple(float, object)
+
+    """
+    start = time.time()
+
+    result = func(*args, **kwargs)
+
+    return time.time() - start, result
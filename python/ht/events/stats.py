@@ -323,3 +323,15 @@ def get_item_stats(matching_tags=None):
         return tuple(all_stats)
 
     return _get_matching_stats(all_stats, matching_tags)
+
+
+def get_stats_instances(stats_class):
+    """Get all the stats instances of a stats class.
+
+    :param stats_class: The stats class to get the instances of.
+    :type stats_class: type
+    :return: A tuple of stat objects.
+    :rtype: (HoudiniEventStats)
+
+    """
+    return tuple(_StatsMeta._instances.get(stats_class, {}).values())
@@ -5,12 +5,76 @@
 # =============================================================================
 
 # Python Imports
+from collections import OrderedDict
+import itertools
+import json
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 import numpy
-from scipy.spatial import KDTree
+import os
+import re
+import scipy
+from scipy.spatial import KDTree, cKDTree
+import struct
+
+# Houdini Toolbox Imports
+from ht.geometry.spatialhash import SpatialHashGrid
+
+# Reading group membership requires the inline C++ functions which may not be
+# available.
+try:
+    from ht.inline.api import group_membership_mask
+
+except ImportError:
+    group_membership_mask = None
 
 # Houdini Imports
 import hou
 
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+# Mapping between backend names and the tree classes that implement them.
+_BACKENDS = {
+    "ckdtree": cKDTree,
+    "grid": SpatialHashGrid,
+    "kdtree": KDTree,
+}
+
+# The default memory budget of the point cloud cache, in megabytes.  This can
+# be overridden by setting $HT_POINTCLOUD_CACHE_MB.
+_DEFAULT_CACHE_MB = 1024
+
+# Byte alignment of arrays stored in index files.
+_INDEX_FILE_ALIGNMENT = 64
+
+# Identifier written at the start of index files.
+_INDEX_FILE_MAGIC = b"HTPCIDX1"
+
+# Index file format version.
+_INDEX_FILE_VERSION = 1
+
+# Kernels available for attribute filtering.
+_FILTER_KERNELS = ("gaussian", "inverse", "uniform")
+
+# Smallest distance used when computing inverse distance weights so that
+# coincident points don't produce infinite weights.
+_MIN_FILTER_DISTANCE = 1e-8
+
+# Matches a single point number or point number range, eg. 5, 0-10 or 0-10:2.
+_POINT_RANGE_REGEX = re.compile(r"^(\d+)(?:-(\d+)(?::(\d+))?)?$")
+
+# Rough size in bytes of a single KDTree node object, used when estimating
+# the memory used by a tree.
+_TREE_NODE_BYTES = 128
+
+# Newer versions of scipy renamed the cKDTree 'n_jobs' arguments to 'workers'
+# and added them to ball queries.
+_SCIPY_HAS_WORKERS = tuple(
+    int(part) for part in re.findall(r"\d+", scipy.__version__)[:2]
+) >= (1, 6)
+
 # =============================================================================
 # CLASSES
 # =============================================================================
@@ -19,47 +83,64 @@ import hou
 class PointCloud(object):
     """A wrapper around scipy.spatial.KDTree to represent point positions.
 
+    The 'kdtree' backend uses scipy.spatial.KDTree and the 'ckdtree' backend
+    uses the compiled scipy.spatial.cKDTree, which supports running batch
+    queries with multiple workers.  The 'grid' backend uses a
+    ht.geometry.spatialhash.SpatialHashGrid which is faster to build and
+    query for fixed radius searches of roughly uniform points.  The grid
+    cell_size defaults to one giving about leaf_size points per cell.
+
+    The pattern can be a point pattern string, a hou.PointGroup or an array of
+    point numbers.  Point groups are read as a membership buffer and simple
+    numeric patterns such as '0-10:2 15' are expanded directly; any other
+    pattern is evaluated with hou.Geometry.globPoints().
+
+    Positions are read as 64 bit floats by default.  Passing
+    double_precision=False reads 32 bit floats, which halves the memory used
+    by the 'grid' backend.  The scipy trees always store their data as 64 bit
+    floats so there is no benefit to single precision with them.
+
     """
 
-    def __init__(self, geometry, pattern=None, leaf_size=10):
+    def __init__(self, geometry, pattern=None, leaf_size=10, double_precision=True,
+                 backend="kdtree", cell_size=None):
+        if backend not in _BACKENDS:
+            raise ValueError("Invalid backend: {}".format(backend))
+
         # The source geometry. We need this to be able to glob points.
         self._geometry = geometry
 
-        # Don't create a point map by default.
-        self._point_map = None
-
-        if pattern:
-            # Get a list of the points we want to build the tree from.
-            group_points = geometry.globPoints(pattern)
+        self._backend = backend
 
-            # Create a list of all the positions of those points.
-            positions = [point.position() for point in group_points]
+        # Get all the point positions as an (N, 3) array read directly from
+        # the attribute data.
+        positions = _get_point_positions(geometry, double_precision)
 
-            # Create a map of the point numbers.  We need to do this because
-            # when returning results from queries, it only returns the index
-            # numbers. We then use those indexes to get the real point number
-            # from the point map.
-            self._point_map = [point.number() for point in group_points]
+        # Create a map of the point numbers if we are using a subset of the
+        # points.  We need to do this because when returning results from
+        # queries, it only returns the index numbers. We then use those
+        # indexes to get the real point number from the point map.
+        self._point_map = _get_pattern_point_numbers(
+            geometry,
+            pattern,
+            len(positions)
+        )
 
-            # Build our data array. Since it was created from a list of
-            # hou.Vector3's (tuples) we don't need to reshape.
-            data = numpy.array(positions)
-
-            self._num_elements = len(group_points)
+        if self._point_map is not None:
+            # Extract the positions of the points we care about.
+            data = positions[self._point_map]
 
         else:
-            # Get the point positions as a giant list.
-            positions = geometry.pointFloatAttribValues("P")
-
-            # Convert the list of positions to a numpy array and reshape it to
-            # represent 3 component entries.
-            num_points = len(geometry.iterPoints())
-            data = numpy.array(positions).reshape((num_points, 3))
+            data = positions
 
-            self._num_elements = num_points
+        self._num_elements = len(data)
 
         # Build the tree from the data.
-        self._tree = KDTree(data, leaf_size)
+        if backend == "grid":
+            self._tree = SpatialHashGrid(data, leaf_size, cell_size)
+
+        else:
+            self._tree = _BACKENDS[backend](data, leaf_size)
 
     # =========================================================================
     # SPECIAL METHODS
@@ -72,10 +153,85 @@ class PointCloud(object):
         else:
             return "<PointCloud>"
 
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def nbytes(self):
+        """int: The approximate number of bytes used by the point cloud."""
+        num_bytes = 0
+
+        if self._point_map is not None:
+            num_bytes += self._point_map.nbytes
+
+        if isinstance(self._tree, SpatialHashGrid):
+            return num_bytes + self._tree.nbytes
+
+        num_bytes += self._tree.data.nbytes
+
+        # Each point is referenced by an index in a leaf node and there are
+        # roughly twice as many nodes as there are leaves.
+        num_leaves = self._num_elements // self._tree.leafsize + 1
+        num_bytes += self._num_elements * numpy.dtype(int).itemsize
+        num_bytes += 2 * num_leaves * _TREE_NODE_BYTES
+
+        return num_bytes
+
+    @property
+    def point_numbers(self):
+        """numpy.ndarray: The point number of each element in the cloud."""
+        if self._point_map is not None:
+            return self._point_map
+
+        return numpy.arange(self._num_elements)
+
     # =========================================================================
     # NON-PUBLIC METHODS
     # =========================================================================
 
+    def _get_num_workers(self, workers):
+        """Get the number of workers a query can actually use.
+
+        Only the compiled tree supports multiple workers.  A value of -1 means
+        to use all available cores.
+
+        :param workers: The requested number of workers.
+        :type workers: int
+        :return: The number of workers to use.
+        :rtype: int
+
+        """
+        if not isinstance(self._tree, cKDTree):
+            return 1
+
+        if workers == -1:
+            return multiprocessing.cpu_count()
+
+        if workers < 1:
+            raise ValueError("Invalid number of workers: {}".format(workers))
+
+        return workers
+
+    def _get_point_numbers(self, indexes):
+        """Convert tree indexes to point numbers.
+
+        Any negative indexes, used to represent missing results, are preserved.
+
+        :param indexes: An array of tree indexes.
+        :type indexes: numpy.ndarray
+        :return: An array of matching point numbers.
+        :rtype: numpy.ndarray
+
+        """
+        indexes = numpy.asarray(indexes, dtype=int)
+
+        # Without a point map the tree indexes are the point numbers.
+        if self._point_map is None:
+            return indexes
+
+        return numpy.where(indexes < 0, -1, self._point_map[indexes])
+
     def _get_result_points(self, indexes):
         """This method converts a list of integers into corresponding hou.Point
         objects belonging to the geometry depending on whether a point map is
@@ -89,7 +245,7 @@ class PointCloud(object):
         """
         # If we have a point map set up we need to index into that and then
         # convert to string.
-        if self._point_map:
+        if self._point_map is not None:
             pattern = " ".join(
                 [str(self._point_map[index]) for index in indexes]
             )
@@ -107,39 +263,474 @@ class PointCloud(object):
         except hou.OperationFailed:
             return ()
 
+    def _query_ball_indexes(self, positions, maxdist, workers=1, maxpoints=None,
+                            eps=0):
+        """Find the tree indexes of all points within maxdist of each position.
+
+        :param positions: An (N, 3) array of search positions.
+        :type positions: numpy.ndarray
+        :param maxdist: The maximum distance to search.
+        :type maxdist: float
+        :param workers: The number of workers to query with.
+        :type workers: int
+        :param maxpoints: The maximum number of closest points to find.
+        :type maxpoints: int
+        :param eps: The approximate search tolerance.
+        :type eps: float
+        :return: The row offsets, tree indexes and distances.
+        :rtype: tuple(numpy.ndarray)
+
+        """
+        if maxpoints is not None:
+            return self._query_bounded_ball_indexes(
+                positions,
+                maxdist,
+                workers,
+                maxpoints,
+                eps
+            )
+
+        # The grid produces the compressed results directly.
+        if isinstance(self._tree, SpatialHashGrid):
+            return self._tree.query_radius(positions, maxdist)
+
+        workers = self._get_num_workers(workers)
+
+        if workers == 1:
+            result = self._tree.query_ball_point(positions, maxdist, eps=eps)
+
+        elif _SCIPY_HAS_WORKERS:
+            result = self._tree.query_ball_point(
+                positions,
+                maxdist,
+                eps=eps,
+                workers=workers
+            )
+
+        # Older versions of cKDTree can't run ball queries in parallel
+        # themselves, but they do release the GIL so the positions can be
+        # split between threads.
+        else:
+            chunks = numpy.array_split(positions, workers)
+
+            pool = ThreadPool(workers)
+
+            try:
+                results = pool.map(
+                    lambda chunk: self._tree.query_ball_point(
+                        chunk,
+                        maxdist,
+                        eps=eps
+                    ),
+                    chunks
+                )
+
+            finally:
+                pool.close()
+
+            result = list(itertools.chain.from_iterable(results))
+
+        counts = numpy.fromiter(
+            (len(indexes) for indexes in result),
+            dtype=int,
+            count=len(result)
+        )
+
+        # Build the row offsets so that the results for position i are
+        # indexes[offsets[i]:offsets[i+1]].
+        offsets = numpy.zeros(len(result) + 1, dtype=int)
+        numpy.cumsum(counts, out=offsets[1:])
+
+        indexes = numpy.fromiter(
+            itertools.chain.from_iterable(result),
+            dtype=int,
+            count=offsets[-1]
+        )
+
+        # The tree doesn't return distances for ball queries so compute them
+        # all at once.
+        deltas = self._tree.data[indexes] - numpy.repeat(positions, counts, axis=0)
+        distances = numpy.sqrt(numpy.einsum("ij,ij->i", deltas, deltas))
+
+        return offsets, indexes, distances
+
+    def _query_bounded_ball_indexes(self, positions, maxdist, workers, maxpoints,
+                                    eps):
+        """Find the tree indexes of the closest maxpoints points within maxdist.
+
+        Rather than finding every point within maxdist and truncating, only the
+        closest maxpoints points are searched for so the work and memory per
+        position are bounded.
+
+        :param positions: An (N, 3) array of search positions.
+        :type positions: numpy.ndarray
+        :param maxdist: The maximum distance to search.
+        :type maxdist: float
+        :param workers: The number of workers to query with.
+        :type workers: int
+        :param maxpoints: The maximum number of closest points to find.
+        :type maxpoints: int
+        :param eps: The approximate search tolerance.
+        :type eps: float
+        :return: The row offsets, tree indexes and distances.
+        :rtype: tuple(numpy.ndarray)
+
+        """
+        if maxpoints < 1:
+            raise ValueError("Invalid number of points: {}".format(maxpoints))
+
+        offsets = numpy.zeros(len(positions) + 1, dtype=int)
+
+        num_points = min(maxpoints, self._num_elements)
+
+        if not num_points:
+            return offsets, numpy.zeros(0, dtype=int), numpy.zeros(0)
+
+        # Ball queries include points at exactly maxdist, while nearest point
+        # queries exclude them.
+        distances, indexes = self._query_nearest_indexes(
+            positions,
+            num_points,
+            numpy.nextafter(maxdist, numpy.inf),
+            workers,
+            eps
+        )
+
+        valid = indexes >= 0
+
+        numpy.cumsum(valid.sum(axis=1), out=offsets[1:])
+
+        return offsets, indexes[valid], distances[valid]
+
+    def _query_nearest_indexes(self, positions, num_points, maxdist=None, workers=1,
+                               eps=0):
+        """Find the tree indexes of the closest points to each position.
+
+        Missing results have an index of -1 and an infinite distance.
+
+        :param positions: An (N, 3) array of search positions.
+        :type positions: numpy.ndarray
+        :param num_points: The number of points to search for.
+        :type num_points: int
+        :param maxdist: The maximum distance to search.
+        :type maxdist: float
+        :param workers: The number of workers to query with.
+        :type workers: int
+        :param eps: The approximate search tolerance.
+        :type eps: float
+        :return: (N, num_points) arrays of distances and tree indexes.
+        :rtype: tuple(numpy.ndarray)
+
+        """
+        upper_bound = numpy.inf if maxdist is None else maxdist
+
+        kwargs = {}
+
+        if eps:
+            kwargs["eps"] = eps
+
+        workers = self._get_num_workers(workers)
+
+        if workers != 1:
+            if _SCIPY_HAS_WORKERS:
+                kwargs["workers"] = workers
+
+            else:
+                kwargs["n_jobs"] = workers
+
+        distances, indexes = self._tree.query(
+            positions,
+            num_points,
+            distance_upper_bound=upper_bound,
+            **kwargs
+        )
+
+        # Single point queries return 1D results so make sure we always have
+        # one row per search position.
+        distances = numpy.asarray(distances, dtype=float).reshape(-1, num_points)
+        indexes = numpy.asarray(indexes, dtype=int).reshape(-1, num_points)
+
+        # Points which were not found, or are not strictly within the max
+        # distance, are invalid.
+        invalid = indexes >= self._num_elements
+
+        if maxdist is not None:
+            invalid |= distances >= maxdist
+
+        distances[invalid] = numpy.inf
+        indexes[invalid] = -1
+
+        return distances, indexes
+
+    # =========================================================================
+    # CLASS METHODS
+    # =========================================================================
+
+    @classmethod
+    def load(cls, file_path, geometry):
+        """Load a point cloud from an index file created by save().
+
+        The point cloud uses the same backend it was saved with.  The
+        positions and point map are memory mapped from the file so multiple
+        processes loading the same file share the same pages.  The 'grid'
+        backend's cell arrays are also mapped while the scipy tree nodes are
+        unpickled, which copies them but avoids rebuilding the tree.
+
+        :param file_path: The index file to load.
+        :type file_path: str
+        :param geometry: The geometry the index was created from.
+        :type geometry: hou.Geometry
+        :return: The loaded point cloud.
+        :rtype: PointCloud
+
+        """
+        header, data_start = _read_index_header(file_path)
+
+        buf = numpy.memmap(file_path, dtype=numpy.uint8, mode="r")
+
+        state = tuple(
+            _read_index_item(buf, data_start, entry) for entry in header["state"]
+        )
+
+        # Files written before the backend was stored always contain a
+        # compiled tree.
+        backend = header.get("backend", "ckdtree")
+
+        tree_class = _BACKENDS[backend]
+
+        tree = None
+
+        # Try to restore the saved tree structure directly.  The layout of
+        # the tree state can differ between scipy versions so if the state
+        # can't be restored fall back to building the tree from the mapped
+        # positions.
+        if state:
+            tree = tree_class.__new__(tree_class)
+
+            try:
+                tree.__setstate__(state)
+
+            except (TypeError, ValueError):
+                tree = None
+
+        if tree is None:
+            tree = tree_class(
+                _read_index_item(buf, data_start, header["positions"]),
+                header["leaf_size"]
+            )
+
+        cloud = cls.__new__(cls)
+
+        cloud._backend = backend
+        cloud._geometry = geometry
+        cloud._num_elements = header["num_elements"]
+        cloud._tree = tree
+
+        if header["point_map"] is not None:
+            cloud._point_map = _read_index_item(buf, data_start, header["point_map"])
+
+        else:
+            cloud._point_map = None
+
+        return cloud
+
     # =========================================================================
     # METHODS
     # =========================================================================
 
-    def find_all_close_points(self, position, maxdist):
+    def filter_attribute(self, name, positions, num_points=None, radius=None,
+                         kernel="uniform", bandwidth=None, workers=1):
+        """Compute a weighted average of a point attribute around each position.
+
+        This is similar to VEX's pcfilter(): neighbours are found using either
+        the closest num_points points, all points within radius, or the
+        closest num_points points within radius.  Attribute values of the
+        neighbours are then averaged in a single vectorized pass.
+
+        Available kernels are 'uniform', 'inverse' (inverse distance) and
+        'gaussian'.  The gaussian bandwidth defaults to half the radius, or
+        half the distance to the farthest neighbour of each position when no
+        radius is given.
+
+        Positions without any neighbours have a value of 0.
+
+        :param name: The name of the point attribute to filter.
+        :type name: str
+        :param positions: The search positions.
+        :type positions: numpy.ndarray|list(hou.Vector3)
+        :param num_points: The number of neighbours to use.
+        :type num_points: int
+        :param radius: The radius to search for neighbours in.
+        :type radius: float
+        :param kernel: The weighting kernel.
+        :type kernel: str
+        :param bandwidth: The gaussian kernel bandwidth.
+        :type bandwidth: float
+        :param workers: The number of workers to query with.
+        :type workers: int
+        :return: An (N, attribute size) array of filtered values.
+        :rtype: numpy.ndarray
+
+        """
+        if kernel not in _FILTER_KERNELS:
+            raise ValueError("Invalid kernel: {}".format(kernel))
+
+        if num_points is None and radius is None:
+            raise ValueError("Must specify num_points and/or radius.")
+
+        values = _get_point_attrib_values(self._geometry, name)
+
+        positions = _as_positions_array(positions)
+
+        if num_points is None:
+            offsets, numbers, distances = self.find_all_close_point_numbers(
+                positions,
+                radius,
+                workers
+            )
+
+            rows = numpy.repeat(numpy.arange(len(positions)), numpy.diff(offsets))
+
+        else:
+            distances, numbers = self.find_nearest_point_numbers(
+                positions,
+                num_points,
+                radius,
+                workers
+            )
+
+            # Flatten the valid results so they can be treated the same as
+            # the ball query results.
+            rows, columns = numpy.nonzero(numbers >= 0)
+
+            numbers = numbers[rows, columns]
+            distances = distances[rows, columns]
+
+        if kernel == "uniform":
+            weights = numpy.ones(len(distances))
+
+        elif kernel == "inverse":
+            weights = 1.0 / numpy.maximum(distances, _MIN_FILTER_DISTANCE)
+
+        else:
+            if bandwidth is None:
+                if radius is not None:
+                    bandwidth = numpy.full(len(positions), radius / 2.0)
+
+                else:
+                    bandwidth = numpy.zeros(len(positions))
+                    numpy.maximum.at(bandwidth, rows, distances / 2.0)
+
+                bandwidth = numpy.maximum(bandwidth[rows], _MIN_FILTER_DISTANCE)
+
+            weights = numpy.exp(-0.5 * numpy.square(distances / bandwidth))
+
+        total_weights = numpy.bincount(rows, weights, minlength=len(positions))
+
+        # Avoid dividing by 0 for positions that didn't find any points.
+        total_weights[total_weights == 0] = 1
+
+        neighbour_values = values[numbers] * weights[:, numpy.newaxis]
+
+        result = numpy.empty((len(positions), values.shape[1]))
+
+        for component in range(values.shape[1]):
+            result[:, component] = numpy.bincount(
+                rows,
+                neighbour_values[:, component],
+                minlength=len(positions)
+            )
+
+        return result / total_weights[:, numpy.newaxis]
+
+    def find_all_close_points(self, position, maxdist, maxpoints=None, eps=0):
         """Find all points within the maxdist from the position.
 
+        Like VEX's pcopen(), when maxpoints is set only the closest maxpoints
+        points are returned.  A non-zero eps allows an approximate search
+        where found points may be up to (1 + eps) times farther than the
+        true closest points.
+
         :param position: A search position.
         :type position: hou.Vector3
         :param maxdist: The maximum distance to search.
         :type maxdist: float
+        :param maxpoints: The maximum number of points to find.
+        :type maxpoints: int
+        :param eps: The approximate search tolerance.
+        :type eps: float
         :return: A tuple of found points.
         :rtype: tuple(hou.Point)
 
         """
         # Convert the position to a compatible ndarray.
-        positions = numpy.array([position])
+        positions = _as_positions_array([position])
 
         # Perform a query based on the position and maxdist.
-        result = self._tree.query_ball_point(positions, maxdist)
+        _, indexes, _ = self._query_ball_indexes(
+            positions,
+            maxdist,
+            maxpoints=maxpoints,
+            eps=eps
+        )
 
         # Return any points that are found.
-        return self._get_result_points(result[0])
+        return self._get_result_points(indexes)
+
+    def find_all_close_point_numbers(self, positions, maxdist, workers=1,
+                                     maxpoints=None, eps=0):
+        """Find all points within the maxdist from each of the positions.
+
+        The results are returned in a compressed sparse row layout: the point
+        numbers and distances for position i are found in the range
+        offsets[i]:offsets[i+1] of the point number and distance arrays.
+
+        Multiple workers are only used with the 'ckdtree' backend.  A value of
+        -1 uses all available cores.
+
+        When maxpoints is set only the closest maxpoints points of each
+        position are found, sorted by increasing distance.
+
+        :param positions: The search positions.
+        :type positions: numpy.ndarray|list(hou.Vector3)
+        :param maxdist: The maximum distance to search.
+        :type maxdist: float
+        :param workers: The number of workers to query with.
+        :type workers: int
+        :param maxpoints: The maximum number of points to find per position.
+        :type maxpoints: int
+        :param eps: The approximate search tolerance.
+        :type eps: float
+        :return: The row offsets, point numbers and distances.
+        :rtype: tuple(numpy.ndarray)
+
+        """
+        positions = _as_positions_array(positions)
 
-    def find_nearest_points(self, position, num_points=1, maxdist=None):
+        offsets, indexes, distances = self._query_ball_indexes(
+            positions,
+            maxdist,
+            workers,
+            maxpoints,
+            eps
+        )
+
+        return offsets, self._get_point_numbers(indexes), distances
+
+    def find_nearest_points(self, position, num_points=1, maxdist=None, eps=0):
         """Find the closest N points to the position.
 
+        A non-zero eps allows an approximate search where found points may be
+        up to (1 + eps) times farther than the true closest points.
+
         :param position: A search position.
         :type position: hou.Vector3
         :param num_points: The maximum number of points to search for.
         :type num_points: int
         :param maxdist: The maximum distance to search.
         :type maxdist: float
+        :param eps: The approximate search tolerance.
+        :type eps: float
         :return: A tuple of found points.
         :rtype: tuple(hou.Point)
 
@@ -153,52 +744,845 @@ class PointCloud(object):
             return ()
 
         # Convert the position to a compatible ndarray.
-        positions = numpy.array([position])
+        positions = _as_positions_array([position])
 
         # Query the tree.
-        result = self._tree.query(positions, num_points)
+        _, indexes = self._query_nearest_indexes(
+            positions,
+            num_points,
+            maxdist,
+            eps=eps
+        )
 
-        # Get the list of found indexes.
-        indexes = result[1][0]
+        # Get the list of found indexes, ignoring any invalid ones.
+        indexes = indexes[0]
+        indexes = indexes[indexes >= 0]
 
-        # If the maxdist is not None then we specified a maximum distance points
-        # can be within.
-        if maxdist is not None:
-            # Get the distances each match is from the target position.
-            distances = result[0][0]
+        # There are no points within the max distance.
+        if not len(indexes):
+            return ()
 
-            # Check the type of the distances list.  If it is a numpy array
-            # then more than 1 point was found.
-            if isinstance(distances, numpy.ndarray):
-                # Filter the index list to remove those too far away.
-                indexes = [index for dist, index in zip(distances, indexes)
-                           if dist < maxdist]
+        # Return the tuple of points.
+        return self._get_result_points(indexes)
 
-                # There are some points within the max distance so get them.
-                if len(indexes) > 0:
-                    near_points = self._get_result_points(indexes)
+    def find_nearest_point_numbers(self, positions, num_points=1, maxdist=None,
+                                   workers=1, eps=0):
+        """Find the closest N points to each of the positions.
 
-                else:
-                    near_points = ()
+        The results are (len(positions), num_points) arrays sorted by
+        increasing distance.  When fewer than num_points points are found the
+        remaining entries are padded with a point number of -1 and an infinite
+        distance.
 
-            # Only 1 point was requested/found.
-            else:
-                # If the point is within the distances, glob and return it.
-                if distances < maxdist:
-                    near_points = self._get_result_points((indexes, ))
+        Multiple workers are only used with the 'ckdtree' backend.  A value of
+        -1 uses all available cores.
+
+        :param positions: The search positions.
+        :type positions: numpy.ndarray|list(hou.Vector3)
+        :param num_points: The maximum number of points to search for.
+        :type num_points: int
+        :param maxdist: The maximum distance to search.
+        :type maxdist: float
+        :param workers: The number of workers to query with.
+        :type workers: int
+        :param eps: The approximate search tolerance.
+        :type eps: float
+        :return: The distances and point numbers of the found points.
+        :rtype: tuple(numpy.ndarray)
+
+        """
+        positions = _as_positions_array(positions)
+
+        if num_points < 1:
+            raise ValueError("Invalid number of points: {}".format(num_points))
+
+        # We can't query for more points than we have so query what we can and
+        # pad the remaining columns.
+        query_points = min(num_points, self._num_elements)
+
+        distances = numpy.full((len(positions), num_points), numpy.inf)
+        numbers = numpy.full((len(positions), num_points), -1, dtype=int)
+
+        if query_points > 0:
+            found_distances, indexes = self._query_nearest_indexes(
+                positions,
+                query_points,
+                maxdist,
+                workers,
+                eps
+            )
+
+            distances[:, :query_points] = found_distances
+            numbers[:, :query_points] = self._get_point_numbers(indexes)
+
+        return distances, numbers
+
+    def save(self, file_path):
+        """Save the point cloud index to a file.
+
+        The positions, point map and tree structure are written as raw
+        aligned arrays so the file can be memory mapped by load().  The
+        backend is also stored so the same type of tree is loaded.
+
+        Older versions of scipy's KDTree have no flat structure so only the
+        positions are saved and the tree is rebuilt when loaded.
+
+        :param file_path: The file to save to.
+        :type file_path: str
+        :return:
+
+        """
+        tree = self._tree
+
+        items = []
+
+        state_entries = []
+        positions_entry = None
+
+        # The scipy trees and the grid can all be restored from their state,
+        # except for the pure Python KDTree of older versions of scipy.
+        if isinstance(tree, (cKDTree, SpatialHashGrid)):
+            state = tree.__getstate__()
+
+        else:
+            state = ()
+
+        for item in state:
+            entry = _add_index_item(items, item)
+
+            # The tree state contains the positions so remember where they are
+            # rather than writing them twice.
+            if item is tree.data:
+                positions_entry = entry
+
+            state_entries.append(entry)
+
+        if positions_entry is None:
+            positions_entry = _add_index_item(items, tree.data)
+
+        header = {
+            "backend": self._backend,
+            "leaf_size": int(tree.leafsize),
+            "num_elements": self._num_elements,
+            "point_map": None,
+            "positions": positions_entry,
+            "state": state_entries,
+            "version": _INDEX_FILE_VERSION,
+        }
+
+        if self._point_map is not None:
+            header["point_map"] = _add_index_item(items, self._point_map)
+
+        header_data = json.dumps(header, sort_keys=True).encode("utf-8")
+
+        # The arrays start after the magic string, header size and header.
+        data_start = _align_offset(len(_INDEX_FILE_MAGIC) + 8 + len(header_data))
+
+        with open(file_path, "wb") as handle:
+            handle.write(_INDEX_FILE_MAGIC)
+            handle.write(struct.pack("<Q", len(header_data)))
+            handle.write(header_data)
+
+            for offset, _, data in items:
+                handle.seek(data_start + offset)
+
+                if isinstance(data, numpy.ndarray):
+                    data.tofile(handle)
 
                 else:
-                    near_points = ()
+                    handle.write(data)
+
+    def get_neighbour_graph(self, radius=None, num_points=None, workers=1):
+        """Compute the neighbours of every point in the cloud in a single pass.
+
+        Either all pairs of points within radius, or the closest num_points
+        points (optionally within radius) of each point are found.  Points
+        are never considered to be their own neighbour.
+
+        The result is a compressed sparse row adjacency with rows and columns
+        in cloud element order, which can be passed to
+        scipy.sparse.csr_matrix((distances, indices, indptr)) and on to
+        scipy.sparse.csgraph functions.  Use point_numbers to convert element
+        indexes to point numbers.
+
+        :param radius: The radius to search for neighbours in.
+        :type radius: float
+        :param num_points: The number of neighbours to find for each point.
+        :type num_points: int
+        :param workers: The number of workers to query with.
+        :type workers: int
+        :return: The indptr, indices and distances arrays.
+        :rtype: tuple(numpy.ndarray)
+
+        """
+        if num_points is None and radius is None:
+            raise ValueError("Must specify num_points and/or radius.")
+
+        positions = self._tree.data
+
+        if num_points is None:
+            offsets, indexes, distances = self._query_ball_indexes(
+                positions,
+                radius,
+                workers
+            )
+
+            rows = numpy.repeat(
+                numpy.arange(self._num_elements),
+                numpy.diff(offsets)
+            )
+
+            valid = indexes != rows
+
+            counts = numpy.bincount(rows[valid], minlength=self._num_elements)
+
+            indexes = indexes[valid]
+            distances = distances[valid]
 
-        #  We don't care about the points being within a certain distance.
         else:
-            # If the point list is an array then more than one point was found.
-            if isinstance(indexes, numpy.ndarray):
-                near_points = self._get_result_points(indexes.tolist())
+            if num_points < 1:
+                raise ValueError("Invalid number of points: {}".format(num_points))
 
-            else:
-                # We found a single point, so pass it along in a tuple..
-                near_points = self._get_result_points((indexes, ))
+            # Search for one extra point since each point will find itself.
+            query_points = min(num_points + 1, self._num_elements)
 
-        # Return the tuple of points.
-        return near_points
+            distances, indexes = self._query_nearest_indexes(
+                positions,
+                query_points,
+                radius,
+                workers
+            )
+
+            rows = numpy.arange(self._num_elements)[:, numpy.newaxis]
+
+            valid = (indexes >= 0) & (indexes != rows)
+
+            # Coincident points may push a point out of its own results so only
+            # keep the closest num_points valid entries of each row.
+            valid &= numpy.cumsum(valid, axis=1) <= num_points
+
+            counts = valid.sum(axis=1)
+
+            indexes = indexes[valid]
+            distances = distances[valid]
+
+        offsets = numpy.zeros(self._num_elements + 1, dtype=int)
+        numpy.cumsum(counts, out=offsets[1:])
+
+        return offsets, indexes, distances
+
+    def get_points(self, point_numbers):
+        """Convert point numbers returned from a query to hou.Point objects.
+
+        Any negative point numbers, used to pad results, are ignored.
+
+        :param point_numbers: The point numbers to convert.
+        :type point_numbers: numpy.ndarray|list(int)
+        :return: A tuple of matching points.
+        :rtype: tuple(hou.Point)
+
+        """
+        point_numbers = numpy.asarray(point_numbers, dtype=int).ravel()
+        point_numbers = point_numbers[point_numbers >= 0]
+
+        if not len(point_numbers):
+            return ()
+
+        all_points = self._geometry.iterPoints()
+
+        return tuple(all_points[number] for number in point_numbers)
+
+
+class PointCloudCache(object):
+    """A least recently used cache of point clouds built from SOP geometry.
+
+    Point clouds are stored per SOP node and build arguments and are rebuilt
+    only when the node's geometry data has changed.  When the total size of
+    the cached point clouds exceeds the memory budget the least recently used
+    point clouds are evicted.
+
+    :param max_bytes: The memory budget, in bytes.
+    :type max_bytes: int
+
+    """
+
+    def __init__(self, max_bytes):
+        self._clouds = OrderedDict()
+        self._evictions = 0
+        self._hits = 0
+        self._max_bytes = max_bytes
+        self._misses = 0
+        self._num_bytes = 0
+
+    # =========================================================================
+    # SPECIAL METHODS
+    # =========================================================================
+
+    def __len__(self):
+        return len(self._clouds)
+
+    def __repr__(self):
+        return "<PointCloudCache entries={} bytes={} hits={} misses={} evictions={}>".format(
+            len(self),
+            self.num_bytes,
+            self.hits,
+            self.misses,
+            self.evictions
+        )
+
+    # =========================================================================
+    # NON-PUBLIC METHODS
+    # =========================================================================
+
+    def _evict(self):
+        """Evict least recently used point clouds until under the budget.
+
+        The most recently used point cloud is never evicted, even if it alone
+        exceeds the budget.
+
+        :return:
+
+        """
+        while self._num_bytes > self.max_bytes and len(self._clouds) > 1:
+            _, (_, cloud) = self._clouds.popitem(last=False)
+
+            self._num_bytes -= cloud.nbytes
+            self._evictions += 1
+
+    def _remove(self, key):
+        """Remove a cached point cloud.
+
+        :param key: The cache key.
+        :type key: tuple
+        :return:
+
+        """
+        _, cloud = self._clouds.pop(key)
+
+        self._num_bytes -= cloud.nbytes
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def evictions(self):
+        """int: The number of point clouds evicted to stay within budget."""
+        return self._evictions
+
+    @property
+    def hits(self):
+        """int: The number of lookups that returned a cached point cloud."""
+        return self._hits
+
+    @property
+    def max_bytes(self):
+        """int: The memory budget, in bytes."""
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes):
+        self._max_bytes = max_bytes
+
+        self._evict()
+
+    @property
+    def misses(self):
+        """int: The number of lookups that required building a point cloud."""
+        return self._misses
+
+    @property
+    def num_bytes(self):
+        """int: The approximate number of bytes used by cached point clouds."""
+        return self._num_bytes
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def clear(self):
+        """Remove all cached point clouds.
+
+        :return:
+
+        """
+        self._clouds.clear()
+        self._num_bytes = 0
+
+    def get(self, sop_node, pattern=None, **kwargs):
+        """Get a point cloud for the geometry of a SOP node.
+
+        If a point cloud was previously built for the node with the same
+        arguments and the geometry has not changed it will be returned,
+        otherwise a new one is built and cached.
+
+        :param sop_node: The SOP node whose geometry to use.
+        :type sop_node: hou.SopNode
+        :param pattern: Optional point pattern, point group or array of point
+                        numbers.
+        :type pattern: str|hou.PointGroup|numpy.ndarray|list(int)
+        :param kwargs: Additional PointCloud arguments.
+        :return: A point cloud for the node's geometry.
+        :rtype: PointCloud
+
+        """
+        geometry = sop_node.geometry()
+
+        key = (
+            sop_node.path(),
+            _get_pattern_key(pattern),
+            tuple(sorted(kwargs.items())),
+        )
+        data_id = _get_geometry_data_id(geometry, pattern)
+
+        if key in self._clouds:
+            cached_id, cloud = self._clouds[key]
+
+            if cached_id == data_id:
+                # Move the point cloud to the most recently used position.
+                del self._clouds[key]
+                self._clouds[key] = (cached_id, cloud)
+
+                self._hits += 1
+
+                return cloud
+
+            # The geometry has changed so the point cloud is invalid.
+            self._remove(key)
+
+        self._misses += 1
+
+        cloud = PointCloud(geometry, pattern, **kwargs)
+
+        self._clouds[key] = (data_id, cloud)
+        self._num_bytes += cloud.nbytes
+
+        self._evict()
+
+        return cloud
+
+    def reset_stats(self):
+        """Reset the hit, miss and eviction counts.
+
+        :return:
+
+        """
+        self._evictions = 0
+        self._hits = 0
+        self._misses = 0
+
+# =============================================================================
+# NON-PUBLIC FUNCTIONS
+# =============================================================================
+
+def _add_index_item(items, item):
+    """Add an item to be written to an index file.
+
+    Arrays and byte strings are added to the list of data to write.  Any
+    other values are stored directly in the header.
+
+    :param items: The list of (offset, size, data) values to write.
+    :type items: list(tuple)
+    :param item: The item to add.
+    :type item: object
+    :return: A header entry describing the item.
+    :rtype: dict
+
+    """
+    # Arrays are aligned after the end of the previous item.
+    if items:
+        last_offset, last_size, _ = items[-1]
+        offset = _align_offset(last_offset + last_size)
+
+    else:
+        offset = 0
+
+    if isinstance(item, numpy.ndarray):
+        item = numpy.ascontiguousarray(item)
+
+        items.append((offset, item.nbytes, item))
+
+        return {
+            "dtype": item.dtype.str,
+            "offset": offset,
+            "shape": list(item.shape),
+            "type": "array",
+        }
+
+    if isinstance(item, bytes):
+        items.append((offset, len(item), item))
+
+        return {"offset": offset, "size": len(item), "type": "bytes"}
+
+    # Convert any numpy scalars to plain Python values.
+    if isinstance(item, numpy.generic):
+        item = item.item()
+
+    return {"type": "value", "value": item}
+
+
+def _align_offset(offset):
+    """Round a file offset up to the index file array alignment.
+
+    :param offset: The offset to align.
+    :type offset: int
+    :return: The aligned offset.
+    :rtype: int
+
+    """
+    remainder = offset % _INDEX_FILE_ALIGNMENT
+
+    if remainder:
+        offset += _INDEX_FILE_ALIGNMENT - remainder
+
+    return offset
+
+
+def _as_positions_array(positions):
+    """Convert a sequence of positions into an (N, 3) float array.
+
+    :param positions: The positions to convert.
+    :type positions: numpy.ndarray|list(hou.Vector3)
+    :return: The positions as a 2D array.
+    :rtype: numpy.ndarray
+
+    """
+    return numpy.asarray(positions, dtype=float).reshape(-1, 3)
+
+
+def _get_default_cache_budget():
+    """Get the initial memory budget of the point cloud cache.
+
+    If $HT_POINTCLOUD_CACHE_MB is set it will be used, otherwise the default
+    will be used.
+
+    :return: The memory budget, in bytes.
+    :rtype: int
+
+    """
+    megabytes = int(os.getenv("HT_POINTCLOUD_CACHE_MB", _DEFAULT_CACHE_MB))
+
+    return megabytes * 1024 * 1024
+
+
+def _get_geometry_data_id(geometry, pattern=None):
+    """Get a value identifying the current point positions and topology.
+
+    Point patterns and groups can reference groups and attributes which
+    change without changing the positions or topology so when one is used the
+    cook count of the geometry's SOP node is also included.
+
+    :param geometry: The geometry to get the data id for.
+    :type geometry: hou.Geometry
+    :param pattern: Optional point pattern, point group or array of point
+                    numbers.
+    :type pattern: str|hou.PointGroup|numpy.ndarray|list(int)
+    :return: A comparable data id.
+    :rtype: tuple
+
+    """
+    data_id = (
+        geometry.intrinsicValue("pointcount"),
+        geometry.findPointAttrib("P").dataId(),
+        geometry.topologyDataId(),
+    )
+
+    if isinstance(pattern, hou.PointGroup) or \
+            (isinstance(pattern, basestring) and pattern):
+        sop_node = geometry.sopNode()
+
+        if sop_node is not None:
+            data_id += (sop_node.cookCount(),)
+
+    return data_id
+
+
+def _get_pattern_key(pattern):
+    """Get a hashable value identifying a point pattern.
+
+    Groups are identified by name and arrays of point numbers by their
+    contents.
+
+    :param pattern: Optional point pattern, point group or array of point
+                    numbers.
+    :type pattern: str|hou.PointGroup|numpy.ndarray|list(int)
+    :return: A hashable pattern key.
+    :rtype: str|tuple|None
+
+    """
+    if pattern is None or isinstance(pattern, basestring):
+        return pattern
+
+    if isinstance(pattern, hou.PointGroup):
+        return "group", pattern.name()
+
+    numbers = numpy.asarray(pattern)
+
+    return "numbers", numbers.dtype.str, numbers.shape, numbers.tobytes()
+
+
+def _get_pattern_point_numbers(geometry, pattern, num_points):
+    """Get the numbers of the points matching a pattern.
+
+    :param geometry: The geometry to match points in.
+    :type geometry: hou.Geometry
+    :param pattern: A point pattern, point group or array of point numbers.
+    :type pattern: str|hou.PointGroup|numpy.ndarray|list(int)
+    :param num_points: The number of points in the geometry.
+    :type num_points: int
+    :return: The matching point numbers, or None if all points are used.
+    :rtype: numpy.ndarray|None
+
+    """
+    if pattern is None:
+        return None
+
+    if isinstance(pattern, basestring):
+        if not pattern:
+            return None
+
+        group = geometry.findPointGroup(pattern)
+
+        if group is None:
+            numbers = _get_point_range_numbers(pattern, num_points)
+
+            if numbers is not None:
+                return numbers
+
+            # Fall back to having Houdini evaluate the pattern.
+            points = geometry.globPoints(pattern)
+
+            return numpy.fromiter(
+                (point.number() for point in points),
+                dtype=numpy.int32,
+                count=len(points)
+            )
+
+        pattern = group
+
+    if isinstance(pattern, hou.PointGroup):
+        if group_membership_mask is not None:
+            mask = group_membership_mask(pattern)
+
+            return numpy.flatnonzero(mask).astype(numpy.int32)
+
+        points = pattern.points()
+
+        return numpy.fromiter(
+            (point.number() for point in points),
+            dtype=numpy.int32,
+            count=len(points)
+        )
+
+    numbers = numpy.asarray(pattern, dtype=numpy.int32).ravel()
+
+    if len(numbers) and (numbers.min() < 0 or numbers.max() >= num_points):
+        raise ValueError(
+            "Point numbers must be between 0 and {}".format(num_points - 1)
+        )
+
+    return numbers
+
+
+def _get_point_range_numbers(pattern, num_points):
+    """Expand a pattern made up of only point numbers and ranges.
+
+    Ranges may be ascending or descending and have an optional step, eg.
+    '0-10:2 15 20-12'.  Point numbers which don't exist are ignored and the
+    result is sorted, matching hou.Geometry.globPoints().
+
+    :param pattern: The point pattern.
+    :type pattern: str
+    :param num_points: The number of points in the geometry.
+    :type num_points: int
+    :return: The point numbers, or None if the pattern contains anything
+             other than point numbers and ranges.
+    :rtype: numpy.ndarray|None
+
+    """
+    ranges = []
+
+    for token in pattern.split():
+        match = _POINT_RANGE_REGEX.match(token)
+
+        if match is None:
+            return None
+
+        start, end, step = match.groups()
+
+        start = int(start)
+        end = start if end is None else int(end)
+        step = 1 if step is None else int(step)
+
+        if not step:
+            return None
+
+        if end < start:
+            start, end = end, start
+
+        ranges.append(numpy.arange(start, end + 1, step))
+
+    if not ranges:
+        return None
+
+    numbers = numpy.unique(numpy.concatenate(ranges))
+
+    return numbers[numbers < num_points].astype(numpy.int32)
+
+
+def _get_point_attrib_values(geometry, name):
+    """Get the values of a numeric point attribute as an (N, size) array.
+
+    :param geometry: The geometry to get the values from.
+    :type geometry: hou.Geometry
+    :param name: The name of the attribute.
+    :type name: str
+    :return: The attribute values.
+    :rtype: numpy.ndarray
+
+    """
+    attrib = geometry.findPointAttrib(name)
+
+    if attrib is None:
+        raise hou.OperationFailed("Invalid attribute name.")
+
+    data_type = attrib.dataType()
+
+    if data_type == hou.attribData.Float:
+        values = geometry.pointFloatAttribValuesAsString(
+            name,
+            float_type=hou.numericData.Float64
+        )
+
+        dtype = numpy.float64
+
+    elif data_type == hou.attribData.Int:
+        values = geometry.pointIntAttribValuesAsString(
+            name,
+            int_type=hou.numericData.Int64
+        )
+
+        dtype = numpy.int64
+
+    else:
+        raise hou.OperationFailed("Attribute must be numeric.")
+
+    return numpy.frombuffer(values, dtype=dtype).reshape(-1, attrib.size())
+
+
+def _get_point_positions(geometry, double_precision=True):
+    """Get the point positions of the geometry as an (N, 3) array.
+
+    The positions are read from the raw attribute data so no intermediate
+    Python objects are created.
+
+    :param geometry: The geometry to get the point positions of.
+    :type geometry: hou.Geometry
+    :param double_precision: Whether to read the positions as 64 bit floats.
+    :type double_precision: bool
+    :return: The point positions.
+    :rtype: numpy.ndarray
+
+    """
+    if double_precision:
+        float_type = hou.numericData.Float64
+        dtype = numpy.float64
+
+    else:
+        float_type = hou.numericData.Float32
+        dtype = numpy.float32
+
+    values = geometry.pointFloatAttribValuesAsString("P", float_type=float_type)
+
+    return numpy.frombuffer(values, dtype=dtype).reshape(-1, 3)
+
+
+def _read_index_header(file_path):
+    """Read the header of an index file.
+
+    :param file_path: The index file to read.
+    :type file_path: str
+    :return: The header and the file offset where the array data starts.
+    :rtype: tuple(dict, int)
+
+    """
+    with open(file_path, "rb") as handle:
+        magic = handle.read(len(_INDEX_FILE_MAGIC))
+
+        if magic != _INDEX_FILE_MAGIC:
+            raise ValueError("{} is not a point cloud index file".format(file_path))
+
+        header_size = struct.unpack("<Q", handle.read(8))[0]
+        header = json.loads(handle.read(header_size).decode("utf-8"))
+
+    if header["version"] != _INDEX_FILE_VERSION:
+        raise ValueError(
+            "Unsupported point cloud index version: {}".format(header["version"])
+        )
+
+    data_start = _align_offset(len(_INDEX_FILE_MAGIC) + 8 + header_size)
+
+    return header, data_start
+
+
+def _read_index_item(buf, data_start, entry):
+    """Read an item from a memory mapped index file.
+
+    :param buf: The memory mapped file.
+    :type buf: numpy.memmap
+    :param data_start: The file offset where the array data starts.
+    :type data_start: int
+    :param entry: The header entry describing the item.
+    :type entry: dict
+    :return: The item value.
+    :rtype: object
+
+    """
+    if entry["type"] == "array":
+        dtype = numpy.dtype(str(entry["dtype"]))
+        shape = tuple(entry["shape"])
+
+        start = data_start + entry["offset"]
+        size = int(numpy.prod(shape)) * dtype.itemsize
+
+        # Arrays are views into the mapped file so no data is copied.
+        return buf[start:start + size].view(dtype).reshape(shape)
+
+    if entry["type"] == "bytes":
+        start = data_start + entry["offset"]
+
+        return buf[start:start + entry["size"]].tobytes()
+
+    return entry["value"]
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def get_cache():
+    """Get the shared point cloud cache.
+
+    :return: The shared point cloud cache.
+    :rtype: PointCloudCache
+
+    """
+    return _CACHE
+
+
+def get_cached_point_cloud(sop_node, pattern=None, **kwargs):
+    """Get a point cloud for a SOP node's geometry from the shared cache.
+
+    :param sop_node: The SOP node whose geometry to use.
+    :type sop_node: hou.SopNode
+    :param pattern: Optional point pattern.
+    :type pattern: str
+    :param kwargs: Additional PointCloud arguments.
+    :return: A point cloud for the node's geometry.
+    :rtype: PointCloud
+
+    """
+    return _CACHE.get(sop_node, pattern, **kwargs)
+
+# =============================================================================
+
+_CACHE = PointCloudCache(_get_default_cache_budget())
@@ -0,0 +1,491 @@
+"""This module contains a uniform grid spatial hash for fixed radius queries."""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Python Imports
+import itertools
+import numpy
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+
+class SpatialHashGrid(object):
+    """A uniform grid of cells for finding points within a radius.
+
+    Points are bucketed by the cell they fall into and the cells are stored as
+    a sorted array of cell keys so memory use only depends on the number of
+    points and occupied cells.  The grid provides the subset of the
+    scipy.spatial.cKDTree interface used by PointCloud.
+
+    Queries are fastest when the cell size is close to the query radius.  If
+    no cell size is given one is chosen so that each cell contains roughly
+    leafsize points.
+
+    :param data: An (N, 3) array of point positions.
+    :type data: numpy.ndarray
+    :param leafsize: The target number of points per cell.
+    :type leafsize: int
+    :param cell_size: The size of each grid cell.
+    :type cell_size: float
+
+    """
+
+    def __init__(self, data, leafsize=10, cell_size=None):
+        self.data = numpy.asarray(data).reshape(-1, 3)
+        self.leafsize = leafsize
+
+        num_points = len(self.data)
+
+        if num_points:
+            mins = self.data.min(axis=0).astype(numpy.float64)
+            maxs = self.data.max(axis=0).astype(numpy.float64)
+
+        else:
+            mins = numpy.zeros(3)
+            maxs = numpy.zeros(3)
+
+        if cell_size is None:
+            cell_size = _get_default_cell_size(maxs - mins, num_points, leafsize)
+
+        if cell_size <= 0:
+            raise ValueError("Invalid cell size: {}".format(cell_size))
+
+        self.cell_size = float(cell_size)
+
+        self._origin = mins
+        self._maxs = maxs
+        self._dims = self._get_cell_coords(maxs) + 1
+
+        keys = self._get_cell_keys(self._get_cell_coords(self.data))
+
+        # Sort the points by cell so each cell's points are contiguous.
+        self._order = numpy.argsort(keys, kind="mergesort")
+
+        self._cell_keys, starts = numpy.unique(keys[self._order], return_index=True)
+
+        self._cell_starts = numpy.append(starts, num_points)
+
+    # =========================================================================
+    # SPECIAL METHODS
+    # =========================================================================
+
+    def __getstate__(self):
+        return (
+            self.data,
+            self.leafsize,
+            self.cell_size,
+            self._origin,
+            self._maxs,
+            self._dims,
+            self._order,
+            self._cell_keys,
+            self._cell_starts,
+        )
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return "<SpatialHashGrid {} points, {} cells, cell size {}>".format(
+            len(self.data),
+            len(self._cell_keys),
+            self.cell_size
+        )
+
+    def __setstate__(self, state):
+        (
+            self.data,
+            self.leafsize,
+            self.cell_size,
+            self._origin,
+            self._maxs,
+            self._dims,
+            self._order,
+            self._cell_keys,
+            self._cell_starts,
+        ) = state
+
+    # =========================================================================
+    # NON-PUBLIC METHODS
+    # =========================================================================
+
+    def _get_cell_coords(self, positions):
+        """Get the integer cell coordinates the positions fall into.
+
+        :param positions: An (N, 3) array of positions.
+        :type positions: numpy.ndarray
+        :return: An (N, 3) array of cell coordinates.
+        :rtype: numpy.ndarray
+
+        """
+        coords = numpy.floor((positions - self._origin) / self.cell_size)
+
+        return coords.astype(numpy.int64)
+
+    def _get_cell_keys(self, coords):
+        """Get the linear keys of in-bounds cell coordinates.
+
+        :param coords: An (N, 3) array of cell coordinates.
+        :type coords: numpy.ndarray
+        :return: The cell keys.
+        :rtype: numpy.ndarray
+
+        """
+        x_coords, y_coords, z_coords = coords.T
+
+        return x_coords + self._dims[0] * (y_coords + self._dims[1] * z_coords)
+
+    def _get_cell_slots(self, rows, cells):
+        """Get the sorted point slots of occupied cells.
+
+        :param rows: The query row of each cell.
+        :type rows: numpy.ndarray
+        :param cells: The indexes of occupied cells.
+        :type cells: numpy.ndarray
+        :return: The query row and sorted point slot of each point in the
+                 cells.
+        :rtype: tuple(numpy.ndarray)
+
+        """
+        starts = self._cell_starts[cells]
+        counts = self._cell_starts[cells + 1] - starts
+
+        return numpy.repeat(rows, counts), _expand_ranges(starts, counts)
+
+    def _get_key_cell_coords(self, keys):
+        """Get the integer cell coordinates of linear cell keys.
+
+        :param keys: The cell keys.
+        :type keys: numpy.ndarray
+        :return: An (N, 3) array of cell coordinates.
+        :rtype: numpy.ndarray
+
+        """
+        x_coords = keys % self._dims[0]
+        y_coords = (keys // self._dims[0]) % self._dims[1]
+        z_coords = keys // (self._dims[0] * self._dims[1])
+
+        return numpy.column_stack((x_coords, y_coords, z_coords))
+
+    def _select_nearest(self, offsets, indexes, distances, num_points):
+        """Select the closest num_points results of each row of a radius query.
+
+        Missing results have an index of len(data) and an infinite distance,
+        matching cKDTree.query().
+
+        :param offsets: The row offsets of the radius query.
+        :type offsets: numpy.ndarray
+        :param indexes: The found point indexes.
+        :type indexes: numpy.ndarray
+        :param distances: The found point distances.
+        :type distances: numpy.ndarray
+        :param num_points: The number of points to select.
+        :type num_points: int
+        :return: (N, num_points) arrays of distances and indexes.
+        :rtype: tuple(numpy.ndarray)
+
+        """
+        num_rows = len(offsets) - 1
+
+        counts = numpy.diff(offsets)
+        rows = numpy.repeat(numpy.arange(num_rows), counts)
+
+        # Sort each row's results by distance.
+        order = numpy.lexsort((distances, rows))
+
+        ranks = numpy.arange(len(order)) - numpy.repeat(offsets[:-1], counts)
+
+        keep = ranks < num_points
+        order = order[keep]
+
+        result_distances = numpy.full((num_rows, num_points), numpy.inf)
+        result_indexes = numpy.full(
+            (num_rows, num_points),
+            len(self.data),
+            dtype=int
+        )
+
+        result_distances[rows[keep], ranks[keep]] = distances[order]
+        result_indexes[rows[keep], ranks[keep]] = indexes[order]
+
+        return result_distances, result_indexes
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def nbytes(self):
+        """int: The number of bytes used by the grid, including the positions."""
+        return (
+            self.data.nbytes +
+            self._order.nbytes +
+            self._cell_keys.nbytes +
+            self._cell_starts.nbytes
+        )
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def query(self, positions, k=1, distance_upper_bound=numpy.inf, eps=0):
+        """Find the closest k points to each position.
+
+        When no upper bound is given the search radius starts at the cell size
+        past the bounds of the points and doubles for any positions that
+        haven't found k points yet.
+
+        The grid always returns exact results so eps is accepted for
+        compatibility with cKDTree but is otherwise ignored.
+
+        :param positions: An (N, 3) array of search positions.
+        :type positions: numpy.ndarray
+        :param k: The number of points to search for.
+        :type k: int
+        :param distance_upper_bound: The maximum distance to search.
+        :type distance_upper_bound: float
+        :param eps: The approximate search tolerance.
+        :type eps: float
+        :return: (N, k) arrays of distances and indexes.
+        :rtype: tuple(numpy.ndarray)
+
+        """
+        positions = numpy.asarray(positions, dtype=numpy.float64).reshape(-1, 3)
+
+        if numpy.isfinite(distance_upper_bound):
+            offsets, indexes, distances = self.query_radius(
+                positions,
+                distance_upper_bound
+            )
+
+            return self._select_nearest(offsets, indexes, distances, k)
+
+        result_distances = numpy.full((len(positions), k), numpy.inf)
+        result_indexes = numpy.full((len(positions), k), len(self.data), dtype=int)
+
+        # Positions outside the bounds start searching from their distance to
+        # the bounds rather than expanding out from a single cell.
+        outside = numpy.maximum(
+            numpy.maximum(self._origin - positions, positions - self._maxs),
+            0
+        )
+        radii = numpy.sqrt(numpy.einsum("ij,ij->i", outside, outside))
+        radii += self.cell_size
+
+        # Once the radius reaches the farthest corner of the bounds from a
+        # position every point has been considered.
+        corners = numpy.maximum(
+            numpy.abs(positions - self._origin),
+            numpy.abs(positions - self._maxs)
+        )
+        max_radii = numpy.sqrt(numpy.einsum("ij,ij->i", corners, corners))
+
+        pending = numpy.arange(len(positions))
+
+        while len(pending):
+            offsets, indexes, distances = self.query_radius(
+                positions[pending],
+                radii[pending]
+            )
+
+            done = numpy.diff(offsets) >= k
+            done |= radii[pending] >= max_radii[pending]
+
+            found_distances, found_indexes = self._select_nearest(
+                offsets,
+                indexes,
+                distances,
+                k
+            )
+
+            result_distances[pending[done]] = found_distances[done]
+            result_indexes[pending[done]] = found_indexes[done]
+
+            pending = pending[~done]
+            radii[pending] *= 2
+
+        return result_distances, result_indexes
+
+    def query_radius(self, positions, radius):
+        """Find all points within the radius of each position.
+
+        The results are returned in a compressed sparse row layout: the
+        indexes and distances for position i are found in the range
+        offsets[i]:offsets[i+1].
+
+        The cells searched are clipped to the grid and never number more than
+        the occupied cells so the work per position is bounded, however large
+        the radius.
+
+        :param positions: An (N, 3) array of search positions.
+        :type positions: numpy.ndarray
+        :param radius: The maximum distance to search, or an array of the
+                       distance to search for each position.
+        :type radius: float|numpy.ndarray
+        :return: The row offsets, point indexes and distances.
+        :rtype: tuple(numpy.ndarray)
+
+        """
+        positions = numpy.asarray(positions, dtype=numpy.float64).reshape(-1, 3)
+
+        radii = numpy.broadcast_to(
+            numpy.asarray(radius, dtype=numpy.float64),
+            (len(positions),)
+        )
+
+        if not len(self._cell_keys):
+            return (
+                numpy.zeros(len(positions) + 1, dtype=int),
+                numpy.zeros(0, dtype=int),
+                numpy.zeros(0)
+            )
+
+        lower = self._get_cell_coords(positions - radii[:, numpy.newaxis])
+        lower = numpy.maximum(lower, 0)
+
+        upper = self._get_cell_coords(positions + radii[:, numpy.newaxis])
+        upper = numpy.minimum(upper, self._dims - 1)
+
+        # The number of cells to check along each axis.  Search boxes which
+        # don't overlap the grid at all are skipped.
+        extents = upper - lower + 1
+
+        overlapping = numpy.all(extents > 0, axis=1)
+
+        box_sizes = numpy.prod(extents, axis=1)
+
+        num_cells = len(self._cell_keys)
+
+        all_rows = []
+        all_slots = []
+
+        # Positions whose search box contains fewer cells than are occupied
+        # check each cell of their box.
+        box_ids = numpy.flatnonzero(overlapping & (box_sizes <= num_cells))
+
+        if len(box_ids):
+            box_lower = lower[box_ids]
+            box_upper = upper[box_ids]
+
+            max_extents = extents[box_ids].max(axis=0)
+
+            cell_offsets = itertools.product(*[range(size) for size in max_extents])
+
+            for cell_offset in cell_offsets:
+                coords = box_lower + cell_offset
+
+                valid = numpy.all(coords <= box_upper, axis=1)
+
+                if not valid.any():
+                    continue
+
+                keys = self._get_cell_keys(coords[valid])
+                query_ids = box_ids[valid]
+
+                cells = numpy.searchsorted(self._cell_keys, keys)
+                cells = numpy.minimum(cells, num_cells - 1)
+
+                occupied = self._cell_keys[cells] == keys
+
+                rows, slots = self._get_cell_slots(
+                    query_ids[occupied],
+                    cells[occupied]
+                )
+
+                all_rows.append(rows)
+                all_slots.append(slots)
+
+        # Positions with larger search boxes, such as those far outside the
+        # grid, check each occupied cell instead.
+        scan_ids = numpy.flatnonzero(overlapping & (box_sizes > num_cells))
+
+        if len(scan_ids):
+            cell_coords = self._get_key_cell_coords(self._cell_keys)
+
+            for query_id in scan_ids:
+                cells = numpy.flatnonzero(
+                    numpy.all(
+                        (cell_coords >= lower[query_id]) &
+                        (cell_coords <= upper[query_id]),
+                        axis=1
+                    )
+                )
+
+                rows, slots = self._get_cell_slots(
+                    numpy.full(len(cells), query_id, dtype=int),
+                    cells
+                )
+
+                all_rows.append(rows)
+                all_slots.append(slots)
+
+        if all_rows:
+            rows = numpy.concatenate(all_rows)
+            indexes = self._order[numpy.concatenate(all_slots)]
+
+        else:
+            rows = numpy.zeros(0, dtype=int)
+            indexes = numpy.zeros(0, dtype=int)
+
+        deltas = self.data[indexes] - positions[rows]
+        distances = numpy.sqrt(numpy.einsum("ij,ij->i", deltas, deltas))
+
+        inside = distances <= radii[rows]
+
+        rows = rows[inside]
+
+        order = numpy.argsort(rows, kind="mergesort")
+
+        offsets = numpy.zeros(len(positions) + 1, dtype=int)
+        numpy.cumsum(numpy.bincount(rows, minlength=len(positions)), out=offsets[1:])
+
+        return offsets, indexes[inside][order], distances[inside][order]
+
+# =============================================================================
+# NON-PUBLIC FUNCTIONS
+# =============================================================================
+
+
+def _expand_ranges(starts, counts):
+    """Concatenate the ranges start:start+count into a single array.
+
+    :param starts: The start of each range.
+    :type starts: numpy.ndarray
+    :param counts: The length of each range.
+    :type counts: numpy.ndarray
+    :return: The concatenated ranges.
+    :rtype: numpy.ndarray
+
+    """
+    offsets = numpy.cumsum(counts) - counts
+
+    return numpy.arange(counts.sum()) - numpy.repeat(offsets - starts, counts)
+
+
+def _get_default_cell_size(extents, num_points, leafsize):
+    """Choose a cell size giving roughly leafsize points per occupied cell.
+
+    Axes with no extent are ignored so flat point sets get sensible cells.
+
+    :param extents: The size of the point bounds along each axis.
+    :type extents: numpy.ndarray
+    :param num_points: The number of points.
+    :type num_points: int
+    :param leafsize: The target number of points per cell.
+    :type leafsize: int
+    :return: The cell size.
+    :rtype: float
+
+    """
+    extents = extents[extents > 0]
+
+    if not num_points or not len(extents):
+        return 1.0
+
+    volume = numpy.prod(extents) * leafsize / float(num_points)
+
+    return float(volume ** (1.0 / len(extents)))
@@ -1,2 +1,3 @@
 import ht.inline.api
+import ht.inline.profiling
 
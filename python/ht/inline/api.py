@@ -13,8 +13,11 @@ and modules they are meant to extend.
 
 # Python Imports
 import ast
+from collections import OrderedDict, Sequence
 import ctypes
+import itertools
 import math
+import numpy
 
 # Houdini Toolbox Imports
 from ht.inline.lib import cpp_methods as _cpp_methods
@@ -77,6 +80,17 @@ _GROUP_ATTRIB_MAP = {
     hou.PrimGroup: 2,
 }
 
+# The shared index of installed digital asset libraries.
+_HDA_LIBRARY_INDEX = None
+
+# Mapping between group membership edit modes and the corresponding C++ values.
+_GROUP_MEMBERSHIP_MODES = {
+    "set": 0,
+    "add": 1,
+    "remove": 2,
+    "toggle": 3,
+}
+
 # Mapping between group types and corresponding GA_GroupType values.
 _GROUP_TYPE_MAP = {
     hou.PointGroup: 0,
@@ -84,11 +98,405 @@ _GROUP_TYPE_MAP = {
     hou.EdgeGroup: 2,
 }
 
+# Mapping between primitive metric names and the corresponding metric value
+# and number of values used by the primitiveMetrics function.
+_PRIM_METRICS = {
+    "area": (0, 1),
+    "perimeter": (1, 1),
+    "volume": (2, 1),
+    "bary_center": (3, 3),
+    "bounding_box": (4, 6),
+}
+
+# Mapping between topology adjacency names and the corresponding adjacency
+# type values used by topologyAdjacency and the number of entries per vertex
+# to initially allocate for the results.
+_TOPOLOGY_ADJACENCY_TYPES = {
+    "point_points": (0, 2),
+    "prim_prims": (1, 4),
+    "point_vertices": (2, 1),
+}
+
+# The maximum number of cached topology adjacencies.
+_TOPOLOGY_CACHE_SIZE = 16
+
+# Cached topology adjacencies, keyed by SOP node path and adjacency type.
+_TOPOLOGY_CACHE = OrderedDict()
+
+# Cached variable values, keyed by variable name.  Variables which don't exist
+# are cached with a value of None.
+_VARIABLE_CACHE = {}
+
+# Cached names of all the available variables.
+_VARIABLE_NAMES_CACHE = None
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+class ElementSequence(Sequence):
+    """A lazy, read only sequence of geometry elements.
+
+    Elements are only constructed when they are accessed which avoids building
+    and globbing large pattern strings to convert element numbers into HOM
+    objects.  Sequences compare equal to any sequence containing the same
+    elements, such as the tuples returned by hou.Geometry.globPoints().
+
+    Sequences behave like the tuples previously returned by the api functions:
+    they can be added to and multiplied like tuples, which returns a tuple,
+    hash the same as a tuple of the same elements and don't compare equal to
+    lists.  Since elements are created lazily they aren't tuple instances, so
+    use isinstance(value, collections.Sequence) or tuple(value) instead of
+    checking for tuples.
+
+    :param get_element: A callable which returns the element for an entry.
+    :type get_element: callable
+    :param numbers: The element numbers, or (prim number, vertex index) pairs
+                    for vertices.
+    :type numbers: collections.Sequence
+
+    """
+
+    def __init__(self, get_element, numbers):
+        self._get_element = get_element
+        self._numbers = numbers
+
+    # =========================================================================
+    # SPECIAL METHODS
+    # =========================================================================
+
+    def __add__(self, other):
+        if not isinstance(other, (tuple, ElementSequence)):
+            return NotImplemented
+
+        return tuple(self) + tuple(other)
+
+    def __eq__(self, other):
+        # Like tuples, sequences never compare equal to lists.
+        if not isinstance(other, (tuple, ElementSequence)):
+            return NotImplemented
+
+        if len(self) != len(other):
+            return False
+
+        return all(element == other_element for element, other_element
+                   in itertools.izip(self, other))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            numbers = [
+                self._numbers[i] for i in xrange(*index.indices(len(self)))
+            ]
+
+            return ElementSequence(self._get_element, numbers)
+
+        return self._get_element(self._numbers[index])
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __iter__(self):
+        for number in self._numbers:
+            yield self._get_element(number)
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def __mul__(self, count):
+        return tuple(self) * count
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+
+        if result is NotImplemented:
+            return result
+
+        return not result
+
+    def __radd__(self, other):
+        if not isinstance(other, tuple):
+            return NotImplemented
+
+        return other + tuple(self)
+
+    def __repr__(self):
+        return "<ElementSequence of {} elements>".format(len(self))
+
+    def __rmul__(self, count):
+        return count * tuple(self)
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def numbers(self):
+        """collections.Sequence: The element numbers in the sequence."""
+        return self._numbers
+
+
+class HDALibraryIndex(object):
+    """An in-memory index of the installed digital asset libraries.
+
+    The index maps each library path to its meta sources and definitions and
+    is built with a single call to the OTL manager.  Where Houdini supports
+    asset event callbacks only libraries which change are re-indexed,
+    otherwise the whole index is rebuilt when the loaded files change.
+
+    """
+
+    def __init__(self):
+        self._dirty_paths = set()
+        self._libraries = OrderedDict()
+        self._loaded_files = None
+        self._needs_refresh = True
+
+        self._use_events = hasattr(hou.hda, "addEventCallback")
+
+        if self._use_events:
+            hou.hda.addEventCallback(
+                (
+                    hou.hdaEventType.AssetCreated,
+                    hou.hdaEventType.AssetDeleted,
+                    hou.hdaEventType.AssetSaved,
+                    hou.hdaEventType.LibraryInstalled,
+                    hou.hdaEventType.LibraryUninstalled,
+                ),
+                self._handle_event
+            )
+
+    # =========================================================================
+    # SPECIAL METHODS
+    # =========================================================================
+
+    def __repr__(self):
+        return "<HDALibraryIndex of {} libraries>".format(len(self._libraries))
+
+    # =========================================================================
+    # NON-PUBLIC METHODS
+    # =========================================================================
+
+    def _get_library(self, file_path):
+        """Get the meta sources and definitions of an up to date library.
+
+        :param file_path: The library path.
+        :type file_path: str
+        :return: The meta sources and definitions of the library, if loaded.
+        :rtype: tuple(list(str), dict)|None
+
+        """
+        self._update()
+
+        return self._libraries.get(file_path)
+
+    def _handle_event(self, event_type, **kwargs):
+        """Mark libraries as needing to be re-indexed when assets change.
+
+        :param event_type: The event type.
+        :type event_type: hou.hdaEventType
+        :return:
+
+        """
+        file_path = kwargs.get("library_path")
+
+        if file_path is None and kwargs.get("asset_definition") is not None:
+            file_path = kwargs["asset_definition"].libraryFilePath()
+
+        if file_path is None:
+            self._needs_refresh = True
+
+        else:
+            self._dirty_paths.add(file_path)
+
+    def _update(self):
+        """Re-index any libraries which have changed.
+
+        :return:
+
+        """
+        if not self._use_events:
+            loaded_files = hou.hda.loadedFiles()
+
+            if loaded_files != self._loaded_files:
+                self._loaded_files = loaded_files
+                self._needs_refresh = True
+
+        if self._needs_refresh:
+            self.refresh()
+
+        while self._dirty_paths:
+            self.refresh_library(self._dirty_paths.pop())
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def library_paths(self):
+        """tuple(str): The paths of all the installed libraries."""
+        self._update()
+
+        return tuple(self._libraries.keys())
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def definition_mod_time(self, file_path, table_name, type_name):
+        """Get the modification time of a definition in a library.
+
+        :param file_path: The library path.
+        :type file_path: str
+        :param table_name: The node type category name.
+        :type table_name: str
+        :param type_name: The node type name.
+        :type type_name: str
+        :return: The modification time, if the definition exists.
+        :rtype: int|None
+
+        """
+        library = self._get_library(file_path)
+
+        if library is None:
+            return None
+
+        definition = library[1].get((table_name, type_name))
+
+        if definition is None:
+            return None
+
+        return definition[1]
+
+    def definitions(self, file_path):
+        """Get the definitions in a library.
+
+        :param file_path: The library path.
+        :type file_path: str
+        :return: The (category name, type name) of each definition.
+        :rtype: tuple(tuple(str))
+
+        """
+        library = self._get_library(file_path)
+
+        if library is None:
+            return ()
+
+        return tuple(library[1].keys())
+
+    def is_dummy_definition(self, file_path, table_name, type_name):
+        """Check if a definition in a library is a dummy definition.
+
+        :param file_path: The library path.
+        :type file_path: str
+        :param table_name: The node type category name.
+        :type table_name: str
+        :param type_name: The node type name.
+        :type type_name: str
+        :return: Whether or not the definition is a dummy definition.
+        :rtype: bool
+
+        """
+        library = self._get_library(file_path)
+
+        if library is None:
+            return False
+
+        definition = library[1].get((table_name, type_name))
+
+        if definition is None:
+            return False
+
+        return definition[0]
+
+    def libraries_in_meta_source(self, meta_source):
+        """Get the paths of the libraries in a meta source.
+
+        :param meta_source: The meta source name.
+        :type meta_source: str
+        :return: The library paths.
+        :rtype: tuple(str)
+
+        """
+        self._update()
+
+        return tuple(
+            file_path for file_path, library in self._libraries.iteritems()
+            if meta_source in library[0]
+        )
+
+    def meta_source(self, file_path):
+        """Get the meta source of a library.
+
+        If the library is installed under more than one meta source the one
+        the OTL manager finds first is returned.
+
+        :param file_path: The library path.
+        :type file_path: str
+        :return: The meta source, if the library is installed.
+        :rtype: str|None
+
+        """
+        library = self._get_library(file_path)
+
+        if library is None:
+            return None
+
+        return library[0][0]
+
+    def refresh(self):
+        """Rebuild the entire index.
+
+        :return:
+
+        """
+        self._libraries = _get_hda_libraries()
+
+        self._dirty_paths.clear()
+        self._needs_refresh = False
+
+    def refresh_library(self, file_path):
+        """Re-index a single library.
+
+        :param file_path: The library path.
+        :type file_path: str
+        :return:
+
+        """
+        libraries = _get_hda_libraries(file_path)
+
+        if file_path in libraries:
+            self._libraries[file_path] = libraries[file_path]
+
+        else:
+            self._libraries.pop(file_path, None)
+
 
 # =============================================================================
 # NON-PUBLIC FUNCTIONS
 # =============================================================================
 
+def _broadcast_rows(values, size, count):
+    """Broadcast per row or shared values to an array with count rows.
+
+    :param values: The values to broadcast.
+    :type values: numpy.ndarray|float|tuple(float)
+    :param size: The number of values in each row.  A size of 1 results in a
+                 1 dimensional array.
+    :type size: int
+    :param count: The number of rows.
+    :type count: int
+    :return: A read only array of rows.
+    :rtype: numpy.ndarray
+
+    """
+    values = numpy.asarray(values, dtype=numpy.float64)
+
+    if size == 1:
+        return numpy.broadcast_to(values.reshape(-1), (count,))
+
+    return numpy.broadcast_to(values.reshape(-1, size), (count, size))
+
+
 def _build_c_double_array(values):
     """Convert a list of numbers to a ctypes double array.
 
@@ -146,6 +554,50 @@ def _clean_string_values(values):
     return tuple([val for val in values if val])
 
 
+def _clear_variable_cache_on_hip_event(event_type):
+    """Clear the cached variables when the hip file changes.
+
+    Loading, clearing or saving the hip file under a new name changes
+    variables like $HIP, $HIPNAME and $JOB.
+
+    :param event_type: The hip file event type.
+    :type event_type: hou.hipFileEventType
+    :return:
+
+    """
+    clear_variable_cache()
+
+
+def _edit_group_membership(group, selection, mode):
+    """Edit the membership of a point or primitive group in a single call.
+
+    :param group: The group to edit.
+    :type group: hou.PointGroup|hou.PrimGroup
+    :param selection: A boolean mask or an array of element numbers.
+    :type selection: numpy.ndarray|list(bool)|list(int)
+    :param mode: The edit mode name.
+    :type mode: str
+    :return:
+
+    """
+    geometry = group.geometry()
+
+    # Make sure the geometry is not read only.
+    if is_geometry_read_only(geometry):
+        raise hou.GeometryPermissionError()
+
+    numbers = _get_group_element_numbers(group, selection)
+
+    _cpp_methods.editGroupMembership(
+        geometry,
+        group.name(),
+        _get_group_type(group),
+        _GROUP_MEMBERSHIP_MODES[mode],
+        _get_numpy_pointer(numbers, ctypes.c_int),
+        len(numbers)
+    )
+
+
 def _find_attrib(geometry, attrib_type, name):
     """Find an attribute with a given name and type on the geometry.
 
@@ -214,6 +666,51 @@ def _get_attrib_storage(data_type):
     return _ATTRIB_STORAGE_MAP[data_type]
 
 
+def _get_attrib_values_array(attrib):
+    """Get the values of a numeric point or primitive attribute as an array.
+
+    Attributes with a single component are returned as 1D arrays, others as
+    (N, size) arrays.
+
+    :param attrib: The attribute to get the values of.
+    :type attrib: hou.Attrib
+    :return: The attribute values.
+    :rtype: numpy.ndarray
+
+    """
+    geometry = attrib.geometry()
+    name = attrib.name()
+
+    data_type = attrib.dataType()
+
+    if attrib.type() == hou.attribType.Point:
+        float_func = geometry.pointFloatAttribValuesAsString
+        int_func = geometry.pointIntAttribValuesAsString
+
+    elif attrib.type() == hou.attribType.Prim:
+        float_func = geometry.primFloatAttribValuesAsString
+        int_func = geometry.primIntAttribValuesAsString
+
+    else:
+        raise hou.OperationFailed("Attribute must be a point or prim attribute.")
+
+    if data_type == hou.attribData.Float:
+        data = float_func(name, float_type=hou.numericData.Float64)
+        values = numpy.frombuffer(data, dtype=numpy.float64)
+
+    elif data_type == hou.attribData.Int:
+        data = int_func(name, int_type=hou.numericData.Int64)
+        values = numpy.frombuffer(data, dtype=numpy.int64)
+
+    else:
+        raise hou.OperationFailed("Attribute must be numeric.")
+
+    if attrib.size() > 1:
+        values = values.reshape(-1, attrib.size())
+
+    return values
+
+
 def _get_attrib_owner(attribute_type):
     """Get an HDK compatible attribute owner value.
 
@@ -249,57 +746,504 @@ def _get_attrib_owner_from_geometry_entity_type(entity_type):
         if issubclass(entity_type, key):
             return value
 
-    # Something went wrong so raise an exception.
-    raise TypeError("Invalid entity type: {}".format(entity_type))
+    # Something went wrong so raise an exception.
+    raise TypeError("Invalid entity type: {}".format(entity_type))
+
+
+def _get_attrib_owner_from_geometry_type(geometry_type):
+    """Get an HDK compatible attribute owner value from a hou.geometryType.
+
+    :param geometry_type: The entity to get a attribute owner for.
+    :type geometry_type: hou.geometryType
+    :return: An HDK attribute owner value.
+    :rtype: int
+
+    """
+    # If the class is a base class in the map then just return it.
+    if geometry_type in _GEOMETRY_TYPE_MAP:
+        return _GEOMETRY_TYPE_MAP[geometry_type]
+
+    # Something went wrong so raise an exception.
+    raise TypeError("Invalid geometry type: {}".format(geometry_type))
+
+
+def _get_dihedral_matrices(source_vector, target_vectors):
+    """Compute matrices which rotate a vector onto each target vector.
+
+    The matrices use the same row vector convention as hou.Matrix3.  Zero
+    length targets result in the identity matrix.
+
+    :param source_vector: The vector to rotate.
+    :type source_vector: numpy.ndarray
+    :param target_vectors: An (N, 3) array of vectors to rotate onto.
+    :type target_vectors: numpy.ndarray
+    :return: An (N, 3, 3) array of rotation matrices.
+    :rtype: numpy.ndarray
+
+    """
+    source = _normalize_vectors(source_vector)
+    targets = _normalize_vectors(target_vectors)
+
+    result = numpy.tile(numpy.eye(3), (len(targets), 1, 1))
+
+    valid = numpy.all(numpy.isfinite(targets), axis=1)
+
+    cosines = numpy.dot(targets, source)
+
+    # Rotate using Rodrigues' formula: I + [v]x + [v]x^2 / (1 + c).
+    rotate = valid.copy()
+    rotate[valid] = cosines[valid] > -1 + 1e-9
+
+    axes = numpy.cross(source, targets[rotate])
+
+    cross_matrices = numpy.zeros((len(axes), 3, 3))
+    cross_matrices[:, 0, 1] = -axes[:, 2]
+    cross_matrices[:, 0, 2] = axes[:, 1]
+    cross_matrices[:, 1, 0] = axes[:, 2]
+    cross_matrices[:, 1, 2] = -axes[:, 0]
+    cross_matrices[:, 2, 0] = -axes[:, 1]
+    cross_matrices[:, 2, 1] = axes[:, 0]
+
+    scales = 1.0 / (1.0 + cosines[rotate])
+
+    result[rotate] += (
+        cross_matrices +
+        numpy.matmul(cross_matrices, cross_matrices) *
+        scales[:, numpy.newaxis, numpy.newaxis]
+    )
+
+    # Opposite targets are a 180 degree rotation around any perpendicular
+    # axis: 2 * outer(p, p) - I.
+    opposite = valid & ~rotate
+
+    if opposite.any():
+        perpendicular = numpy.cross(source, (1.0, 0.0, 0.0))
+
+        if not numpy.any(perpendicular):
+            perpendicular = numpy.cross(source, (0.0, 1.0, 0.0))
+
+        perpendicular = _normalize_vectors(perpendicular)
+
+        result[opposite] = (
+            2 * numpy.outer(perpendicular, perpendicular) - numpy.eye(3)
+        )
+
+    # Convert to the row vector convention.
+    return result.transpose(0, 2, 1)
+
+
+def _get_geometry_element_count(geometry, geometry_type):
+    """Get the number of elements of a type in the geometry.
+
+    :param geometry: The geometry to get the element count for.
+    :type geometry: hou.Geometry
+    :param geometry_type: The type of elements to count.
+    :type geometry_type: hou.geometryType
+    :return: The number of elements of the type.
+    :rtype: int
+
+    """
+    if geometry_type == hou.geometryType.Vertices:
+        return num_vertices(geometry)
+
+    elif geometry_type == hou.geometryType.Points:
+        return num_points(geometry)
+
+    elif geometry_type == hou.geometryType.Primitives:
+        return num_prims(geometry)
+
+    raise TypeError("Invalid geometry type: {}".format(geometry_type))
+
+
+def _get_group_attrib_owner(group):
+    """Get an HDK compatible group attribute type value.
+
+    :param group: The group to get the attribute owner for.
+    :type group: hou.PointGroup|hou.PrimGroup
+    :return: An HDK attribute owner value.
+    :rtype: int
+
+    """
+    try:
+        return _GROUP_ATTRIB_MAP[type(group)]
+
+    except KeyError:
+        raise hou.OperationFailed("Invalid group type")
+
+
+def _get_group_element_count(group):
+    """Get the number of elements which could be in a point or prim group.
+
+    :param group: The group to get the element count for.
+    :type group: hou.PointGroup|hou.PrimGroup
+    :return: The number of points or primitives in the group's geometry.
+    :rtype: int
+
+    """
+    if isinstance(group, hou.PointGroup):
+        return num_points(group.geometry())
+
+    elif isinstance(group, hou.PrimGroup):
+        return num_prims(group.geometry())
+
+    raise hou.TypeError("Group must be a point or primitive group.")
+
+
+def _get_group_element_numbers(group, selection):
+    """Convert a mask or index array into sorted, unique element numbers.
+
+    :param group: The group the elements will be edited in.
+    :type group: hou.PointGroup|hou.PrimGroup
+    :param selection: A boolean mask or an array of element numbers.
+    :type selection: numpy.ndarray|list(bool)|list(int)
+    :return: The contiguous array of selected element numbers.
+    :rtype: numpy.ndarray
+
+    """
+    count = _get_group_element_count(group)
+
+    selection = numpy.asarray(selection)
+
+    if selection.dtype == numpy.bool_:
+        if selection.shape != (count,):
+            raise hou.OperationFailed(
+                "Mask must have one value for each element."
+            )
+
+        numbers = numpy.flatnonzero(selection)
+
+    else:
+        if selection.size and selection.dtype.kind not in "iu":
+            raise hou.OperationFailed("Element numbers must be integers.")
+
+        # Duplicate numbers would cancel out when toggling.
+        numbers = numpy.unique(selection.astype(numpy.int64))
+
+        if len(numbers) and (numbers[0] < 0 or numbers[-1] >= count):
+            raise hou.OperationFailed("Invalid element number.")
+
+    return numpy.ascontiguousarray(numbers, dtype=numpy.int32)
+
+
+def _get_group_type(group):
+    """Get an HDK compatible group type value.
+
+    :param group: The group to get the group type for.
+    :type group: hou.EdgeGroup|hou.PointGroup|hou.PrimGroup
+    :return: An HDK group type value.
+    :rtype: int
+
+    """
+    try:
+        return _GROUP_TYPE_MAP[type(group)]
+
+    except KeyError:
+        raise hou.OperationFailed("Invalid group type")
+
+
+def _get_primitive_metrics(geometry, metric, group=None, attrib_name=None):
+    """Compute a metric for all primitives, or those in a group, at once.
+
+    :param geometry: The geometry to compute the metric for.
+    :type geometry: hou.Geometry
+    :param metric: The name of the metric to compute.
+    :type metric: str
+    :param group: An optional group of primitives to compute the metric for.
+    :type group: hou.PrimGroup
+    :param attrib_name: An optional primitive attribute to store the values in.
+    :type attrib_name: str
+    :return: An array with a row of values for each primitive.
+    :rtype: numpy.ndarray
+
+    """
+    metric_type, size = _PRIM_METRICS[metric]
+
+    if attrib_name:
+        # Make sure the geometry is not read only.
+        if is_geometry_read_only(geometry):
+            raise hou.GeometryPermissionError()
+
+    else:
+        attrib_name = ""
+
+    if group is not None:
+        if not isinstance(group, hou.PrimGroup):
+            raise hou.TypeError("Group is not a primitive group.")
+
+        if group.geometry() != geometry:
+            raise hou.OperationFailed("Group is not on the geometry.")
+
+        count = group_size(group)
+        group_name = group.name()
+
+    else:
+        count = num_prims(geometry)
+        group_name = ""
+
+    result = numpy.zeros((count, size), dtype=numpy.float64)
+
+    if count:
+        success = _cpp_methods.primitiveMetrics(
+            geometry,
+            metric_type,
+            group_name,
+            attrib_name,
+            _get_numpy_pointer(result, ctypes.c_double),
+            count
+        )
+
+        # The primitives didn't match the size of the result.
+        if success == -1:
+            raise hou.OperationFailed("Could not find group primitives.")
+
+        # The attribute couldn't be created, most likely because one with the
+        # same name but a different type already exists.
+        if not success:
+            raise hou.OperationFailed(
+                "Could not add {} attribute.".format(attrib_name)
+            )
+
+    if size == 1:
+        return result[:, 0]
+
+    return result
+
+
+def _get_quaternion_matrices(quaternions):
+    """Compute the rotation matrices of an array of quaternions.
+
+    The matrices use the same row vector convention as
+    hou.Quaternion.extractRotationMatrix3().
+
+    :param quaternions: An (N, 4) array of (x, y, z, w) quaternions.
+    :type quaternions: numpy.ndarray
+    :return: An (N, 3, 3) array of rotation matrices.
+    :rtype: numpy.ndarray
+
+    """
+    quaternions = numpy.asarray(quaternions, dtype=numpy.float64)
+
+    x, y, z, w = quaternions.T
+
+    # Scale by the norm so quaternions don't need to be normalized.
+    scale = 2.0 / numpy.einsum("ni,ni->n", quaternions, quaternions)
+
+    result = numpy.empty((len(quaternions), 3, 3))
+
+    result[:, 0, 0] = 1 - scale * (y * y + z * z)
+    result[:, 0, 1] = scale * (x * y + z * w)
+    result[:, 0, 2] = scale * (x * z - y * w)
+
+    result[:, 1, 0] = scale * (x * y - z * w)
+    result[:, 1, 1] = 1 - scale * (x * x + z * z)
+    result[:, 1, 2] = scale * (y * z + x * w)
+
+    result[:, 2, 0] = scale * (x * z + y * w)
+    result[:, 2, 1] = scale * (y * z - x * w)
+    result[:, 2, 2] = 1 - scale * (x * x + y * y)
+
+    return result
+
+
+def _get_sorted_unique_numbers(numbers):
+    """Sort element numbers and remove any duplicates.
+
+    The C++ functions can return the same element more than once, such as a
+    point shared by several primitives.
+
+    :param numbers: The element numbers.
+    :type numbers: collections.Sequence(int)
+    :return: The sorted, unique element numbers.
+    :rtype: tuple(int)
+
+    """
+    return tuple(sorted(set(numbers)))
+
+
+def _get_string_attrib_element_count(attrib):
+    """Get the number of elements that have values for a string attribute.
+
+    :param attrib: The string attribute.
+    :type attrib: hou.Attrib
+    :return: The number of vertices, points or primitives.
+    :rtype: int
+
+    """
+    if attrib.dataType() != hou.attribData.String:
+        raise hou.OperationFailed("Attribute must be a string.")
+
+    attrib_type = attrib.type()
+    geometry = attrib.geometry()
+
+    if attrib_type == hou.attribType.Vertex:
+        return num_vertices(geometry)
+
+    elif attrib_type == hou.attribType.Point:
+        return num_points(geometry)
+
+    elif attrib_type == hou.attribType.Prim:
+        return num_prims(geometry)
+
+    raise hou.OperationFailed(
+        "Attribute must be a vertex, point or primitive attribute."
+    )
+
+
+def _get_topology_cache_key(geometry, adjacency):
+    """Get the key used to cache a topology adjacency for the geometry.
+
+    :param geometry: The geometry to get the key for.
+    :type geometry: hou.Geometry
+    :param adjacency: The adjacency type.
+    :type adjacency: str
+    :return: The cache key, or None if the geometry can't be cached.
+    :rtype: tuple|None
+
+    """
+    sop_node = geometry.sopNode()
+
+    # Only geometry from a SOP can be reliably identified between calls.
+    if sop_node is None:
+        return None
+
+    return sop_node.path(), adjacency
+
+
+def _get_topology_data_id(geometry):
+    """Get a value identifying the current topology of the geometry.
+
+    :param geometry: The geometry to get the data id for.
+    :type geometry: hou.Geometry
+    :return: A comparable data id.
+    :rtype: tuple
+
+    """
+    return (
+        geometry.topologyDataId(),
+        num_points(geometry),
+        num_prims(geometry),
+    )
+
+
+def _get_hda_libraries(file_path=""):
+    """Get the meta sources and definitions of installed asset libraries.
+
+    :param file_path: An optional library path to get.  If empty, all the
+                      installed libraries are returned.
+    :type file_path: str
+    :return: The meta sources and definitions of each library.  Definitions
+             map (category name, type name) to (is dummy, modification time).
+    :rtype: collections.OrderedDict
+
+    """
+    result = _cpp_methods.getLibraryIndex(file_path)
+
+    libraries = OrderedDict()
+
+    # Empty string arrays cannot be returned so use the definition counts to
+    # determine how many libraries there are.
+    definition_counts = tuple(result.definition_counts)
+
+    paths = tuple(result.paths)
+    meta_sources = tuple(result.meta_sources)
+
+    table_names = tuple(result.table_names)
+    names = tuple(result.names)
+    dummies = tuple(result.dummies)
+    mod_times = tuple(result.mod_times)
+
+    start = 0
+
+    for idx, count in enumerate(definition_counts):
+        definition_range = xrange(start, start + count)
+
+        start += count
+
+        # Libraries can be installed under more than one meta source.  Only
+        # the definitions of the first, which is the one the OTL manager
+        # finds, are kept.
+        if paths[idx] in libraries:
+            library_sources = libraries[paths[idx]][0]
+
+            if meta_sources[idx] not in library_sources:
+                library_sources.append(meta_sources[idx])
+
+            continue
+
+        definitions = OrderedDict(
+            ((table_names[i], names[i]), (bool(dummies[i]), mod_times[i]))
+            for i in definition_range
+        )
+
+        libraries[paths[idx]] = ([meta_sources[idx]], definitions)
 
+    return libraries
 
-def _get_attrib_owner_from_geometry_type(geometry_type):
-    """Get an HDK compatible attribute owner value from a hou.geometryType.
 
-    :param geometry_type: The entity to get a attribute owner for.
-    :type geometry_type: hou.geometryType
-    :return: An HDK attribute owner value.
-    :rtype: int
+def _get_multiparm_values(parm, time=None):
+    """Evaluate all the parameters in a multiparm block in a single call.
+
+    :param parm: The multiparm to get the values for.
+    :type parm: hou.Parm|hou.ParmTuple
+    :param time: The time to evaluate at.  Defaults to the current time.
+    :type time: float
+    :return: The parameter template names, the value of every parameter in
+             instance order and the number of parameters in each instance.
+    :rtype: tuple(tuple(str), list, int)
 
     """
-    # If the class is a base class in the map then just return it.
-    if geometry_type in _GEOMETRY_TYPE_MAP:
-        return _GEOMETRY_TYPE_MAP[geometry_type]
+    if not is_parm_multiparm(parm):
+        raise hou.OperationFailed("Parameter is not a multiparm.")
 
-    # Something went wrong so raise an exception.
-    raise TypeError("Invalid geometry type: {}".format(geometry_type))
+    if isinstance(parm, hou.Parm):
+        parm = parm.tuple()
 
+    if time is None:
+        time = hou.time()
 
-def _get_group_attrib_owner(group):
-    """Get an HDK compatible group attribute type value.
+    node = parm.node()
 
-    :param group: The group to get the attribute owner for.
-    :type group: hou.PointGroup|hou.PrimGroup
-    :return: An HDK attribute owner value.
-    :rtype: int
+    result = _cpp_methods.getMultiParmValues(node, parm.name(), time)
 
-    """
-    try:
-        return _GROUP_ATTRIB_MAP[type(group)]
+    # Convert the arrays once since they are sliced below.
+    numbers = tuple(result.numbers)
+    strings = tuple(result.strings)
 
-    except KeyError:
-        raise hou.OperationFailed("Invalid group type")
+    values = []
 
+    number_idx = 0
+    string_idx = 0
 
-def _get_group_type(group):
-    """Get an HDK compatible group type value.
+    for parm_type, size in zip(result.types, result.sizes):
+        # Ramps are evaluated by name.
+        if parm_type == 3:
+            value = node.parmTuple(strings[string_idx]).evalAtTime(time)
+            string_idx += 1
 
-    :param group: The group to get the group type for.
-    :type group: hou.EdgeGroup|hou.PointGroup|hou.PrimGroup
-    :return: An HDK group type value.
-    :rtype: int
+            values.append(value[0] if len(value) == 1 else value)
+            continue
 
-    """
-    try:
-        return _GROUP_TYPE_MAP[type(group)]
+        if parm_type == 2:
+            value = strings[string_idx:string_idx+size]
+            string_idx += size
 
-    except KeyError:
-        raise hou.OperationFailed("Invalid group type")
+        else:
+            value = numbers[number_idx:number_idx+size]
+            number_idx += size
+
+            if parm_type == 1:
+                value = [int(component) for component in value]
+
+        values.append(value[0] if size == 1 else tuple(value))
+
+    # Only the names of the first block are returned and an empty block
+    # returns a single empty name.
+    if not values:
+        return (), values, 1
+
+    parms_per_instance = len(result.names)
+
+    return tuple(result.names), values, parms_per_instance
 
 
 def _get_nodes_from_paths(paths):
@@ -320,20 +1264,13 @@ def _get_points_from_list(geometry, point_list):
     :param geometry: The geometry to get points for.
     :type geometry: hou.Geometry
     :param point_list: A list of point numbers.
-    :type point_list: list(int)
+    :type point_list: collections.Sequence(int)
     :return: Matching points on the geometry.
-    :rtype: tuple(hou.Point)
+    :rtype: ElementSequence
 
     """
-    # Return a empty tuple if the point list is empty.
-    if not point_list:
-        return ()
-
-    # Convert the list of integers to a space separated string.
-    point_str = ' '.join([str(i) for i in point_list])
-
-    # Glob for the specified points.
-    return geometry.globPoints(point_str)
+    # Index directly into the geometry's points as they are accessed.
+    return ElementSequence(geometry.iterPoints().__getitem__, point_list)
 
 
 def _get_prims_from_list(geometry, prim_list):
@@ -342,20 +1279,112 @@ def _get_prims_from_list(geometry, prim_list):
     :param geometry: The geometry to get prims for.
     :type geometry: hou.Geometry
     :param prim_list: A list of prim numbers.
-    :type prim_list: list(int)
+    :type prim_list: collections.Sequence(int)
     :return: Matching prims on the geometry.
-    :rtype: tuple(hou.Prim)
+    :rtype: ElementSequence
+
+    """
+    # Index directly into the geometry's primitives as they are accessed.
+    return ElementSequence(geometry.iterPrims().__getitem__, prim_list)
+
+
+def _get_vertices_from_list(geometry, vertex_list):
+    """Convert a list of primitive number and vertex index pairs to
+    hou.Vertex objects.
+
+    :param geometry: The geometry to get vertices for.
+    :type geometry: hou.Geometry
+    :param vertex_list: A list of (prim number, vertex index) pairs.
+    :type vertex_list: collections.Sequence(tuple(int))
+    :return: Matching vertices on the geometry.
+    :rtype: ElementSequence
+
+    """
+    prims = geometry.iterPrims()
+
+    return ElementSequence(
+        lambda entry: prims[entry[0]].vertex(entry[1]),
+        vertex_list
+    )
+
+
+def _get_numpy_pointer(array, c_type):
+    """Get a ctypes pointer to the data of a contiguous numpy array.
+
+    The array must stay alive for as long as the pointer is used.
+
+    :param array: The array to get the pointer for.
+    :type array: numpy.ndarray
+    :param c_type: The ctypes type of the array elements.
+    :type c_type: type
+    :return: A pointer to the array data.
+    :rtype: ctypes.POINTER
+
+    """
+    return array.ctypes.data_as(ctypes.POINTER(c_type))
+
+
+def _normalize_vectors(vectors):
+    """Normalize an array of vectors.
+
+    :param vectors: An (N, 3) or (3,) array of vectors.
+    :type vectors: numpy.ndarray
+    :return: The normalized vectors.
+    :rtype: numpy.ndarray
+
+    """
+    vectors = numpy.asarray(vectors, dtype=numpy.float64)
+
+    lengths = numpy.sqrt(numpy.einsum("...i,...i->...", vectors, vectors))
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        return vectors / lengths[..., numpy.newaxis]
+
+
+def _parse_variable_value(value):
+    """Convert a variable value string to the proper Python type.
+
+    :param value: The variable value.
+    :type value: str
+    :return: The converted value.
+    :rtype: type
+
+    """
+    # Since Houdini stores all variable values as strings we use the ast module
+    # to handle parsing the string and returning the proper data type.
+    try:
+        return ast.literal_eval(value)
+
+    # Except against common parsing/evaluating errors and return the raw
+    # value since the type will be a string.
+    except SyntaxError:
+        return value
+
+    except ValueError:
+        return value
+
+
+def _read_variables(names):
+    """Read the current values of multiple variables in a single call.
+
+    :param names: The variable names.
+    :type names: tuple(str)
+    :return: The value of each variable if it exists, otherwise None.
+    :rtype: dict
 
     """
-    # Return a empty tuple if the prim list is empty.
-    if not prim_list:
-        return ()
+    exists = numpy.zeros(len(names), dtype=numpy.int32)
 
-    # Convert the list of integers to a space separated string.
-    prim_str = ' '.join([str(i) for i in prim_list])
+    values = _cpp_methods.getVariables(
+        _build_c_string_array(names),
+        len(names),
+        _get_numpy_pointer(exists, ctypes.c_int)
+    )
 
-    # Glob for the specified prims.
-    return geometry.globPrims(prim_str)
+    return {
+        name: _parse_variable_value(value) if found else None
+        for name, value, found in zip(names, tuple(values), exists)
+    }
 
 
 def _validate_prim_vertex_index(prim, index):
@@ -412,6 +1441,24 @@ def get_global_variable_names(dirty=False):
     return _clean_string_values(var_names)
 
 
+def clear_variable_cache():
+    """Clear the cached variable values and names.
+
+    Values read by get_variables() are cached until they are changed using
+    set_variable(), unset_variable() or emit_var_change(), or the hip file is
+    loaded, cleared or saved.  Call this function after changing variables by
+    other means, such as hou.hscript() or hou.putenv(), or before reading
+    variables which depend on the current frame.
+
+    :return:
+
+    """
+    global _VARIABLE_NAMES_CACHE
+
+    _VARIABLE_CACHE.clear()
+    _VARIABLE_NAMES_CACHE = None
+
+
 def get_variable(name):
     """Returns the value of the named variable.
 
@@ -421,26 +1468,38 @@ def get_variable(name):
     :rtype: str|None
 
     """
-    # If the variable name isn't in list of variables, return None.
-    if name not in get_variable_names():
-        return None
+    return _read_variables((name,))[name]
 
-    # Get the value of the variable.
-    value = _cpp_methods.getVariable(name)
 
-    # Try to convert it to the proper Python type.
-    # Since Houdini stores all variable values as strings we use the ast module
-    # to handle parsing the string and returning the proper data type.
-    try:
-        return ast.literal_eval(value)
+def get_variables(names, cached=True):
+    """Get the values of multiple variables.
 
-    # Except against common parsing/evaluating errors and return the raw
-    # value since the type will be a string.
-    except SyntaxError:
-        return value
+    Any values which aren't already cached are fetched in a single call.  See
+    clear_variable_cache() for when cached values are invalidated.
 
-    except ValueError:
-        return value
+    :param names: The variable names.
+    :type names: list(str)
+    :param cached: Whether or not to use cached values.  If False all the
+                   values are read and the cache is updated.
+    :type cached: bool
+    :return: The value of each variable if it exists, otherwise None.
+    :rtype: collections.OrderedDict
+
+    """
+    names = tuple(names)
+
+    if cached:
+        missing = tuple(
+            set(name for name in names if name not in _VARIABLE_CACHE)
+        )
+
+    else:
+        missing = tuple(set(names))
+
+    if missing:
+        _VARIABLE_CACHE.update(_read_variables(missing))
+
+    return OrderedDict((name, _VARIABLE_CACHE[name]) for name in names)
 
 
 def get_variable_names(dirty=False):
@@ -456,11 +1515,22 @@ def get_variable_names(dirty=False):
     :rtype: tuple(str)
 
     """
+    global _VARIABLE_NAMES_CACHE
+
+    # Dirty variables change with each varchange so are never cached.
+    if not dirty and _VARIABLE_NAMES_CACHE is not None:
+        return _VARIABLE_NAMES_CACHE
+
     # Get all the valid variable names.
     var_names = _cpp_methods.getVariableNames(dirty)
 
     # Remove any empty names.
-    return _clean_string_values(var_names)
+    var_names = _clean_string_values(var_names)
+
+    if not dirty:
+        _VARIABLE_NAMES_CACHE = var_names
+
+    return var_names
 
 
 def set_variable(name, value, local=False):
@@ -475,8 +1545,16 @@ def set_variable(name, value, local=False):
     :return:
 
     """
+    global _VARIABLE_NAMES_CACHE
+
     _cpp_methods.setVariable(name, str(value), local)
 
+    _VARIABLE_CACHE.pop(name, None)
+
+    # Only creating a variable changes the available names.
+    if _VARIABLE_NAMES_CACHE is not None and name not in _VARIABLE_NAMES_CACHE:
+        _VARIABLE_NAMES_CACHE = None
+
 
 def unset_variable(name):
     """Unset a variable.
@@ -488,8 +1566,13 @@ def unset_variable(name):
     :return:
 
     """
+    global _VARIABLE_NAMES_CACHE
+
     _cpp_methods.unsetVariable(name)
 
+    _VARIABLE_CACHE.pop(name, None)
+    _VARIABLE_NAMES_CACHE = None
+
 
 def emit_var_change():
     """Cook any operators using changed variables.
@@ -503,6 +1586,8 @@ def emit_var_change():
     """
     _cpp_methods.varChange()
 
+    clear_variable_cache()
+
 
 def expand_range(pattern):
     """Expand a string range into a tuple of values.
@@ -710,7 +1795,7 @@ def sort_by_values(geometry, geometry_type, values):
     :param geometry_type: The type of geometry to sort.
     :type geometry_type: hou.geometryType
     :param values: The values to sort by.
-    :type values: list(float)
+    :type values: numpy.ndarray|list(float)
     :return:
 
     """
@@ -739,10 +1824,15 @@ def sort_by_values(geometry, geometry_type, values):
 
     attrib_owner = _get_attrib_owner_from_geometry_type(geometry_type)
 
-    # Construct a ctypes double array to pass the values.
-    arr = _build_c_double_array(values)
+    # Convert the values to a contiguous double array that can be passed
+    # directly to C++.
+    arr = numpy.ascontiguousarray(values, dtype=numpy.float64)
 
-    _cpp_methods.sortByValues(geometry, attrib_owner, arr)
+    _cpp_methods.sortByValues(
+        geometry,
+        attrib_owner,
+        _get_numpy_pointer(arr, ctypes.c_double)
+    )
 
 
 def sort_randomly(geometry, geometry_type, seed=0.0):
@@ -940,6 +2030,101 @@ def sort_by_expression(geometry, geometry_type, expression):
     sort_by_values(geometry, geometry_type, values)
 
 
+def sort_by_array_expression(geometry, geometry_type, expression):
+    """Sort points or primitives based on a numpy expression.
+
+    This is a much faster alternative to sort_by_expression().  Rather than
+    evaluating an HScript expression once per element, the Python expression
+    is evaluated a single time with every name in it bound to a numpy array
+    of the corresponding point or primitive attribute values.  Attributes
+    with a single component are 1D arrays, others are (N, size) arrays.  The
+    names 'ptnum' (or 'primnum') and 'numpy' are also available.
+
+    For example, sorting points by height can use "P[:, 1]" instead of "$TY".
+
+    :param geometry: The geometry to sort.
+    :type geometry: hou.Geometry
+    :param geometry_type: The type of geometry to sort.
+    :type geometry_type: hou.geometryType
+    :param expression: The expression to sort by.
+    :type expression: str
+    :return:
+
+    """
+    # Make sure the geometry is not read only.
+    if is_geometry_read_only(geometry):
+        raise hou.GeometryPermissionError()
+
+    if geometry_type == hou.geometryType.Points:
+        count = num_points(geometry)
+        number_name = "ptnum"
+
+    elif geometry_type == hou.geometryType.Primitives:
+        count = num_prims(geometry)
+        number_name = "primnum"
+
+    else:
+        raise hou.OperationFailed(
+            "Geometry type must be points or primitives."
+        )
+
+    try:
+        tree = ast.parse(expression, mode="eval")
+
+    except SyntaxError:
+        raise hou.OperationFailed("Invalid expression: {}".format(expression))
+
+    namespace = {"numpy": numpy}
+
+    # Only read the attributes which are used in the expression.
+    names = set(node.id for node in ast.walk(tree) if isinstance(node, ast.Name))
+
+    for name in names:
+        if name in namespace:
+            continue
+
+        if name == number_name:
+            namespace[name] = numpy.arange(count)
+
+            continue
+
+        attrib_type = hou.attribType.Point
+
+        if geometry_type == hou.geometryType.Primitives:
+            attrib_type = hou.attribType.Prim
+
+        attrib = _find_attrib(geometry, attrib_type, name)
+
+        if attrib is not None:
+            namespace[name] = _get_attrib_values_array(attrib)
+
+    compiled = compile(tree, "<sort expression>", "eval")
+
+    try:
+        values = eval(compiled, {"__builtins__": {}}, namespace)
+
+    # Names which aren't attributes are left unbound.
+    except NameError as inst:
+        raise hou.OperationFailed(
+            "Invalid expression: {} ({})".format(expression, inst)
+        )
+
+    # Allow for expressions which evaluate to a single value.
+    try:
+        values = numpy.broadcast_to(
+            numpy.asarray(values, dtype=numpy.float64),
+            (count,)
+        )
+
+    except (TypeError, ValueError):
+        raise hou.OperationFailed(
+            "Expression must evaluate to a single value or one value per "
+            "element: {}".format(expression)
+        )
+
+    sort_by_values(geometry, geometry_type, values)
+
+
 def create_point_at_position(geometry, position):
     """Create a new point located at a position.
 
@@ -968,7 +2153,7 @@ def create_n_points(geometry, npoints):
     :param npoints: The number of points to create.
     :type npoints: int
     :return: The newly created points.
-    :rtype: tuple(hou.Point)
+    :rtype: ElementSequence
 
     """
     # Make sure the geometry is not read only.
@@ -981,12 +2166,51 @@ def create_n_points(geometry, npoints):
     result = _cpp_methods.createNPoints(geometry, npoints)
 
     # Since the result is only the starting point number we need to
-    # build a starting from that.
-    point_nums = range(result, result+npoints)
+    # build a range starting from that.
+    point_nums = xrange(result, result+npoints)
 
     return _get_points_from_list(geometry, point_nums)
 
 
+def create_points_at_positions(geometry, positions):
+    """Create new points located at an array of positions.
+
+    All the points are created and positioned in a single call which is much
+    faster than creating them one at a time.
+
+    :param geometry: The geometry to create points for.
+    :type geometry: hou.Geometry
+    :param positions: An (N, 3) array of point positions.
+    :type positions: numpy.ndarray
+    :return: The newly created points.
+    :rtype: ElementSequence
+
+    """
+    # Make sure the geometry is not read only.
+    if is_geometry_read_only(geometry):
+        raise hou.GeometryPermissionError()
+
+    # Make sure the positions are contiguous doubles that can be passed
+    # directly to C++.
+    positions = numpy.ascontiguousarray(positions, dtype=numpy.float64)
+
+    if positions.ndim != 2 or positions.shape[1] != 3:
+        raise hou.OperationFailed("Positions must be an (N, 3) array.")
+
+    npoints = len(positions)
+
+    if npoints == 0:
+        raise hou.OperationFailed("Invalid number of points.")
+
+    result = _cpp_methods.createPointsAtPositions(
+        geometry,
+        _get_numpy_pointer(positions, ctypes.c_double),
+        npoints
+    )
+
+    return _get_points_from_list(geometry, xrange(result, result+npoints))
+
+
 def merge_point_group(geometry, group):
     """Merges points from a group into the geometry.
 
@@ -1127,13 +2351,108 @@ def copy_attribute_values(source_element, source_attribs, target_element):
     # Construct a ctypes string array to pass the strings.
     arr = _build_c_string_array(attrib_names)
 
-    _cpp_methods.copyAttributeValues(
+    _cpp_methods.copyAttributeValues(
+        target_geometry,
+        target_owner,
+        target_entity_num,
+        source_geometry,
+        source_owner,
+        source_entity_num,
+        arr,
+        len(attrib_names)
+    )
+
+
+def batch_copy_attribute_values(source_geometry, source_type, source_numbers,
+                                source_attribs, target_geometry, target_type,
+                                target_numbers):
+    """Copy a list of attributes between many pairs of elements at once.
+
+    The value of each attribute on source element source_numbers[i] is copied
+    to target element target_numbers[i].  The attribute mapping is resolved a
+    single time and the pairs are copied in one native loop, which is
+    threaded when only numeric attributes are being copied.  Target numbers
+    must be unique and, when copying within the same geometry, must not also
+    be source numbers.
+
+    If the attributes do not exist on the target geometry they will be
+    created.
+
+    :param source_geometry: The geometry to copy from.
+    :type source_geometry: hou.Geometry
+    :param source_type: The type of the source elements.
+    :type source_type: hou.geometryType
+    :param source_numbers: The source element numbers. Vertices use their
+                           linear numbers.
+    :type source_numbers: numpy.ndarray|list(int)
+    :param source_attribs: A list of attributes to copy.
+    :type source_attribs: list(hou.Attrib)
+    :param target_geometry: The geometry to copy to.
+    :type target_geometry: hou.Geometry
+    :param target_type: The type of the target elements.
+    :type target_type: hou.geometryType
+    :param target_numbers: The target element numbers.
+    :type target_numbers: numpy.ndarray|list(int)
+    :return:
+
+    """
+    # Make sure the target geometry is not read only.
+    if is_geometry_read_only(target_geometry):
+        raise hou.GeometryPermissionError()
+
+    source_numbers = numpy.ascontiguousarray(source_numbers, dtype=numpy.int32)
+    target_numbers = numpy.ascontiguousarray(target_numbers, dtype=numpy.int32)
+
+    if source_numbers.shape != target_numbers.shape or source_numbers.ndim != 1:
+        raise hou.OperationFailed("Source and target numbers must match.")
+
+    # The numbers are used directly as indices by the native copy so make
+    # sure they are all valid.
+    for geometry, geometry_type, numbers in (
+            (source_geometry, source_type, source_numbers),
+            (target_geometry, target_type, target_numbers),
+    ):
+        count = _get_geometry_element_count(geometry, geometry_type)
+
+        if len(numbers) and (numbers.min() < 0 or numbers.max() >= count):
+            raise hou.OperationFailed("Invalid element number.")
+
+    # Pairs are copied in parallel so writing the same target more than once,
+    # or reading an element which is also being written, would be a race.
+    if numpy.unique(target_numbers).size != target_numbers.size:
+        raise hou.OperationFailed("Target numbers must be unique.")
+
+    if source_geometry == target_geometry and source_type == target_type:
+        if numpy.intersect1d(source_numbers, target_numbers).size:
+            raise hou.OperationFailed(
+                "Source and target elements must not overlap."
+            )
+
+    source_owner = _get_attrib_owner_from_geometry_type(source_type)
+    target_owner = _get_attrib_owner_from_geometry_type(target_type)
+
+    # Get the attribute names, ensuring we only use attributes on the
+    # source's geometry.
+    attrib_names = [
+        attrib.name() for attrib in source_attribs
+        if _get_attrib_owner(attrib.type()) == source_owner and
+        attrib.geometry().sopNode() == source_geometry.sopNode()
+    ]
+
+    if not attrib_names or not len(source_numbers):
+        return
+
+    # Construct a ctypes string array to pass the strings.
+    arr = _build_c_string_array(attrib_names)
+
+    _cpp_methods.batchCopyAttributeValues(
         target_geometry,
         target_owner,
-        target_entity_num,
+        _get_numpy_pointer(target_numbers, ctypes.c_int),
         source_geometry,
         source_owner,
-        source_entity_num,
+        _get_numpy_pointer(source_numbers, ctypes.c_int),
+        len(source_numbers),
         arr,
         len(attrib_names)
     )
@@ -1185,7 +2504,7 @@ def point_adjacent_polygons(prim):
     :param prim: The source primitive.
     :type prim: hou.Prim
     :return: Adjacent primitives.
-    :rtype: tuple(hou.Prim)
+    :rtype: ElementSequence
 
     """
     # Get the geometry the primitive belongs to.
@@ -1194,7 +2513,7 @@ def point_adjacent_polygons(prim):
     # Get a list of prim numbers that are point adjacent the prim.
     result = _cpp_methods.pointAdjacentPolygons(geometry, prim.number())
 
-    return _get_prims_from_list(geometry, result)
+    return _get_prims_from_list(geometry, _get_sorted_unique_numbers(result))
 
 
 def edge_adjacent_polygons(prim):
@@ -1203,7 +2522,7 @@ def edge_adjacent_polygons(prim):
     :param prim: The source primitive.
     :type prim: hou.Prim
     :return: Adjacent primitives.
-    :rtype: tuple(hou.Prim)
+    :rtype: ElementSequence
 
     """
     # Get the geometry the primitive belongs to.
@@ -1212,7 +2531,7 @@ def edge_adjacent_polygons(prim):
     # Get a list of prim numbers that are edge adjacent the prim.
     result = _cpp_methods.edgeAdjacentPolygons(geometry, prim.number())
 
-    return _get_prims_from_list(geometry, result)
+    return _get_prims_from_list(geometry, _get_sorted_unique_numbers(result))
 
 
 def connected_prims(point):
@@ -1221,7 +2540,7 @@ def connected_prims(point):
     :param point: The source point.
     :type point: hou.Point
     :return: Connected primitives.
-    :rtype: tuple(hou.Prim)
+    :rtype: ElementSequence
 
     """
     # Get the geometry the point belongs to.
@@ -1230,7 +2549,7 @@ def connected_prims(point):
     # Get a list of primitive numbers that reference the point.
     result = _cpp_methods.connectedPrims(geometry, point.number())
 
-    return _get_prims_from_list(geometry, result)
+    return _get_prims_from_list(geometry, _get_sorted_unique_numbers(result))
 
 
 def connected_points(point):
@@ -1239,7 +2558,7 @@ def connected_points(point):
     :param point: The source point.
     :type point: hou.Point
     :return: Connected points
-    :rtype: tuple(hou.Point)
+    :rtype: ElementSequence
 
     """
     # Get the geometry the point belongs to.
@@ -1248,8 +2567,109 @@ def connected_points(point):
     # Get a list of point numbers that are connected to the point.
     result = _cpp_methods.connectedPoints(geometry, point.number())
 
-    # Glob for the points and return them.
-    return _get_points_from_list(geometry, result)
+    # Points are found once for each primitive sharing the edge.
+    return _get_points_from_list(geometry, _get_sorted_unique_numbers(result))
+
+
+def topology_adjacency(geometry, adjacency="point_points"):
+    """Get the adjacency of every element of the geometry as CSR arrays.
+
+    The adjacent element numbers of element i are found in
+    indices[indptr[i]:indptr[i+1]], sorted in increasing order.  Available
+    adjacencies are:
+
+        point_points: Points sharing an edge with each point.
+        prim_prims: Primitives sharing a point with each primitive.
+        point_vertices: Linear numbers of the vertices referencing each point.
+
+    Results for geometry from a SOP are cached until the topology of the
+    geometry changes so the returned arrays are read only.
+
+    :param geometry: The geometry to get the adjacency for.
+    :type geometry: hou.Geometry
+    :param adjacency: The type of adjacency.
+    :type adjacency: str
+    :return: The indptr and indices arrays.
+    :rtype: tuple(numpy.ndarray)
+
+    """
+    try:
+        adjacency_type, entries_per_vertex = _TOPOLOGY_ADJACENCY_TYPES[
+            adjacency
+        ]
+
+    except KeyError:
+        raise hou.OperationFailed("Invalid adjacency: {}".format(adjacency))
+
+    key = _get_topology_cache_key(geometry, adjacency)
+    data_id = _get_topology_data_id(geometry)
+
+    cached = _TOPOLOGY_CACHE.pop(key, None) if key is not None else None
+
+    # Reuse the cached arrays if the topology hasn't changed and re-insert
+    # them as the most recently used entry.
+    if cached is not None and cached[0] == data_id:
+        _TOPOLOGY_CACHE[key] = cached
+
+        return cached[1], cached[2]
+
+    if adjacency_type == 1:
+        num_elements = num_prims(geometry)
+
+    else:
+        num_elements = num_points(geometry)
+
+    indptr = numpy.zeros(num_elements + 1, dtype=numpy.int32)
+
+    # The adjacency is computed and copied in a single pass when the initial
+    # allocation is large enough, which it always is for polygons.  If it
+    # isn't the required size is returned and the call is repeated.
+    capacity = num_vertices(geometry) * entries_per_vertex
+
+    indices = numpy.zeros(capacity, dtype=numpy.int32)
+
+    if num_elements:
+        total = _cpp_methods.topologyAdjacency(
+            geometry,
+            adjacency_type,
+            _get_numpy_pointer(indptr, ctypes.c_int),
+            capacity,
+            _get_numpy_pointer(indices, ctypes.c_int)
+        )
+
+        if total > capacity:
+            indices = numpy.zeros(total, dtype=numpy.int32)
+
+            _cpp_methods.topologyAdjacency(
+                geometry,
+                adjacency_type,
+                _get_numpy_pointer(indptr, ctypes.c_int),
+                total,
+                _get_numpy_pointer(indices, ctypes.c_int)
+            )
+
+    # Trim any unused entries in place.
+    indices.resize(indptr[-1], refcheck=False)
+
+    indptr.flags.writeable = False
+    indices.flags.writeable = False
+
+    if key is not None:
+        _TOPOLOGY_CACHE[key] = (data_id, indptr, indices)
+
+        while len(_TOPOLOGY_CACHE) > _TOPOLOGY_CACHE_SIZE:
+            _TOPOLOGY_CACHE.popitem(last=False)
+
+    return indptr, indices
+
+
+def clear_topology_adjacency_cache():
+    """Clear all cached topology adjacencies.
+
+    :return:
+
+    """
+    _TOPOLOGY_CACHE.clear()
 
 
 def referencing_vertices(point):
@@ -1258,7 +2678,7 @@ def referencing_vertices(point):
     :param point: The source point.
     :type point: hou.Point
     :return: Referencing vertices
-    :rtype: tuple(hou.Vertex)
+    :rtype: ElementSequence
 
     """
     # Get the geometry the point belongs to.
@@ -1267,13 +2687,7 @@ def referencing_vertices(point):
     # Get an object containing primitive and vertex index information.
     result = _cpp_methods.referencingVertices(geometry, point.number())
 
-    # Construct a list of vertex strings.  Each element has the format:
-    # {prim_num}v{vertex_index}.
-    vertex_strings = ["{}v{}".format(prim, idx)
-                      for prim, idx in zip(result.prims, result.indices)]
-
-    # Glob for the vertices and return them.
-    return geometry.globVertices(' '.join(vertex_strings))
+    return _get_vertices_from_list(geometry, zip(result.prims, result.indices))
 
 
 def string_table_indices(attrib):
@@ -1359,6 +2773,94 @@ def set_vertex_string_attrib_values(geometry, name, values):
     )
 
 
+def string_attrib_table_values(attrib):
+    """Get the values of a string attribute as a string table and indices.
+
+    Every element's value is table[indices[i]], or an empty string when the
+    index is -1.  Each unique string is only returned once which makes this
+    much faster and smaller than getting the strings for all the elements.
+    Only the first component of string tuple attributes is returned.
+
+    :param attrib: The vertex, point or primitive string attribute.
+    :type attrib: hou.Attrib
+    :return: The unique strings and an index into them for each element.
+    :rtype: tuple(tuple(str), numpy.ndarray)
+
+    """
+    count = _get_string_attrib_element_count(attrib)
+
+    attrib_owner = _get_attrib_owner(attrib.type())
+    geometry = attrib.geometry()
+
+    indices = numpy.full(count, -1, dtype=numpy.int32)
+
+    table_size = 0
+
+    if count:
+        table_size = _cpp_methods.stringAttribTableIndices(
+            geometry,
+            attrib_owner,
+            attrib.name(),
+            _get_numpy_pointer(indices, ctypes.c_int)
+        )
+
+    # An empty table cannot be returned from C++ so only fetch it when there
+    # are strings.
+    if table_size:
+        table = tuple(
+            _cpp_methods.stringAttribTable(geometry, attrib_owner, attrib.name())
+        )
+
+    else:
+        table = ()
+
+    return table, indices
+
+
+def set_string_attrib_table_values(attrib, table, indices):
+    """Set the values of a string attribute from a string table and indices.
+
+    Each element is set to table[indices[i]], or an empty string when the
+    index is -1.  Only the first component of string tuple attributes is set.
+
+    :param attrib: The vertex, point or primitive string attribute.
+    :type attrib: hou.Attrib
+    :param table: The unique strings to set.
+    :type table: list(str)
+    :param indices: An index into the table for each element.
+    :type indices: numpy.ndarray|list(int)
+    :return:
+
+    """
+    geometry = attrib.geometry()
+
+    # Make sure the geometry is not read only.
+    if is_geometry_read_only(geometry):
+        raise hou.GeometryPermissionError()
+
+    count = _get_string_attrib_element_count(attrib)
+
+    indices = numpy.ascontiguousarray(indices, dtype=numpy.int32)
+
+    if indices.shape != (count,):
+        raise hou.OperationFailed("Incorrect attribute value sequence size.")
+
+    if count and (indices.min() < -1 or indices.max() >= len(table)):
+        raise hou.OperationFailed("Invalid string table index.")
+
+    if not count:
+        return
+
+    _cpp_methods.setStringAttribTableIndices(
+        geometry,
+        _get_attrib_owner(attrib.type()),
+        attrib.name(),
+        _build_c_string_array(table),
+        len(table),
+        _get_numpy_pointer(indices, ctypes.c_int)
+    )
+
+
 def set_shared_point_string_attrib(geometry, name, value, group=None):
     """Set a string attribute value for points.
 
@@ -1700,6 +3202,95 @@ def primitive_bounding_box(prim):
     )
 
 
+def primitive_areas(geometry, group=None, attrib_name=None):
+    """Get the areas of all the primitives in a single multithreaded call.
+
+    :param geometry: The geometry to get the primitive areas of.
+    :type geometry: hou.Geometry
+    :param group: An optional group of primitives to get the areas of.
+    :type group: hou.PrimGroup
+    :param attrib_name: An optional primitive attribute to store the areas in.
+    :type attrib_name: str
+    :return: The primitive areas.
+    :rtype: numpy.ndarray
+
+    """
+    return _get_primitive_metrics(geometry, "area", group, attrib_name)
+
+
+def primitive_bary_centers(geometry, group=None, attrib_name=None):
+    """Get the barycenters of all the primitives in a single multithreaded
+    call.
+
+    :param geometry: The geometry to get the primitive barycenters of.
+    :type geometry: hou.Geometry
+    :param group: An optional group of primitives to get the barycenters of.
+    :type group: hou.PrimGroup
+    :param attrib_name: An optional primitive attribute to store the
+                        barycenters in.
+    :type attrib_name: str
+    :return: An (N, 3) array of barycenters.
+    :rtype: numpy.ndarray
+
+    """
+    return _get_primitive_metrics(geometry, "bary_center", group, attrib_name)
+
+
+def primitive_bounding_boxes(geometry, group=None, attrib_name=None):
+    """Get the bounding boxes of all the primitives in a single multithreaded
+    call.
+
+    Each row contains the bounds in hou.BoundingBox constructor order:
+    xmin, ymin, zmin, xmax, ymax, zmax.
+
+    :param geometry: The geometry to get the primitive bounding boxes of.
+    :type geometry: hou.Geometry
+    :param group: An optional group of primitives to get the bounds of.
+    :type group: hou.PrimGroup
+    :param attrib_name: An optional primitive attribute to store the bounds in.
+    :type attrib_name: str
+    :return: An (N, 6) array of bounds.
+    :rtype: numpy.ndarray
+
+    """
+    return _get_primitive_metrics(geometry, "bounding_box", group, attrib_name)
+
+
+def primitive_perimeters(geometry, group=None, attrib_name=None):
+    """Get the perimeters of all the primitives in a single multithreaded
+    call.
+
+    :param geometry: The geometry to get the primitive perimeters of.
+    :type geometry: hou.Geometry
+    :param group: An optional group of primitives to get the perimeters of.
+    :type group: hou.PrimGroup
+    :param attrib_name: An optional primitive attribute to store the
+                        perimeters in.
+    :type attrib_name: str
+    :return: The primitive perimeters.
+    :rtype: numpy.ndarray
+
+    """
+    return _get_primitive_metrics(geometry, "perimeter", group, attrib_name)
+
+
+def primitive_volumes(geometry, group=None, attrib_name=None):
+    """Get the volumes of all the primitives in a single multithreaded call.
+
+    :param geometry: The geometry to get the primitive volumes of.
+    :type geometry: hou.Geometry
+    :param group: An optional group of primitives to get the volumes of.
+    :type group: hou.PrimGroup
+    :param attrib_name: An optional primitive attribute to store the volumes
+                        in.
+    :type attrib_name: str
+    :return: The primitive volumes.
+    :rtype: numpy.ndarray
+
+    """
+    return _get_primitive_metrics(geometry, "volume", group, attrib_name)
+
+
 def compute_point_normals(geometry):
     """Computes the point normals for the geometry.
 
@@ -2110,6 +3701,91 @@ def toggle_group_entries(group):
     _cpp_methods.toggleEntries(geometry, group.name(), group_type)
 
 
+def set_group_membership(group, selection):
+    """Set the group to contain exactly the selected elements.
+
+    The selection is either a boolean mask with a value for every point or
+    primitive in the geometry, or an array of element numbers.
+
+    :param group: The group to set membership for.
+    :type group: hou.PointGroup|hou.PrimGroup
+    :param selection: A boolean mask or an array of element numbers.
+    :type selection: numpy.ndarray|list(bool)|list(int)
+    :return:
+
+    """
+    _edit_group_membership(group, selection, "set")
+
+
+def add_to_group(group, selection):
+    """Add the selected elements to the group.
+
+    :param group: The group to add elements to.
+    :type group: hou.PointGroup|hou.PrimGroup
+    :param selection: A boolean mask or an array of element numbers.
+    :type selection: numpy.ndarray|list(bool)|list(int)
+    :return:
+
+    """
+    _edit_group_membership(group, selection, "add")
+
+
+def remove_from_group(group, selection):
+    """Remove the selected elements from the group.
+
+    :param group: The group to remove elements from.
+    :type group: hou.PointGroup|hou.PrimGroup
+    :param selection: A boolean mask or an array of element numbers.
+    :type selection: numpy.ndarray|list(bool)|list(int)
+    :return:
+
+    """
+    _edit_group_membership(group, selection, "remove")
+
+
+def toggle_group_membership(group, selection):
+    """Toggle group membership for the selected elements.
+
+    Duplicate element numbers are only toggled once.
+
+    :param group: The group to toggle membership for.
+    :type group: hou.PointGroup|hou.PrimGroup
+    :param selection: A boolean mask or an array of element numbers.
+    :type selection: numpy.ndarray|list(bool)|list(int)
+    :return:
+
+    """
+    _edit_group_membership(group, selection, "toggle")
+
+
+def group_membership_mask(group):
+    """Get the membership of the group as a boolean mask.
+
+    The mask has a value for every point or primitive in the geometry so masks
+    of groups of the same type can be combined with numpy logical operations
+    and passed back to set_group_membership().
+
+    :param group: The group to get the membership of.
+    :type group: hou.PointGroup|hou.PrimGroup
+    :return: A mask which is True for elements in the group.
+    :rtype: numpy.ndarray
+
+    """
+    count = _get_group_element_count(group)
+
+    result = numpy.zeros(count, dtype=numpy.int32)
+
+    if count:
+        _cpp_methods.groupMembership(
+            group.geometry(),
+            group.name(),
+            _get_group_type(group),
+            _get_numpy_pointer(result, ctypes.c_int)
+        )
+
+    return result.astype(numpy.bool_)
+
+
 def copy_point_group(group, new_group_name):
     """Create a new point group under the new name with the same membership.
 
@@ -2220,6 +3896,70 @@ def prim_groups_share_primitives(group1, group2):
     return _cpp_methods.containsAny(geometry, group1.name(), group2.name(), group_type)
 
 
+def group_statistics(geometry, geometry_type, overlaps=True):
+    """Get the sizes, bounds and overlaps of all point or primitive groups.
+
+    Everything is computed together, which is much faster than calling
+    group_size(), group_bounding_box() and point_groups_share_points() or
+    prim_groups_share_primitives() for each group or pair of groups.
+
+    The bounds are an (N, 6) array of (xmin, ymin, zmin, xmax, ymax, zmax)
+    rows.  Entry [i, j] of the overlap matrix is the number of elements that
+    are in both group i and group j, so its diagonal holds the group sizes.
+    The matrix needs N * N ints, so it can be skipped for geometry with a
+    very large number of groups.
+
+    :param geometry: The geometry to get the group statistics for.
+    :type geometry: hou.Geometry
+    :param geometry_type: The type of groups to get statistics for.
+    :type geometry_type: hou.geometryType
+    :param overlaps: Whether or not to compute the overlap matrix.
+    :type overlaps: bool
+    :return: The groups, their sizes, their bounds and the overlap matrix.
+    :rtype: tuple(tuple(hou.PointGroup|hou.PrimGroup), numpy.ndarray,
+                  numpy.ndarray, numpy.ndarray|None)
+
+    """
+    if geometry_type == hou.geometryType.Points:
+        groups = geometry.pointGroups()
+        group_type = _GROUP_TYPE_MAP[hou.PointGroup]
+
+    elif geometry_type == hou.geometryType.Primitives:
+        groups = geometry.primGroups()
+        group_type = _GROUP_TYPE_MAP[hou.PrimGroup]
+
+    else:
+        raise hou.OperationFailed(
+            "Geometry type must be points or primitives."
+        )
+
+    num_groups = len(groups)
+
+    sizes = numpy.zeros(num_groups, dtype=numpy.int32)
+    bounds = numpy.zeros((num_groups, 6), dtype=numpy.float64)
+
+    if overlaps:
+        overlap_matrix = numpy.zeros((num_groups, num_groups), dtype=numpy.int32)
+        overlaps_pointer = _get_numpy_pointer(overlap_matrix, ctypes.c_int)
+
+    else:
+        overlap_matrix = None
+        overlaps_pointer = None
+
+    if num_groups:
+        _cpp_methods.groupStatistics(
+            geometry,
+            group_type,
+            _build_c_string_array([group.name() for group in groups]),
+            num_groups,
+            _get_numpy_pointer(sizes, ctypes.c_int),
+            _get_numpy_pointer(bounds, ctypes.c_double),
+            overlaps_pointer
+        )
+
+    return tuple(groups), sizes, bounds, overlap_matrix
+
+
 def convert_prim_to_point_group(prim_group, new_group_name=None, destroy=True):
     """Create a new hou.Point group from the primitive group.
 
@@ -2776,35 +4516,48 @@ def get_multiparm_instances(parm):
 
 
 # TODO: Function to get sibling parameters
-def get_multiparm_instance_values(parm):
+def get_multiparm_instance_values(parm, time=None):
     """Return all the parameter values in this multiparm block.
 
-    The values are returned as a tuple of values based on each instance.
+    The values are returned as a tuple of values based on each instance.  All
+    the values are evaluated in a single call.
 
     :param parm: The parm to get the multiparm instances values for.
     :type parm: hou.Parm|hou.ParmTuple
+    :param time: The time to evaluate at.  Defaults to the current time.
+    :type time: float
     :return: All parameter values in the multiparm block.
     :rtype: tuple
 
     """
+    _, values, instances = _get_multiparm_values(parm, time)
 
-    if not is_parm_multiparm(parm):
-        raise hou.OperationFailed("Parameter is not a multiparm.")
+    return tuple(
+        tuple(values[start:start+instances])
+        for start in xrange(0, len(values), instances)
+    )
 
-    if isinstance(parm, hou.Parm):
-        parm = parm.tuple()
 
-    # Get the multiparm parameters.
-    parms = get_multiparm_instances(parm)
+def get_multiparm_columns(parm, time=None):
+    """Return the parameter values in this multiparm block by parameter.
 
-    all_values = []
+    The result maps each parameter's template name, for example "value#", to
+    a tuple of its values for every instance.
 
-    # Iterate over each multiparm instance.
-    for block in parms:
-        values = [parm.eval() for parm in block]
-        all_values.append(tuple(values))
+    :param parm: The parm to get the multiparm values for.
+    :type parm: hou.Parm|hou.ParmTuple
+    :param time: The time to evaluate at.  Defaults to the current time.
+    :type time: float
+    :return: The values of each parameter in the multiparm block.
+    :rtype: collections.OrderedDict
+
+    """
+    names, values, instances = _get_multiparm_values(parm, time)
 
-    return tuple(all_values)
+    return OrderedDict(
+        (name, tuple(values[idx::instances]))
+        for idx, name in enumerate(names)
+    )
 
 
 def disconnect_all_inputs(node):
@@ -3077,6 +4830,62 @@ def vector_contains_nans(vector):
     return False
 
 
+def vector_components_along(vectors, target_vectors):
+    """Calculate the components of an array of vectors along target vectors.
+
+    :param vectors: An (N, 3) array of vectors.
+    :type vectors: numpy.ndarray
+    :param target_vectors: An (N, 3) or (3,) array of vectors to calculate
+                           against.
+    :type target_vectors: numpy.ndarray
+    :return: The component of each vector along its target vector.
+    :rtype: numpy.ndarray
+
+    """
+    vectors = numpy.asarray(vectors, dtype=numpy.float64)
+
+    directions = _normalize_vectors(target_vectors)
+
+    return numpy.einsum("...i,...i->...", vectors, directions)
+
+
+def vector_projections_along(vectors, target_vectors):
+    """Calculate the vector projections of an array of vectors onto others.
+
+    :param vectors: An (N, 3) array of vectors to project.
+    :type vectors: numpy.ndarray
+    :param target_vectors: An (N, 3) or (3,) array of vectors to project
+                           onto.
+    :type target_vectors: numpy.ndarray
+    :return: An (N, 3) array of the vectors projected along the targets.
+    :rtype: numpy.ndarray
+
+    """
+    target_vectors = numpy.asarray(target_vectors, dtype=numpy.float64)
+
+    # The vectors cannot be the zero vector.
+    if not numpy.all(numpy.any(target_vectors != 0, axis=-1)):
+        raise hou.OperationFailed("Supplied vectors must be non-zero.")
+
+    directions = _normalize_vectors(target_vectors)
+
+    components = vector_components_along(vectors, target_vectors)
+
+    return directions * components[..., numpy.newaxis]
+
+
+def vectors_contain_nans(vectors):
+    """Check which vectors in an array contain NaNs.
+
+    :param vectors: An (N, M) array of vectors to check for NaNs.
+    :type vectors: numpy.ndarray
+    :return: Whether or not there are any NaNs in each vector.
+    :rtype: numpy.ndarray
+
+    """
+    return numpy.isnan(numpy.asarray(vectors, dtype=numpy.float64)).any(axis=-1)
+
+
 def vector_compute_dual(vector):
     """Compute the dual of the vector.
 
@@ -3231,6 +5040,137 @@ def build_instance_matrix(position, direction=hou.Vector3(0, 0, 1), pscale=1,
     return pivot_matrix * scale_matrix * alignment_matrix * rot_matrix * trans_matrix
 
 
+def build_lookat_matrices(from_vecs, to_vecs, up_vectors):
+    """Compute an array of lookat matrices.
+
+    This is an array version of build_lookat_matrix().  Each matrix provides
+    the rotates needed for the "from_vecs" vector to look at the "to_vecs"
+    vector, with the -Z axis pointing at the target and the Y axis pointing
+    "up".
+
+    Any of the arguments can be a single vector which is used for all the
+    matrices.
+
+    :param from_vecs: An (N, 3) array of base vectors.
+    :type from_vecs: numpy.ndarray
+    :param to_vecs: An (N, 3) array of target vectors.
+    :type to_vecs: numpy.ndarray
+    :param up_vectors: An (N, 3) array of up vectors.
+    :type up_vectors: numpy.ndarray
+    :return: An (N, 3, 3) array of lookat matrices.
+    :rtype: numpy.ndarray
+
+    """
+    from_vecs = numpy.asarray(from_vecs, dtype=numpy.float64)
+    to_vecs = numpy.asarray(to_vecs, dtype=numpy.float64)
+
+    z_axes = _normalize_vectors(from_vecs - to_vecs)
+    x_axes = _normalize_vectors(numpy.cross(up_vectors, z_axes))
+    y_axes = numpy.cross(z_axes, x_axes)
+
+    return numpy.stack((x_axes, y_axes, z_axes), axis=-2)
+
+
+def build_instance_matrices(positions, directions=(0, 0, 1), pscales=1,
+                            scales=(1, 1, 1), up_vectors=(0, 1, 0),
+                            rots=(0, 0, 0, 1), trans=(0, 0, 0),
+                            pivots=(0, 0, 0), orients=None):
+    """Compute an array of instance transforms.
+
+    This is an array version of build_instance_matrix() which computes all the
+    transforms with numpy, making it suitable for preparing instancing data
+    for large numbers of copies.
+
+    Each argument is an array with a row for each instance or a single value
+    which is used for every instance.  Quaternions are (x, y, z, w) values,
+    matching hou.Quaternion.
+
+    Rows with a zero up vector are oriented with the rotation from the +Z
+    axis to the direction.  If orients are passed they are used instead of the
+    directions and up vectors.
+
+    :param positions: An (N, 3) array of instance positions.
+    :type positions: numpy.ndarray
+    :param directions: An (N, 3) array of directions to orient to.
+    :type directions: numpy.ndarray
+    :param pscales: An (N,) array of uniform scales.
+    :type pscales: numpy.ndarray
+    :param scales: An (N, 3) array of non-uniform scales.
+    :type scales: numpy.ndarray
+    :param up_vectors: An (N, 3) array of up vectors.
+    :type up_vectors: numpy.ndarray
+    :param rots: An (N, 4) array of additional rotation quaternions.
+    :type rots: numpy.ndarray
+    :param trans: An (N, 3) array of additional translations.
+    :type trans: numpy.ndarray
+    :param pivots: An (N, 3) array of local pivots.
+    :type pivots: numpy.ndarray
+    :param orients: An optional (N, 4) array of orientation quaternions.
+    :type orients: numpy.ndarray
+    :return: An (N, 4, 4) array of instance transforms.
+    :rtype: numpy.ndarray
+
+    """
+    positions = numpy.asarray(positions, dtype=numpy.float64).reshape(-1, 3)
+
+    count = len(positions)
+
+    # Scale the non-uniform scales by the uniform scales.
+    scales = (
+        _broadcast_rows(scales, 3, count) *
+        _broadcast_rows(pscales, 1, count)[:, numpy.newaxis]
+    )
+
+    if orients is not None:
+        orients = _broadcast_rows(orients, 4, count)
+
+        alignments = _get_quaternion_matrices(orients)
+
+    else:
+        directions = _broadcast_rows(directions, 3, count)
+        up_vectors = _broadcast_rows(up_vectors, 3, count)
+
+        alignments = build_lookat_matrices(
+            directions,
+            numpy.zeros(3),
+            up_vectors
+        )
+
+        # Rows with a zero up vector, or where the up vector is parallel to
+        # the direction, rotate the +Z axis to the direction instead.
+        dihedral = ~numpy.all(numpy.isfinite(alignments), axis=(1, 2))
+        dihedral |= ~numpy.any(up_vectors != 0, axis=1)
+
+        if dihedral.any():
+            alignments[dihedral] = _get_dihedral_matrices(
+                (0.0, 0.0, 1.0),
+                directions[dihedral]
+            )
+
+    rotations = _get_quaternion_matrices(_broadcast_rows(rots, 4, count))
+
+    # The rows of the alignment are scaled by the scale matrix.
+    linear = numpy.matmul(scales[:, :, numpy.newaxis] * alignments, rotations)
+
+    result = numpy.zeros((count, 4, 4))
+
+    result[:, :3, :3] = linear
+
+    # The pivot is transformed by the linear part before the translation is
+    # applied.
+    pivots = _broadcast_rows(pivots, 3, count)
+
+    result[:, 3, :3] = (
+        numpy.einsum("ni,nij->nj", pivots, linear) +
+        positions +
+        _broadcast_rows(trans, 3, count)
+    )
+
+    result[:, 3, 3] = 1
+
+    return result
+
+
 def is_node_digital_asset(node):
     """Determine if this node is a digital asset.
 
@@ -3245,6 +5185,23 @@ def is_node_digital_asset(node):
     return node.type().definition() is not None
 
 
+def get_hda_library_index():
+    """Get the shared index of installed digital asset libraries.
+
+    The index is built the first time it is needed.
+
+    :return: The library index.
+    :rtype: HDALibraryIndex
+
+    """
+    global _HDA_LIBRARY_INDEX
+
+    if _HDA_LIBRARY_INDEX is None:
+        _HDA_LIBRARY_INDEX = HDALibraryIndex()
+
+    return _HDA_LIBRARY_INDEX
+
+
 def asset_file_meta_source(file_path):
     """Get the meta install location for the file.
 
@@ -3258,10 +5215,7 @@ def asset_file_meta_source(file_path):
     :rtype: str|None
 
     """
-    if file_path not in hou.hda.loadedFiles():
-        return None
-
-    return _cpp_methods.getMetaSource(file_path)
+    return get_hda_library_index().meta_source(file_path)
 
 
 def get_definition_meta_source(definition):
@@ -3291,7 +5245,13 @@ def remove_meta_source(meta_source):
     :rtype: bool
 
     """
-    return _cpp_methods.removeMetaSource(meta_source)
+    result = _cpp_methods.removeMetaSource(meta_source)
+
+    # Removing the meta source uninstalls libraries so rebuild the index.
+    if result and _HDA_LIBRARY_INDEX is not None:
+        _HDA_LIBRARY_INDEX.refresh()
+
+    return result
 
 
 def libraries_in_meta_source(meta_source):
@@ -3303,11 +5263,7 @@ def libraries_in_meta_source(meta_source):
     :rtype: tuple(str)
 
     """
-    # Get the any libraries in the meta source.
-    result = _cpp_methods.getLibrariesInMetaSource(meta_source)
-
-    # Return a tuple of the valid values.
-    return _clean_string_values(result)
+    return get_hda_library_index().libraries_in_meta_source(meta_source)
 
 
 def is_dummy_definition(definition):
@@ -3322,8 +5278,14 @@ def is_dummy_definition(definition):
     :rtype: bool
 
     """
-    return _cpp_methods.isDummyDefinition(
+    return get_hda_library_index().is_dummy_definition(
         definition.libraryFilePath(),
         definition.nodeTypeCategory().name(),
         definition.nodeTypeName()
     )
+
+# =============================================================================
+
+# Cached variables like $HIP are stale once the hip file changes.
+if hasattr(hou.hipFile, "addEventCallback"):
+    hou.hipFile.addEventCallback(_clear_variable_cache_on_hip_event)
@@ -5,18 +5,29 @@ The functions in this module are not mean to be called directly.  This module
 uses Python decorators to attach the functions to the corresponding HOM classes
 and modules they are meant to extend.
 
+The functions are split into separate libraries by domain.  Each library is
+only compiled, or loaded from the inlinecpp cache, when one of its functions is
+first used.
+
 """
 
 # =============================================================================
 # IMPORTS
 # =============================================================================
 
+# Python Imports
+from collections import OrderedDict
+import re
+
 # Houdini Imports
 import inlinecpp
 
+# =============================================================================
+# GLOBALS
 # =============================================================================
 
-_FUNCTION_SOURCES = [
+# Functions which query and modify the Houdini session.
+_SESSION_SOURCES = [
 """
 bool
 isRendering()
@@ -60,9 +71,11 @@ getGlobalVariables(int dirty=0)
 """,
 
 """
-char *
-getVariable(const char *name)
+StringArray
+getVariables(const char **names, int num_names, int *exists)
 {
+    std::vector<std::string>    result;
+
     OP_CommandManager           *cmd;
     OP_Director                 *director;
 
@@ -74,9 +87,19 @@ getVariable(const char *name)
     // Get the command manager.
     cmd = director->getCommandManager();
 
-    cmd->getVariable(name, value);
+    for (int i=0; i < num_names; ++i)
+    {
+        value = "";
+
+        exists[i] = cmd->getVariable(names[i], value);
 
-    return strdup(value.buffer());
+        result.push_back(value.toStdString());
+    }
+
+    // Check for an empty vector.
+    validateStringVector(result);
+
+    return result;
 }
 """,
 
@@ -255,33 +278,11 @@ expandRange(const char *pattern)
 
     return values;
 }
-""",
-
-"""
-const char *
-getAuthor(OP_Node *node)
-{
-    const OP_Stat &stat = node->getStat();
-    return stat.getAuthor();
-}
-""",
-
 """
-void
-packGeometry(GU_Detail *source, GU_Detail *target)
-{
-    GU_DetailHandle gdh;
-    gdh.allocateAndSet(source);
-
-    GU_ConstDetailHandle const_handle(gdh);
-
-    GU_PrimPacked *prim = GU_PackedGeometry::packGeometry(
-        *target,
-        const_handle
-    );
-}
-""",
+]
 
+# Functions which sort geometry elements.
+_SORT_SOURCES = [
 """
 void
 sortByAttribute(GU_Detail *gdp,
@@ -434,37 +435,24 @@ sortByValues(GU_Detail *gdp, int attribute_type, fpreal *values)
             break;
     }
 }
-""",
-
 """
-void
-setIcon(OP_Operator *op, const char *icon_name)
-{
-    op->setIconName(icon_name);
-}
-""",
+]
 
+# Functions which create, query and modify geometry.
+_GEOMETRY_SOURCES = [
 """
 void
-setDefaultIcon(OP_Operator *op)
+packGeometry(GU_Detail *source, GU_Detail *target)
 {
-    op->setDefaultIconName();
-}
-""",
+    GU_DetailHandle gdh;
+    gdh.allocateAndSet(source);
 
-"""
-bool
-isSubnetType(OP_Operator *op)
-{
-    return op->getIsPrimarySubnetType();
-}
-""",
+    GU_ConstDetailHandle const_handle(gdh);
 
-"""
-bool
-isPython(OP_Operator *op)
-{
-    return op->getScriptIsPython();
+    GU_PrimPacked *prim = GU_PackedGeometry::packGeometry(
+        *target,
+        const_handle
+    );
 }
 """,
 
@@ -499,6 +487,30 @@ createNPoints(GU_Detail *gdp, int npoints)
 }
 """,
 
+"""
+int
+createPointsAtPositions(GU_Detail *gdp, const double *positions, int npoints)
+{
+    GA_Offset                   start;
+
+    // Build a block of points.
+    start = gdp->appendPointBlock(npoints);
+
+    // Set the position for each of the new points.  The offsets of a newly
+    // appended block are contiguous.
+    for (int i=0; i < npoints; ++i)
+    {
+        gdp->setPos3(
+            start + i,
+            UT_Vector3D(positions[i*3], positions[i*3+1], positions[i*3+2])
+        );
+    }
+
+    // Return the starting point number.
+    return gdp->pointIndex(start);
+}
+""",
+
 """
 void
 mergePointGroup(GU_Detail *gdp, const GU_Detail *src, const char *group_name)
@@ -656,6 +668,107 @@ copyAttributeValues(GU_Detail *dest_gdp,
 }
 """,
 
+"""
+void
+batchCopyAttributeValues(GU_Detail *dest_gdp,
+                         int dest_entity_type,
+                         const int *dest_entity_nums,
+                         const GU_Detail *src_gdp,
+                         int src_entity_type,
+                         const int *src_entity_nums,
+                         int num_pairs,
+                         const char **attribute_names,
+                         int num_attribs)
+{
+    GA_AttributeOwner           dest_owner, src_owner;
+
+    GA_Attribute                *dest_attrib;
+    const GA_Attribute          *attrib;
+
+    UT_Array<GA_Attribute *>    dest_attribs;
+    UT_String                   attr_name;
+
+    bool                        threadable;
+
+    dest_owner = static_cast<GA_AttributeOwner>(dest_entity_type);
+    src_owner = static_cast<GA_AttributeOwner>(src_entity_type);
+
+    // Build the attribute reference map between the geometry once for all
+    // the pairs.
+    GA_AttributeRefMap hmap(*dest_gdp, src_gdp);
+
+    // Copying numeric values to different elements can be done in parallel.
+    // Other attribute types, like strings, share data between elements so
+    // must be copied serially.
+    threadable = true;
+
+    for (int i=0; i < num_attribs; ++i)
+    {
+        attr_name = attribute_names[i];
+
+        attrib = src_gdp->findAttribute(src_owner, attr_name);
+
+        if (attrib)
+        {
+            dest_attrib = dest_gdp->findAttribute(
+                dest_owner,
+                attrib->getScope(),
+                attrib->getName()
+            );
+
+            if (!dest_attrib)
+            {
+                dest_attrib = dest_gdp->getAttributes().cloneAttribute(
+                    dest_owner,
+                    attrib->getName(),
+                    *attrib,
+                    true
+                );
+            }
+
+            if (!GA_ATINumeric::isType(dest_attrib))
+            {
+                threadable = false;
+            }
+
+            // Make sure no pages are shared so different threads can
+            // write to different elements.
+            dest_attrib->hardenAllPages();
+
+            hmap.append(dest_attrib, attrib);
+            dest_attribs.append(dest_attrib);
+        }
+    }
+
+    auto copy_range = [&](const UT_BlockedRange<exint> &range)
+    {
+        GA_Offset               dest_off, src_off;
+
+        for (exint i=range.begin(); i != range.end(); ++i)
+        {
+            dest_off = getElementOffset(dest_gdp, dest_owner, dest_entity_nums[i]);
+            src_off = getElementOffset(src_gdp, src_owner, src_entity_nums[i]);
+
+            hmap.copyValue(dest_owner, dest_off, src_owner, src_off);
+        }
+    };
+
+    if (threadable)
+    {
+        UTparallelFor(UT_BlockedRange<exint>(0, num_pairs), copy_range);
+    }
+    else
+    {
+        copy_range(UT_BlockedRange<exint>(0, num_pairs));
+    }
+
+    for (exint i=0; i < dest_attribs.entries(); ++i)
+    {
+        dest_attribs(i)->bumpDataId();
+    }
+}
+""",
+
 """
 void
 copyPointAttributeValues(GU_Detail *dest_gdp,
@@ -884,6 +997,93 @@ connectedPoints(const GU_Detail *gdp, int pt_num)
 }
 """,
 
+"""
+int
+topologyAdjacency(const GU_Detail *gdp,
+                  int adjacency_type,
+                  int *offsets,
+                  int capacity,
+                  int *indices)
+{
+    exint                       num_chunks, num_elements, total;
+
+    // Primitive adjacency has a row per primitive, the others a row per
+    // point.
+    if (adjacency_type == 1)
+    {
+        num_elements = gdp->getNumPrimitives();
+    }
+    else
+    {
+        num_elements = gdp->getNumPoints();
+    }
+
+    // The elements are split into chunks which each store the adjacency of
+    // their elements contiguously so the topology is only walked once and
+    // each chunk can be copied straight into the indices.
+    num_chunks = SYSmin(num_elements, (exint)UT_Thread::getNumProcessors() * 4);
+
+    UT_Array<UT_IntArray>       chunks(num_chunks, num_chunks);
+
+    UTparallelForEachNumber(
+        num_chunks,
+        [&](const UT_BlockedRange<exint> &range)
+        {
+            UT_IntArray                 adjacent;
+
+            for (exint chunk=range.begin(); chunk != range.end(); ++chunk)
+            {
+                exint start = num_elements * chunk / num_chunks;
+                exint end = num_elements * (chunk + 1) / num_chunks;
+
+                for (exint i=start; i != end; ++i)
+                {
+                    getElementAdjacency(gdp, adjacency_type, i, adjacent);
+
+                    offsets[i + 1] = adjacent.entries();
+                    chunks(chunk).concat(adjacent);
+                }
+            }
+        }
+    );
+
+    offsets[0] = 0;
+
+    for (exint i=0; i < num_elements; ++i)
+    {
+        offsets[i + 1] += offsets[i];
+    }
+
+    total = offsets[num_elements];
+
+    // Return the required size without copying anything if the indices
+    // are too small.
+    if (total > capacity)
+    {
+        return total;
+    }
+
+    UTparallelForEachNumber(
+        num_chunks,
+        [&](const UT_BlockedRange<exint> &range)
+        {
+            for (exint chunk=range.begin(); chunk != range.end(); ++chunk)
+            {
+                const UT_IntArray &adjacent = chunks(chunk);
+                exint start = num_elements * chunk / num_chunks;
+
+                for (exint j=0; j < adjacent.entries(); ++j)
+                {
+                    indices[offsets[start] + j] = adjacent(j);
+                }
+            }
+        }
+    );
+
+    return total;
+}
+""",
+
 """
 VertexMap
 referencingVertices(const GU_Detail *gdp, int pt_num)
@@ -927,6 +1127,128 @@ referencingVertices(const GU_Detail *gdp, int pt_num)
 }
 """,
 
+"""
+int
+stringAttribTableIndices(const GU_Detail *gdp,
+                         int attribute_type,
+                         const char *attrib_name,
+                         int *indices)
+{
+    UT_StringArray              strings;
+    UT_IntArray                 handle_map;
+
+    GA_AttributeOwner owner = static_cast<GA_AttributeOwner>(attribute_type);
+
+    const GA_Attribute *attrib = gdp->findStringTuple(owner, attrib_name);
+
+    const GA_AIFSharedStringTuple *s_t = attrib->getAIFSharedStringTuple();
+
+    getStringTableMap(attrib, strings, handle_map);
+
+    UTparallelFor(
+        UT_BlockedRange<exint>(0, gdp->getIndexMap(owner).indexSize()),
+        [&](const UT_BlockedRange<exint> &range)
+        {
+            GA_StringIndexType          handle;
+
+            for (exint i=range.begin(); i != range.end(); ++i)
+            {
+                handle = s_t->getHandle(
+                    attrib,
+                    getElementOffset(gdp, owner, i),
+                    0
+                );
+
+                // Elements without a string use -1.
+                if (handle < 0 || handle >= handle_map.entries())
+                {
+                    indices[i] = -1;
+                }
+                else
+                {
+                    indices[i] = handle_map(handle);
+                }
+            }
+        }
+    );
+
+    return strings.entries();
+}
+""",
+
+"""
+StringArray
+stringAttribTable(const GU_Detail *gdp,
+                  int attribute_type,
+                  const char *attrib_name)
+{
+    std::vector<std::string>    result;
+
+    UT_StringArray              strings;
+    UT_IntArray                 handle_map;
+
+    GA_AttributeOwner owner = static_cast<GA_AttributeOwner>(attribute_type);
+
+    const GA_Attribute *attrib = gdp->findStringTuple(owner, attrib_name);
+
+    getStringTableMap(attrib, strings, handle_map);
+
+    for (exint i=0; i < strings.entries(); ++i)
+    {
+        result.push_back(strings(i).toStdString());
+    }
+
+    validateStringVector(result);
+
+    return result;
+}
+""",
+
+"""
+void
+setStringAttribTableIndices(GU_Detail *gdp,
+                            int attribute_type,
+                            const char *attrib_name,
+                            const char **strings,
+                            int num_strings,
+                            const int *indices)
+{
+    const GA_AIFSharedStringTuple       *s_t;
+
+    GA_AttributeOwner owner = static_cast<GA_AttributeOwner>(attribute_type);
+
+    GA_Attribute *attrib = gdp->findStringTuple(owner, attrib_name);
+
+    s_t = attrib->getAIFSharedStringTuple();
+
+    // Add each table string a single time and set the elements using the
+    // resulting handles so the string table is only searched once per
+    // string rather than once per element.
+    UT_Array<GA_StringIndexType> handles(num_strings, num_strings);
+
+    for (int i=0; i < num_strings; ++i)
+    {
+        handles(i) = s_t->addString(attrib, strings[i]);
+    }
+
+    // Writing to the shared string table is not thread safe.  Only the
+    // first component of string tuple attributes is set.
+    exint num_elements = gdp->getIndexMap(owner).indexSize();
+
+    for (exint i=0; i < num_elements; ++i)
+    {
+        s_t->setHandle(
+            attrib,
+            getElementOffset(gdp, owner, i),
+            indices[i] < 0 ? GA_INVALID_STRING_INDEX : handles(indices[i]),
+            0
+        );
+    }
+
+    attrib->bumpDataId();
+}
+""",
+
 """
 IntArray
 getStringTableIndices(const GU_Detail *gdp, int attribute_type, const char *attrib_name)
@@ -1195,82 +1517,180 @@ baryCenter(const GU_Detail *gdp, unsigned prim_num)
 """,
 
 """
-void
-reversePrimitive(const GU_Detail *gdp, unsigned prim_num)
+int
+primitiveMetrics(const GU_Detail *gdp,
+                 int metric,
+                 const char *group_name,
+                 const char *attrib_name,
+                 double *result,
+                 int num_results)
 {
-    GEO_Primitive               *prim;
+    const GA_PrimitiveGroup     *group = 0;
 
-    prim = (GEO_Primitive *)gdp->getPrimitiveByIndex(prim_num);
-
-    prim->reverse();
-}
-""",
+    GA_Attribute                *attrib = 0;
+    GA_OffsetList               offsets;
 
-"""
-void
-makeUnique(GU_Detail *gdp, unsigned prim_num)
-{
-    GEO_Primitive               *prim;
+    int                         size;
 
-    prim = (GEO_Primitive *)gdp->getPrimitiveByIndex(prim_num);
+    // The number of values each metric produces.
+    switch (metric)
+    {
+        // Barycenter.
+        case 3:
+            size = 3;
+            break;
 
-    gdp->uniquePrimitive(prim);
-}
-""",
+        // Bounding box.
+        case 4:
+            size = 6;
+            break;
 
-"""
-bool
-renameGroup(GU_Detail *gdp, const char *from_name, const char *to_name, int group_type)
-{
-    GA_GroupType owner = static_cast<GA_GroupType>(group_type);
+        // Area, perimeter and volume.
+        default:
+            size = 1;
+            break;
+    }
 
-    GA_GroupTable *table = gdp->getGroupTable(owner);
+    if (strlen(group_name) > 0)
+    {
+        group = gdp->findPrimitiveGroup(group_name);
+    }
 
-    return table->renameGroup(from_name, to_name);
-}
-""",
+    // Gather the primitive offsets up front so the results can be
+    // computed in parallel.
+    for (GA_Iterator it(gdp->getPrimitiveRange(group)); !it.atEnd(); ++it)
+    {
+        offsets.append(*it);
+    }
 
-"""
-FloatArray
-groupBoundingBox(const GU_Detail *gdp, int group_type, const char *group_name)
-{
-    std::vector<double>         result;
+    // Don't write past the end of the result buffer if the primitives don't
+    // match what it was sized for, such as when the group wasn't found.
+    if (offsets.entries() != num_results)
+    {
+        return -1;
+    }
 
-    const GA_Group              *group;
+    // The Python wrapper makes sure the geometry is writable before an
+    // attribute name is passed.
+    if (strlen(attrib_name) > 0)
+    {
+        attrib = const_cast<GU_Detail *>(gdp)->addFloatTuple(
+            GA_ATTRIB_PRIMITIVE,
+            attrib_name,
+            size
+        );
+
+        // An existing attribute with the same name but an incompatible type
+        // can't be written to.
+        if (!attrib)
+        {
+            return 0;
+        }
 
-    UT_BoundingBox              bbox;
+        // Harden all the pages so different threads can safely write to
+        // different primitives.
+        attrib->hardenAllPages();
+    }
 
-    GA_GroupType type = static_cast<GA_GroupType>(group_type);
+    GA_RWHandleF attrib_h(attrib);
 
-    switch (type)
+    if (attrib && (attrib_h.isInvalid() || attrib_h.getTupleSize() < size))
     {
-        // Point group.
-        case GA_GROUP_POINT:
-            group = gdp->findPointGroup(group_name);
-            break;
+        return 0;
+    }
 
-        // Prim group.
-        case GA_GROUP_PRIMITIVE:
-            group = gdp->findPrimitiveGroup(group_name);
-            break;
+    UTparallelFor(
+        UT_BlockedRange<exint>(0, offsets.entries()),
+        [&](const UT_BlockedRange<exint> &range)
+        {
+            const GEO_Primitive         *prim;
 
-        // Edge group.
-        case GA_GROUP_EDGE:
-            group = gdp->findEdgeGroup(group_name);
-            break;
+            UT_BoundingBox              bbox;
+            UT_Vector3                  center;
+
+            double                      *values;
+
+            for (exint i=range.begin(); i != range.end(); ++i)
+            {
+                prim = gdp->getGEOPrimitive(offsets(i));
+
+                values = result + i * size;
+
+                switch (metric)
+                {
+                    case 0:
+                        values[0] = prim->calcArea();
+                        break;
+
+                    case 1:
+                        values[0] = prim->calcPerimeter();
+                        break;
+
+                    case 2:
+                        values[0] = prim->calcVolume(UT_Vector3(0, 0, 0));
+                        break;
+
+                    case 3:
+                        center = prim->baryCenter();
+
+                        values[0] = center.x();
+                        values[1] = center.y();
+                        values[2] = center.z();
+                        break;
+
+                    case 4:
+                        prim->getBBox(&bbox);
+
+                        values[0] = bbox.xmin();
+                        values[1] = bbox.ymin();
+                        values[2] = bbox.zmin();
+                        values[3] = bbox.xmax();
+                        values[4] = bbox.ymax();
+                        values[5] = bbox.zmax();
+                        break;
+                }
+
+                if (attrib_h.isValid())
+                {
+                    for (int j=0; j < size; ++j)
+                    {
+                        attrib_h.set(offsets(i), j, values[j]);
+                    }
+                }
+            }
+        }
+    );
+
+    if (attrib)
+    {
+        attrib->bumpDataId();
     }
 
-    gdp->getGroupBBox(&bbox, group);
+    return 1;
+}
+""",
 
-    result.push_back(bbox.xmin());
-    result.push_back(bbox.ymin());
-    result.push_back(bbox.zmin());
+"""
+void
+reversePrimitive(const GU_Detail *gdp, unsigned prim_num)
+{
+    GEO_Primitive               *prim;
 
-    result.push_back(bbox.xmax());
-    result.push_back(bbox.ymax());
-    result.push_back(bbox.zmax());
+    prim = (GEO_Primitive *)gdp->getPrimitiveByIndex(prim_num);
 
-    return result;
+    prim->reverse();
+}
+""",
+
+"""
+void
+makeUnique(GU_Detail *gdp, unsigned prim_num)
+{
+    GEO_Primitive               *prim;
+
+    prim = (GEO_Primitive *)gdp->getPrimitiveByIndex(prim_num);
+
+    gdp->uniquePrimitive(prim);
 }
 """,
 
@@ -1349,16 +1769,6 @@ convexPolygons(GU_Detail *gdp, unsigned maxpts=3)
 }
 """,
 
-"""
-void
-destroyEmptyGroups(GU_Detail *gdp, int attribute_type)
-{
-    GA_AttributeOwner owner = static_cast<GA_AttributeOwner>(attribute_type);
-
-    gdp->destroyEmptyGroups(owner);
-}
-""",
-
 """
 void
 destroyUnusedPoints(GU_Detail *gdp, const char *group_name)
@@ -1398,6 +1808,115 @@ uniquePoints(GU_Detail *gdp, const char *group_name)
 }
 """,
 
+"""
+void
+clip(GU_Detail *gdp,
+     UT_DMatrix4 *xform,
+     UT_Vector3D *normal,
+     float dist,
+     const char *group_name)
+{
+    GA_PrimitiveGroup           *group = 0;
+
+    UT_Matrix4 mat(*xform);
+    UT_Vector3 dir(*normal);
+
+    // Invert the matrix to move the geometry from our cutting location to the
+    // origin and transform it.
+    mat.invert();
+    gdp->transform(mat);
+
+    // Find the primitive group if necessary.
+    if (group_name)
+    {
+        group = gdp->findPrimitiveGroup(group_name);
+    }
+
+    // Construct a new GQ Detail to do the clipping.
+    GQ_Detail *gqd = new GQ_Detail(gdp, group);
+
+    // Clip the geometry.
+    gqd->clip(dir, -dist, 0);
+
+    // Remove the detail.
+    delete gqd;
+
+    // Invert the matrix again and move the geometry back to its original
+    // position.
+    mat.invert();
+    gdp->transform(mat);
+}
+"""
+]
+
+# Functions which query and modify geometry groups.
+_GROUP_SOURCES = [
+"""
+bool
+renameGroup(GU_Detail *gdp, const char *from_name, const char *to_name, int group_type)
+{
+    GA_GroupType owner = static_cast<GA_GroupType>(group_type);
+
+    GA_GroupTable *table = gdp->getGroupTable(owner);
+
+    return table->renameGroup(from_name, to_name);
+}
+""",
+
+"""
+FloatArray
+groupBoundingBox(const GU_Detail *gdp, int group_type, const char *group_name)
+{
+    std::vector<double>         result;
+
+    const GA_Group              *group;
+
+    UT_BoundingBox              bbox;
+
+    GA_GroupType type = static_cast<GA_GroupType>(group_type);
+
+    switch (type)
+    {
+        // Point group.
+        case GA_GROUP_POINT:
+            group = gdp->findPointGroup(group_name);
+            break;
+
+        // Prim group.
+        case GA_GROUP_PRIMITIVE:
+            group = gdp->findPrimitiveGroup(group_name);
+            break;
+
+        // Edge group.
+        case GA_GROUP_EDGE:
+            group = gdp->findEdgeGroup(group_name);
+            break;
+    }
+
+    gdp->getGroupBBox(&bbox, group);
+
+    result.push_back(bbox.xmin());
+    result.push_back(bbox.ymin());
+    result.push_back(bbox.zmin());
+
+    result.push_back(bbox.xmax());
+    result.push_back(bbox.ymax());
+    result.push_back(bbox.zmax());
+
+    return result;
+}
+""",
+
+"""
+void
+destroyEmptyGroups(GU_Detail *gdp, int attribute_type)
+{
+    GA_AttributeOwner owner = static_cast<GA_AttributeOwner>(attribute_type);
+
+    gdp->destroyEmptyGroups(owner);
+}
+""",
+
 """
 int
 groupSize(const GU_Detail *gdp, const char *group_name, int group_type)
@@ -1511,33 +2030,133 @@ toggleEntries(GU_Detail *gdp, const char *group_name, int group_type)
 
 """
 void
-copyGroup(GU_Detail *gdp,
-          int group_type,
-          const char *group_name,
-          const char *new_group_name)
+editGroupMembership(GU_Detail *gdp,
+                    const char *group_name,
+                    int group_type,
+                    int mode,
+                    const int *elem_nums,
+                    int num_elems)
 {
     GA_AttributeOwner           owner;
-    GA_ElementGroup             *new_group;
-    const GA_ElementGroup       *group;
+    GA_ElementGroup             *group;
+    GA_Offset                   elem_offset;
 
-    owner = static_cast<GA_AttributeOwner>(group_type);
+    GA_GroupType type = static_cast<GA_GroupType>(group_type);
 
-    // Find the current group.
-    group = gdp->findElementGroup(owner, group_name);
+    switch (type)
+    {
+        case GA_GROUP_POINT:
+            group = gdp->findPointGroup(group_name);
+            owner = GA_ATTRIB_POINT;
+            break;
 
-    // Create the new group.
-    new_group = gdp->createElementGroup(owner, new_group_name);
+        case GA_GROUP_PRIMITIVE:
+            group = gdp->findPrimitiveGroup(group_name);
+            owner = GA_ATTRIB_PRIMITIVE;
+            break;
+    }
 
-    // Copy the membership to the new group.
-    new_group->copyMembership(*group);
-}
-""",
+    // Setting the membership replaces the existing entries.
+    if (mode == 0)
+    {
+        group->clear();
+    }
 
-"""
-bool
-containsAny(const GU_Detail *gdp,
-            const char *group_name,
-            const char *other_group_name,
+    for (int i=0; i < num_elems; ++i)
+    {
+        elem_offset = getElementOffset(gdp, owner, elem_nums[i]);
+
+        switch (mode)
+        {
+            case 0:
+            case 1:
+                group->addOffset(elem_offset);
+                break;
+
+            case 2:
+                group->removeOffset(elem_offset);
+                break;
+
+            case 3:
+                group->toggleOffset(elem_offset);
+                break;
+        }
+    }
+}
+""",
+
+"""
+void
+groupMembership(const GU_Detail *gdp,
+                const char *group_name,
+                int group_type,
+                int *result)
+{
+    GA_AttributeOwner           owner;
+    const GA_ElementGroup       *group;
+    exint                       num_elems;
+
+    GA_GroupType type = static_cast<GA_GroupType>(group_type);
+
+    switch (type)
+    {
+        case GA_GROUP_POINT:
+            group = gdp->findPointGroup(group_name);
+            owner = GA_ATTRIB_POINT;
+            num_elems = gdp->getNumPoints();
+            break;
+
+        case GA_GROUP_PRIMITIVE:
+            group = gdp->findPrimitiveGroup(group_name);
+            owner = GA_ATTRIB_PRIMITIVE;
+            num_elems = gdp->getNumPrimitives();
+            break;
+    }
+
+    UTparallelFor(
+        UT_BlockedRange<exint>(0, num_elems),
+        [&](const UT_BlockedRange<exint> &range)
+        {
+            for (exint i=range.begin(); i != range.end(); ++i)
+            {
+                result[i] = group->containsOffset(
+                    getElementOffset(gdp, owner, i)
+                );
+            }
+        }
+    );
+}
+""",
+
+"""
+void
+copyGroup(GU_Detail *gdp,
+          int group_type,
+          const char *group_name,
+          const char *new_group_name)
+{
+    GA_AttributeOwner           owner;
+    GA_ElementGroup             *new_group;
+    const GA_ElementGroup       *group;
+
+    owner = static_cast<GA_AttributeOwner>(group_type);
+
+    // Find the current group.
+    group = gdp->findElementGroup(owner, group_name);
+
+    // Create the new group.
+    new_group = gdp->createElementGroup(owner, new_group_name);
+
+    // Copy the membership to the new group.
+    new_group->copyMembership(*group);
+}
+""",
+
+"""
+bool
+containsAny(const GU_Detail *gdp,
+            const char *group_name,
+            const char *other_group_name,
             int group_type)
 {
     const GA_ElementGroup       *group;
@@ -1570,6 +2189,137 @@ containsAny(const GU_Detail *gdp,
 }
 """,
 
+"""
+void
+groupStatistics(const GU_Detail *gdp,
+                int group_type,
+                const char **group_names,
+                int num_groups,
+                int *sizes,
+                double *bounds,
+                int *overlaps)
+{
+    std::vector<const GA_ElementGroup *> groups(num_groups);
+
+    GA_Size                     num_offsets;
+
+    GA_GroupType type = static_cast<GA_GroupType>(group_type);
+
+    for (int i=0; i < num_groups; ++i)
+    {
+        switch (type)
+        {
+            case GA_GROUP_POINT:
+                groups[i] = gdp->findPointGroup(group_names[i]);
+                break;
+
+            case GA_GROUP_PRIMITIVE:
+                groups[i] = gdp->findPrimitiveGroup(group_names[i]);
+                break;
+        }
+    }
+
+    if (type == GA_GROUP_POINT)
+    {
+        num_offsets = gdp->getNumPointOffsets();
+    }
+    else
+    {
+        num_offsets = gdp->getNumPrimitiveOffsets();
+    }
+
+    // Compute the size and bounds of each group.
+    UTparallelFor(
+        UT_BlockedRange<exint>(0, num_groups),
+        [&](const UT_BlockedRange<exint> &range)
+        {
+            UT_BoundingBox              bbox, prim_bbox;
+
+            for (exint i=range.begin(); i != range.end(); ++i)
+            {
+                bbox.initBounds();
+
+                for (GA_Iterator it(GA_Range(*groups[i])); !it.atEnd(); ++it)
+                {
+                    if (type == GA_GROUP_POINT)
+                    {
+                        bbox.enlargeBounds(gdp->getPos3(*it));
+                    }
+                    else
+                    {
+                        gdp->getGEOPrimitive(*it)->getBBox(&prim_bbox);
+                        bbox.enlargeBounds(prim_bbox);
+                    }
+                }
+
+                sizes[i] = groups[i]->entries();
+
+                bounds[i*6] = bbox.xmin();
+                bounds[i*6+1] = bbox.ymin();
+                bounds[i*6+2] = bbox.zmin();
+                bounds[i*6+3] = bbox.xmax();
+                bounds[i*6+4] = bbox.ymax();
+                bounds[i*6+5] = bbox.zmax();
+            }
+        }
+    );
+
+    if (!overlaps)
+    {
+        return;
+    }
+
+    // Build a compressed list of the groups each element belongs to.
+    std::vector<exint> member_starts(num_offsets+1, 0);
+
+    for (int i=0; i < num_groups; ++i)
+    {
+        for (GA_Iterator it(GA_Range(*groups[i])); !it.atEnd(); ++it)
+        {
+            member_starts[*it+1]++;
+        }
+    }
+
+    for (GA_Size off=0; off < num_offsets; ++off)
+    {
+        member_starts[off+1] += member_starts[off];
+    }
+
+    std::vector<exint> fill(member_starts.begin(), member_starts.end()-1);
+    std::vector<int> members(member_starts[num_offsets]);
+
+    // Groups are added in order so each element's list is sorted.
+    for (int i=0; i < num_groups; ++i)
+    {
+        for (GA_Iterator it(GA_Range(*groups[i])); !it.atEnd(); ++it)
+        {
+            members[fill[*it]++] = i;
+        }
+    }
+
+    // Each group only writes to its own row of the matrix so the rows can be
+    // counted in parallel.
+    UTparallelFor(
+        UT_BlockedRange<exint>(0, num_groups),
+        [&](const UT_BlockedRange<exint> &range)
+        {
+            for (exint i=range.begin(); i != range.end(); ++i)
+            {
+                int *row = overlaps + i*num_groups;
+
+                for (GA_Iterator it(GA_Range(*groups[i])); !it.atEnd(); ++it)
+                {
+                    for (exint j=member_starts[*it]; j < member_starts[*it+1]; ++j)
+                    {
+                        row[members[j]]++;
+                    }
+                }
+            }
+        }
+    );
+}
+""",
+
 """
 void
 primToPointGroup(GU_Detail *gdp,
@@ -1733,48 +2483,11 @@ groupUngroupedPrims(GU_Detail *gdp, const char *ungrouped_name)
         ungrouped->combine(all);
     }
 }
-""",
-
 """
-void
-clip(GU_Detail *gdp,
-     UT_DMatrix4 *xform,
-     UT_Vector3D *normal,
-     float dist,
-     const char *group_name)
-{
-    GA_PrimitiveGroup           *group = 0;
-
-    UT_Matrix4 mat(*xform);
-    UT_Vector3 dir(*normal);
-
-    // Invert the matrix to move the geometry from our cutting location to the
-    // origin and transform it.
-    mat.invert();
-    gdp->transform(mat);
-
-    // Find the primitive group if necessary.
-    if (group_name)
-    {
-        group = gdp->findPrimitiveGroup(group_name);
-    }
-
-    // Construct a new GQ Detail to do the clipping.
-    GQ_Detail *gqd = new GQ_Detail(gdp, group);
-
-    // Clip the geometry.
-    gqd->clip(dir, -dist, 0);
-
-    // Remove the detail.
-    delete gqd;
-
-    // Invert the matrix again and move the geometry back to its original
-    // position.
-    mat.invert();
-    gdp->transform(mat);
-}
-""",
+]
 
+# Functions which operate on bounding boxes, vectors and matrices.
+_MATH_SOURCES = [
 """
 bool
 isInside(const UT_BoundingBoxD *bbox1, const UT_BoundingBoxD *bbox2)
@@ -1839,14 +2552,80 @@ boundingBoxVolume(const UT_BoundingBoxD *bbox)
 }
 """,
 
+"""
+void
+buildLookat(UT_DMatrix3 *mat,
+            const UT_Vector3D *from,
+            const UT_Vector3D *to,
+            const UT_Vector3D *up)
+{
+    mat->lookat(*from, *to, *up);
+}
+""",
+
+"""
+void
+getDual(const UT_Vector3D *vec, UT_DMatrix3 *mat)
+{
+    vec->getDual(*mat);
+}
+"""
+]
+
+# Functions which query and modify nodes and node types.
+_NODE_SOURCES = [
+"""
+const char *
+getAuthor(OP_Node *node)
+{
+    const OP_Stat &stat = node->getStat();
+    return stat.getAuthor();
+}
+""",
+
+"""
+void
+setIcon(OP_Operator *op, const char *icon_name)
+{
+    op->setIconName(icon_name);
+}
+""",
+
+"""
+void
+setDefaultIcon(OP_Operator *op)
+{
+    op->setDefaultIconName();
+}
+""",
+
+"""
+bool
+isSubnetType(OP_Operator *op)
+{
+    return op->getIsPrimarySubnetType();
+}
+""",
+
+"""
+bool
+isPython(OP_Operator *op)
+{
+    return op->getScriptIsPython();
+}
+""",
+
 """
 void
 disconnectAllOutputs(OP_Node *node)
 {
     node->disconnectAllOutputs();
 }
-""",
+"""
+]
 
+# Functions which query parameters.
+_PARM_SOURCES = [
 """
 int
 getMultiParmInstancesPerItem(OP_Node *node, const char *parm_name)
@@ -1943,48 +2722,102 @@ getMultiParmInstances(OP_Node *node, const char *parm_name)
 """,
 
 """
-void
-buildLookat(UT_DMatrix3 *mat,
-            const UT_Vector3D *from,
-            const UT_Vector3D *to,
-            const UT_Vector3D *up)
-{
-    mat->lookat(*from, *to, *up);
-}
-""",
-
-"""
-void
-getDual(const UT_Vector3D *vec, UT_DMatrix3 *mat)
+MultiParmValues
+getMultiParmValues(OP_Node *node, const char *parm_name, double time)
 {
-    vec->getDual(*mat);
-}
-""",
+    int                         items, instances, size;
+    std::vector<int>            types, sizes;
+    std::vector<double>         numbers;
+    std::vector<std::string>    names, strings;
 
-"""
-const char *
-getMetaSource(const char *filename)
-{
-    int                         idx;
+    PRM_Parm                    *parm;
+    UT_String                   value;
 
-    OP_OTLLibrary               *lib;
+    MultiParmValues             result;
 
-    UT_String                   test;
+    PRM_Parm &multiparm = node->getParm(parm_name);
 
-    OP_OTLManager &manager = OPgetDirector()->getOTLManager();
-    idx = manager.findLibrary(filename);
+    // The number of multi parm blocks.
+    items = multiparm.getMultiParmNumItems();
 
-    lib = (idx >= 0) ? manager.getLibrary(idx): NULL;
+    // The number of parms in each block.
+    instances = multiparm.getMultiParmInstancesPerItem();
 
-    if (lib)
+    for (int i=0; i < items; ++i)
     {
-        return lib->getMetaSource();
+        for (int j=0; j < instances; ++j)
+        {
+            parm = multiparm.getMultiParm(i * instances + j);
+
+            // Store the template names of the parms in the first block.
+            if (i == 0)
+            {
+                names.push_back(parm->getTemplatePtr()->getToken());
+            }
+
+            size = parm->getVectorSize();
+            sizes.push_back(size);
+
+            const PRM_Type &parm_type = parm->getType();
+
+            // Ramps cannot be represented so store their name so they can be
+            // evaluated separately.
+            if (parm->isRampType())
+            {
+                types.push_back(3);
+                strings.push_back(parm->getToken());
+            }
+
+            else if (parm_type.isStringType())
+            {
+                types.push_back(2);
+
+                for (int k=0; k < size; ++k)
+                {
+                    node->evalString(value, parm, k, time);
+                    strings.push_back(value.toStdString());
+                }
+            }
+
+            else if (parm_type.isOrdinalType())
+            {
+                types.push_back(1);
+
+                for (int k=0; k < size; ++k)
+                {
+                    numbers.push_back(node->evalInt(parm, k, time));
+                }
+            }
+
+            else
+            {
+                types.push_back(0);
+
+                for (int k=0; k < size; ++k)
+                {
+                    numbers.push_back(node->evalFloat(parm, k, time));
+                }
+            }
+        }
     }
 
-    return "";
+    // Check for empty vectors.
+    validateStringVector(names);
+    validateStringVector(strings);
+
+    result.names.set(names);
+    result.types.set(types);
+    result.sizes.set(sizes);
+    result.numbers.set(numbers);
+    result.strings.set(strings);
+
+    return result;
 }
-""",
+"""
+]
 
+# Functions which query and modify digital asset libraries.
+_OTL_SOURCES = [
 """
 bool
 removeMetaSource(const char *metasrc)
@@ -1998,82 +2831,66 @@ removeMetaSource(const char *metasrc)
 """,
 
 """
-StringArray
-getLibrariesInMetaSource(const char *metasrc)
+HDALibraryIndex
+getLibraryIndex(const char *filename)
 {
-    std::vector<std::string>    result;
+    std::vector<int>            definition_counts, dummies, mod_times;
+    std::vector<std::string>    paths, meta_sources, table_names, names;
 
     OP_OTLLibrary               *library;
 
+    HDALibraryIndex             result;
+
     OP_OTLManager &manager = OPgetDirector()->getOTLManager();
 
-    // Iterate through the list of libraries.
-    for (int i=0; i<manager.getNumLibraries(); ++i)
+    for (int i=0; i < manager.getNumLibraries(); ++i)
     {
-        // Get the current library.
         library = manager.getLibrary(i);
 
-        // Check if the meta source is equal to the target one.  If so, add
-        // the library file path to the string list.
-        if (library->getMetaSource() == metasrc)
+        // If a file name was passed only index that library.
+        if (filename[0] && library->getSource() != filename)
         {
-            result.push_back(library->getSource().toStdString());
+            continue;
         }
 
-    }
-
-    // Check for an empty vector.
-    validateStringVector(result);
-
-    return result;
-}
-""",
-
-"""
-bool
-isDummyDefinition(const char *filename,
-                  const char *tablename,
-                  const char *opname)
-{
-    int                         def_idx, lib_idx;
-
-    OP_OTLDefinition            definition;
-    OP_OTLLibrary               *lib;
-
-    // Get the OTL manager.
-    OP_OTLManager &manager = OPgetDirector()->getOTLManager();
+        paths.push_back(library->getSource().toStdString());
+        meta_sources.push_back(library->getMetaSource().toStdString());
+        definition_counts.push_back(library->getNumDefinitions());
 
-    // Try to find the library with the file name.
-    lib_idx = manager.findLibrary(filename);
-
-    // Get the library.
-    lib = (lib_idx >= 0) ? manager.getLibrary(lib_idx): NULL;
-
-    if (lib)
-    {
-        // Try to find a definition for the operator type.
-        def_idx = lib->getDefinitionIndex(tablename, opname);
-
-        // If it exists, query if it is a dummy definition.
-        if (def_idx >= 0)
+        for (int j=0; j < library->getNumDefinitions(); ++j)
         {
-            return lib->getDefinitionIsDummy(def_idx);
+            const OP_OTLDefinition &definition = library->getDefinition(j);
+
+            table_names.push_back(definition.getOpTableName().toStdString());
+            names.push_back(definition.getName().toStdString());
+            dummies.push_back(library->getDefinitionIsDummy(j));
+            mod_times.push_back(definition.getModTime());
         }
     }
 
-    // Couldn't find the library or definition inside is, so return false.
-    return false;
+    // Check for empty vectors.
+    validateStringVector(paths);
+    validateStringVector(meta_sources);
+    validateStringVector(table_names);
+    validateStringVector(names);
+
+    result.paths.set(paths);
+    result.meta_sources.set(meta_sources);
+    result.definition_counts.set(definition_counts);
+    result.table_names.set(table_names);
+    result.names.set(names);
+    result.dummies.set(dummies);
+    result.mod_times.set(mod_times);
+
+    return result;
 }
 """
 ]
 
-# Create the library as a private object.
-cpp_methods = inlinecpp.createLibrary(
-    "cpp_methods",
-    acquire_hom_lock=True,
-    catch_crashes=True,
-    includes="""
+# Includes and helper functions shared by all the libraries.
+_INCLUDES = """
 #include <CMD/CMD_Variable.h>
+#include <GA/GA_ATINumeric.h>
 #include <GA/GA_AttributeRefMap.h>
 #include <GA/GA_Primitive.h>
 #include <GEO/GEO_Face.h>
@@ -2091,6 +2908,8 @@ cpp_methods = inlinecpp.createLibrary(
 #include <OP/OP_OTLManager.h>
 #include <PRM/PRM_Parm.h>
 #include <ROP/ROP_RenderManager.h>
+#include <UT/UT_ParallelUtil.h>
+#include <UT/UT_Thread.h>
 #include <UT/UT_WorkArgs.h>
 
 using namespace std;
@@ -2107,16 +2926,360 @@ void validateStringVector(std::vector<std::string> &string_vec)
     }
 }
 
-""",
-    structs=[
-        ("IntArray", "*i"),
-        ("FloatArray", "*d"),
-        ("StringArray", "**c"),
-        ("StringTuple", "*StringArray"),
-        ("VertexMap", (("prims", "*i"), ("indices", "*i"))),
-        ("Position3D", (("x", "d"), ("y", "d"), ("z", "d"))),
-    ],
-    function_sources=_FUNCTION_SOURCES
+// Get the offset of an element from its number.  Vertices use their linear
+// vertex number.
+GA_Offset getElementOffset(const GU_Detail *gdp,
+                           GA_AttributeOwner owner,
+                           GA_Index element_num)
+{
+    switch (owner)
+    {
+        case GA_ATTRIB_VERTEX:
+            return gdp->vertexOffset(element_num);
+
+        case GA_ATTRIB_POINT:
+            return gdp->pointOffset(element_num);
+
+        case GA_ATTRIB_PRIMITIVE:
+            return gdp->primitiveOffset(element_num);
+
+        default:
+            return 0;
+    }
+}
+
+// Get the strings in an attribute's string table along with a map from each
+// string handle to the position of its string in the list.  Handles are not
+// guaranteed to be contiguous so unused handles map to -1.
+void getStringTableMap(const GA_Attribute *attrib,
+                       UT_StringArray &strings,
+                       UT_IntArray &handle_map)
+{
+    UT_IntArray                 handles;
+
+    const GA_AIFSharedStringTuple *s_t = attrib->getAIFSharedStringTuple();
+
+    s_t->extractStrings(attrib, strings, handles);
+
+    exint max_handle = -1;
+
+    for (exint i=0; i < handles.entries(); ++i)
+    {
+        max_handle = SYSmax(max_handle, exint(handles(i)));
+    }
+
+    handle_map.setSizeNoInit(max_handle+1);
+    handle_map.constant(-1);
+
+    for (exint i=0; i < handles.entries(); ++i)
+    {
+        handle_map(handles(i)) = i;
+    }
+}
+
+// Get the sorted numbers of the elements adjacent to an element.
+//
+// adjacency_type 0: Points sharing an edge with the point.
+// adjacency_type 1: Primitives sharing a point with the primitive.
+// adjacency_type 2: Linear numbers of the vertices referencing the point.
+void getElementAdjacency(const GU_Detail *gdp,
+                         int adjacency_type,
+                         GA_Index element_num,
+                         UT_IntArray &result)
+{
+    GA_Offset                   ptOff, primOff;
+    GA_OffsetArray              offsets;
+    GA_OffsetArray::const_iterator offsets_it;
+
+    const GEO_Primitive         *prim;
+
+    result.clear();
+
+    switch (adjacency_type)
+    {
+        case 0:
+            ptOff = gdp->pointOffset(element_num);
+
+            gdp->getPrimitivesReferencingPoint(offsets, ptOff);
+
+            for (offsets_it = offsets.begin(); !offsets_it.atEnd(); ++offsets_it)
+            {
+                prim = gdp->getGEOPrimitive(*offsets_it);
+
+                const GA_Range pt_range = prim->getPointRange();
+
+                for (GA_Iterator pt_it(pt_range.begin()); !pt_it.atEnd(); ++pt_it)
+                {
+                    if (*pt_it == ptOff || !prim->hasEdge(GA_Edge(ptOff, *pt_it)))
+                    {
+                        continue;
+                    }
+
+                    // Points can be shared by multiple primitives so only
+                    // add them once.
+                    if (result.find(gdp->pointIndex(*pt_it)) < 0)
+                    {
+                        result.append(gdp->pointIndex(*pt_it));
+                    }
+                }
+            }
+            break;
+
+        case 1:
+            primOff = gdp->primitiveOffset(element_num);
+
+            gdp->getPointAdjacentPolygons(offsets, primOff);
+
+            for (offsets_it = offsets.begin(); !offsets_it.atEnd(); ++offsets_it)
+            {
+                result.append(gdp->primitiveIndex(*offsets_it));
+            }
+            break;
+
+        case 2:
+            ptOff = gdp->pointOffset(element_num);
+
+            gdp->getVerticesReferencingPoint(offsets, ptOff);
+
+            for (offsets_it = offsets.begin(); !offsets_it.atEnd(); ++offsets_it)
+            {
+                result.append(gdp->vertexIndex(*offsets_it));
+            }
+            break;
+    }
+
+    result.sort();
+}
+
+"""
+
+# Structs shared by all the libraries.
+_STRUCTS = [
+    ("IntArray", "*i"),
+    ("FloatArray", "*d"),
+    ("StringArray", "**c"),
+    ("StringTuple", "*StringArray"),
+    ("VertexMap", (("prims", "*i"), ("indices", "*i"))),
+    ("Position3D", (("x", "d"), ("y", "d"), ("z", "d"))),
+    (
+        "MultiParmValues",
+        (
+            ("names", "**c"),
+            ("types", "*i"),
+            ("sizes", "*i"),
+            ("numbers", "*d"),
+            ("strings", "**c"),
+        )
+    ),
+    (
+        "HDALibraryIndex",
+        (
+            ("paths", "**c"),
+            ("meta_sources", "**c"),
+            ("definition_counts", "*i"),
+            ("table_names", "**c"),
+            ("names", "**c"),
+            ("dummies", "*i"),
+            ("mod_times", "*i"),
+        )
+    ),
+]
+
+# The name and function sources of each library.  Each library is compiled and
+# cached separately so changing a function only rebuilds its own library.
+LIBRARY_SOURCES = OrderedDict(
+    (
+        ("session", _SESSION_SOURCES),
+        ("sort", _SORT_SOURCES),
+        ("geometry", _GEOMETRY_SOURCES),
+        ("groups", _GROUP_SOURCES),
+        ("math", _MATH_SOURCES),
+        ("nodes", _NODE_SOURCES),
+        ("parms", _PARM_SOURCES),
+        ("otl", _OTL_SOURCES),
+    )
 )
 
+# Regular expression to find the name of the function defined by a source.
+_FUNCTION_NAME_REGEX = re.compile(r"^(\w+)\(", re.MULTILINE)
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+class LazyLibrary(object):
+    """Provide access to functions split across multiple inlinecpp libraries.
+
+    Accessing a function creates the library which contains it, compiling it
+    if it isn't already in the inlinecpp cache.  Libraries which are never
+    used are never compiled or loaded.
+
+    An optional call wrapper can be set to wrap every function that is
+    accessed, for example to profile the calls.
+
+    :param library_sources: A mapping of library names to function sources.
+    :type library_sources: collections.OrderedDict
+
+    """
+
+    def __init__(self, library_sources):
+        self._call_wrapper = None
+        self._library_sources = library_sources
+        self._libraries = {}
+        self._function_map = {}
+
+        for library_name, function_sources in library_sources.iteritems():
+            for source in function_sources:
+                function_name = _FUNCTION_NAME_REGEX.search(source).group(1)
+
+                self._function_map[function_name] = library_name
+
+    # =========================================================================
+    # SPECIAL METHODS
+    # =========================================================================
+
+    def __getattr__(self, name):
+        try:
+            library_name = self._function_map[name]
+
+        except KeyError:
+            raise AttributeError(name)
+
+        function = getattr(self.get_library(library_name), name)
+
+        if self._call_wrapper is not None:
+            function = self._call_wrapper(name, function)
+
+        # Store the function so future lookups skip __getattr__.
+        setattr(self, name, function)
+
+        return function
+
+    def __repr__(self):
+        return "<LazyLibrary {} of {} libraries loaded>".format(
+            len(self._libraries),
+            len(self._library_sources)
+        )
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def call_wrapper(self):
+        """callable: A function which wraps each library function."""
+        return self._call_wrapper
+
+    @call_wrapper.setter
+    def call_wrapper(self, call_wrapper):
+        self._call_wrapper = call_wrapper
+
+        # Remove any stored functions so they will be wrapped, or unwrapped,
+        # the next time they are accessed.
+        for name in self._function_map:
+            self.__dict__.pop(name, None)
+
+    @property
+    def library_names(self):
+        """tuple(str): The names of all the libraries."""
+        return tuple(self._library_sources.keys())
+
+    @property
+    def loaded_library_names(self):
+        """tuple(str): The names of the libraries which have been loaded."""
+        return tuple(
+            name for name in self._library_sources if name in self._libraries
+        )
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def get_library(self, library_name):
+        """Get a library, creating it if necessary.
+
+        :param library_name: The name of the library.
+        :type library_name: str
+        :return: The inlinecpp library.
+        :rtype: inlinecpp._Library
+
+        """
+        if library_name not in self._libraries:
+            self._libraries[library_name] = _create_library(
+                library_name,
+                self._library_sources[library_name]
+            )
+
+        return self._libraries[library_name]
+
+    def library_function_names(self, library_name):
+        """Get the names of the functions in a library.
+
+        :param library_name: The name of the library.
+        :type library_name: str
+        :return: The function names.
+        :rtype: tuple(str)
+
+        """
+        return tuple(
+            _FUNCTION_NAME_REGEX.search(source).group(1)
+            for source in self._library_sources[library_name]
+        )
+
+# =============================================================================
+# NON-PUBLIC FUNCTIONS
+# =============================================================================
+
+def _create_library(library_name, function_sources):
+    """Create an inlinecpp library containing the function sources.
+
+    :param library_name: The name of the library.
+    :type library_name: str
+    :param function_sources: The C++ function sources.
+    :type function_sources: list(str)
+    :return: The inlinecpp library.
+    :rtype: inlinecpp._Library
+
+    """
+    return inlinecpp.createLibrary(
+        "cpp_methods_{}".format(library_name),
+        acquire_hom_lock=True,
+        catch_crashes=True,
+        includes=_INCLUDES,
+        structs=_STRUCTS,
+        function_sources=function_sources
+    )
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def build_libraries(library_names=None):
+    """Compile and load libraries so that they are in the inlinecpp cache.
+
+    :param library_names: Optional names of libraries to build.  If None, all
+                          the libraries are built.
+    :type library_names: list(str)
+    :return: The names of the libraries which were built.
+    :rtype: tuple(str)
+
+    """
+    if library_names is None:
+        library_names = cpp_methods.library_names
+
+    for library_name in library_names:
+        if library_name not in LIBRARY_SOURCES:
+            raise ValueError("Unknown library: {}".format(library_name))
+
+    for library_name in library_names:
+        library = cpp_methods.get_library(library_name)
+
+        # Accessing a function forces the library to be compiled and loaded.
+        getattr(library, cpp_methods.library_function_names(library_name)[0])
+
+    return tuple(library_names)
+
+# =============================================================================
 
+# The functions of all the libraries.
+cpp_methods = LazyLibrary(LIBRARY_SOURCES)
@@ -0,0 +1,387 @@
+"""This module contains functions for profiling calls to the ht.inline C++
+functions.
+
+Profiling is enabled by setting the HT_INLINE_PROFILE environment variable to
+a true value (1, true, yes or on) or by using the profile_calls() context
+manager.  If HT_INLINE_PROFILE_FILE is also set then a JSON report is written
+to that path on exit.
+
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Python Imports
+import atexit
+from contextlib import contextmanager
+import json
+import os
+import random
+import time
+
+# Third Party Imports
+import numpy
+
+# Houdini Toolbox Imports
+from ht.events.stats import HoudiniEventStats, get_stats_instances
+from ht.inline.lib import cpp_methods
+from ht.logger import logger
+
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+# The maximum number of call durations kept for each function.  Once full the
+# kept durations are a uniform random sample of all the calls.
+_MAX_DURATIONS = 10000
+
+# Environment variable which enables profiling.
+_PROFILE_ENV_VAR = "HT_INLINE_PROFILE"
+
+# Environment variable values which enable profiling.
+_PROFILE_ENV_VALUES = ("1", "on", "true", "yes")
+
+# Environment variable containing a path to write a JSON report to on exit.
+_PROFILE_FILE_ENV_VAR = "HT_INLINE_PROFILE_FILE"
+
+# The latency percentiles which are reported.
+_REPORT_PERCENTILES = (50, 90, 99)
+
+# The tag added to all the call stats.
+_STATS_TAG = "inline"
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+class InlineCallStats(HoudiniEventStats):
+    """Stats for calls to a C++ function.
+
+    :param name: The function name.
+    :type name: str
+    :param tags: Optional stats tags.
+    :type tags: list(str)
+    :param post_report: Print a report after running.
+    :type post_report: bool
+    :return:
+
+    """
+
+    def __init__(self, name, tags=None, post_report=False):
+        super(InlineCallStats, self).__init__(
+            name,
+            tags=tags,
+            post_report=post_report
+        )
+
+        self._durations = []
+        self._total_elements = 0
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def durations(self):
+        """list(float): The duration of each call, or a random sample of the
+        durations if there have been more than _MAX_DURATIONS calls.
+
+        """
+        return self._durations
+
+    @property
+    def total_elements(self):
+        """int: The total number of elements passed to or returned from all
+        the calls.
+
+        """
+        return self._total_elements
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def as_dict(self):
+        """Get the stats as a dictionary suitable for serializing.
+
+        :return: The stats data.
+        :rtype: dict
+
+        """
+        data = {
+            "run_count": self.run_count,
+            "total_time": self.total_time,
+            "total_elements": self.total_elements,
+        }
+
+        for percent, value in zip(_REPORT_PERCENTILES, self.percentiles()):
+            data["p{}".format(percent)] = value
+
+        return data
+
+    def percentiles(self, percents=_REPORT_PERCENTILES):
+        """Get latency percentiles of the calls.
+
+        :param percents: The percentiles to get.
+        :type percents: tuple(float)
+        :return: The call durations at each percentile.
+        :rtype: tuple(float)
+
+        """
+        if not self.durations:
+            return tuple(0.0 for _ in percents)
+
+        return tuple(numpy.percentile(self.durations, percents).tolist())
+
+    def print_report(self):
+        """Print (log) a stats report for all the calls.
+
+        :return:
+
+        """
+        logger.info("Function: {}".format(self.name))
+        logger.info("\tRun Count: {}".format(self.run_count))
+        logger.info("\tTotal Time: {:0.4f}".format(self.total_time))
+
+        for percent, value in zip(_REPORT_PERCENTILES, self.percentiles()):
+            logger.info("\tP{}: {:0.6f}".format(percent, value))
+
+        logger.info("\tElements: {}".format(self.total_elements))
+
+    def record_call(self, duration, elements):
+        """Record a call to the function.
+
+        :param duration: The call duration.
+        :type duration: float
+        :param elements: The number of elements passed to or returned from
+                         the call.
+        :type elements: int
+        :return:
+
+        """
+        self._last_run_time = duration
+        self._total_time += duration
+        self._run_count += 1
+
+        # Reservoir sample the durations so memory use is bounded.
+        if len(self._durations) < _MAX_DURATIONS:
+            self._durations.append(duration)
+
+        else:
+            index = random.randint(0, self.run_count - 1)
+
+            if index < _MAX_DURATIONS:
+                self._durations[index] = duration
+
+        self._total_elements += elements
+
+    def reset(self):
+        """Reset all counts.
+
+        :return:
+
+        """
+        super(InlineCallStats, self).reset()
+
+        self._durations = []
+        self._total_elements = 0
+
+# =============================================================================
+# NON-PUBLIC FUNCTIONS
+# =============================================================================
+
+def _get_element_count(args, result):
+    """Estimate the number of elements processed by a call.
+
+    This is the length of the longest sequence or array passed to or returned
+    from the call.  Calls which pass pointers to buffers use the largest
+    integer argument following the first pointer as the buffer size.
+
+    :param args: The call arguments.
+    :type args: tuple
+    :param result: The call result.
+    :type result: object
+    :return: The number of elements.
+    :rtype: int
+
+    """
+    count = 0
+
+    has_pointer = False
+
+    for value in args + (result,):
+        # Strings are sized but aren't element data.
+        if isinstance(value, basestring):
+            continue
+
+        # ctypes pointers don't know the size of the data they point to so
+        # it is passed as a separate count argument.
+        if hasattr(value, "contents"):
+            has_pointer = True
+            continue
+
+        if has_pointer and isinstance(value, (int, long)) and \
+                not isinstance(value, bool):
+            count = max(count, value)
+            continue
+
+        try:
+            count = max(count, len(value))
+
+        except TypeError:
+            pass
+
+    return count
+
+
+def _wrap_function(name, function):
+    """Wrap a function so that its calls are recorded.
+
+    :param name: The function name.
+    :type name: str
+    :param function: The function to wrap.
+    :type function: callable
+    :return: The wrapped function.
+    :rtype: callable
+
+    """
+    stats = InlineCallStats(name, tags=[_STATS_TAG])
+
+    def wrapper(*args):
+        start = time.time()
+
+        result = None
+
+        # Record the call even if it fails.
+        try:
+            result = function(*args)
+
+        finally:
+            stats.record_call(
+                time.time() - start,
+                _get_element_count(args, result)
+            )
+
+        return result
+
+    return wrapper
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def disable_profiling():
+    """Stop recording calls to the C++ functions.
+
+    :return:
+
+    """
+    cpp_methods.call_wrapper = None
+
+
+def dump_json(path):
+    """Write the call stats to a JSON file.
+
+    :param path: The file path to write to.
+    :type path: str
+    :return:
+
+    """
+    with open(path, "w") as handle:
+        json.dump(get_report(), handle, indent=4, sort_keys=True)
+
+
+def enable_profiling():
+    """Start recording calls to the C++ functions.
+
+    :return:
+
+    """
+    cpp_methods.call_wrapper = _wrap_function
+
+
+def get_call_stats():
+    """Get the stats of all called functions, slowest first.
+
+    :return: The stats of each function.
+    :rtype: tuple(InlineCallStats)
+
+    """
+    all_stats = get_stats_instances(InlineCallStats)
+
+    return tuple(
+        sorted(all_stats, key=lambda stats: stats.total_time, reverse=True)
+    )
+
+
+def get_report():
+    """Get the call stats of all called functions.
+
+    :return: The stats data for each function.
+    :rtype: dict
+
+    """
+    return {stats.name: stats.as_dict() for stats in get_call_stats()}
+
+
+def is_profiling_enabled():
+    """Check whether or not calls are being recorded.
+
+    :return: Whether or not calls are being recorded.
+    :rtype: bool
+
+    """
+    return cpp_methods.call_wrapper is _wrap_function
+
+
+def print_report():
+    """Print (log) a stats report for all called functions, slowest first.
+
+    :return:
+
+    """
+    for stats in get_call_stats():
+        stats.print_report()
+
+
+@contextmanager
+def profile_calls(reset=True):
+    """Record calls to the C++ functions made within the context.
+
+    :param reset: Whether or not to reset any existing stats.
+    :type reset: bool
+    :return:
+
+    """
+    if reset:
+        reset_call_stats()
+
+    was_enabled = is_profiling_enabled()
+
+    enable_profiling()
+
+    try:
+        yield
+
+    finally:
+        if not was_enabled:
+            disable_profiling()
+
+
+def reset_call_stats():
+    """Reset the stats of all called functions.
+
+    :return:
+
+    """
+    for stats in get_call_stats():
+        stats.reset()
+
+# =============================================================================
+
+if os.environ.get(_PROFILE_ENV_VAR, "").strip().lower() in _PROFILE_ENV_VALUES:
+    enable_profiling()
+
+    if os.environ.get(_PROFILE_FILE_ENV_VAR):
+        atexit.register(dump_json, os.environ[_PROFILE_FILE_ENV_VAR])
@@ -555,6 +555,29 @@ class Test_get_item_stats(unittest.TestCase):
 
         mock_matching.assert_called_with([mock_stats], [mock_tag])
 
+
+class Test_get_stats_instances(unittest.TestCase):
+    """Test ht.events.stats.get_stats_instances."""
+
+    @patch.object(ht.events.stats._StatsMeta, "_instances", new_callable=PropertyMock)
+    def test_none(self, mock_instances):
+        mock_instances.return_value = {}
+
+        result = ht.events.stats.get_stats_instances(ht.events.stats.HoudiniEventStats)
+
+        self.assertEqual(result, ())
+
+    @patch.object(ht.events.stats._StatsMeta, "_instances", new_callable=PropertyMock)
+    def test(self, mock_instances):
+        mock_tag = MagicMock(spec=str)
+
+        mock_stats = MagicMock(spec=ht.events.stats.HoudiniEventItemStats)
+        mock_instances.return_value = {ht.events.stats.HoudiniEventItemStats: {mock_tag: mock_stats}}
+
+        result = ht.events.stats.get_stats_instances(ht.events.stats.HoudiniEventItemStats)
+
+        self.assertEqual(result, (mock_stats, ))
+
 # =============================================================================
 
 if __name__ == '__main__':
@@ -0,0 +1,779 @@
+"""Test the ht.geometry.pointcloud module."""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Python Imports
+from mock import MagicMock, patch
+import numpy
+import os
+import shutil
+import tempfile
+import unittest
+
+# Houdini Toolbox Imports
+from ht.geometry import pointcloud
+
+# Houdini Imports
+import hou
+
+reload(pointcloud)
+
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+# A simple line of points along the X axis, 1 unit apart.
+_POSITIONS = numpy.array(
+    [(float(i), 0.0, 0.0) for i in range(10)]
+)
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+class Test_PointCloud(unittest.TestCase):
+    """Test ht.geometry.pointcloud.PointCloud object."""
+
+    def setUp(self):
+        super(Test_PointCloud, self).setUp()
+
+        self.mock_geometry = _build_mock_geometry(_POSITIONS)
+
+    def test___init__(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        self.assertIsNone(cloud._point_map)
+        self.assertEqual(cloud._num_elements, 10)
+        numpy.testing.assert_array_equal(cloud._tree.data, _POSITIONS)
+        self.mock_geometry.pointFloatAttribValuesAsString.assert_called_with(
+            "P",
+            float_type=hou.numericData.Float64
+        )
+
+    def test___init____single_precision(self):
+        cloud = pointcloud.PointCloud(
+            self.mock_geometry,
+            double_precision=False,
+            backend="grid"
+        )
+
+        self.assertEqual(cloud._tree.data.dtype, numpy.float32)
+        self.mock_geometry.pointFloatAttribValuesAsString.assert_called_with(
+            "P",
+            float_type=hou.numericData.Float32
+        )
+
+    def test___init____pattern(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry, "1 5 7-3:2")
+
+        self.assertEqual(cloud._point_map.tolist(), [1, 3, 5, 7])
+        self.assertEqual(cloud._point_map.dtype, numpy.int32)
+        self.assertEqual(cloud._num_elements, 4)
+        numpy.testing.assert_array_equal(cloud._tree.data, _POSITIONS[[1, 3, 5, 7]])
+        self.mock_geometry.globPoints.assert_not_called()
+
+    def test___init____pattern_glob(self):
+        self.mock_geometry.globPoints.return_value = [
+            self.mock_geometry.iterPoints()[i] for i in (1, 5)
+        ]
+
+        cloud = pointcloud.PointCloud(self.mock_geometry, "@id>3")
+
+        self.assertEqual(cloud._point_map.tolist(), [1, 5])
+        self.mock_geometry.globPoints.assert_called_with("@id>3")
+
+    @patch("ht.geometry.pointcloud.group_membership_mask")
+    def test___init____pattern_group(self, mock_mask):
+        mock_group = MagicMock(spec=hou.PointGroup)
+        self.mock_geometry.findPointGroup.return_value = mock_group
+
+        mask = numpy.zeros(10, dtype=bool)
+        mask[[2, 4]] = True
+        mock_mask.return_value = mask
+
+        cloud = pointcloud.PointCloud(self.mock_geometry, "group1")
+
+        self.assertEqual(cloud._point_map.tolist(), [2, 4])
+        self.assertEqual(cloud._point_map.dtype, numpy.int32)
+        mock_mask.assert_called_with(mock_group)
+        self.mock_geometry.findPointGroup.assert_called_with("group1")
+        self.mock_geometry.globPoints.assert_not_called()
+
+    @patch("ht.geometry.pointcloud.group_membership_mask", None)
+    def test___init____pattern_group_no_inline(self):
+        mock_group = MagicMock(spec=hou.PointGroup)
+        mock_group.points.return_value = [
+            self.mock_geometry.iterPoints()[i] for i in (3, 6)
+        ]
+
+        cloud = pointcloud.PointCloud(self.mock_geometry, mock_group)
+
+        self.assertEqual(cloud._point_map.tolist(), [3, 6])
+
+    def test___init____pattern_numbers(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry, numpy.array([8, 2]))
+
+        self.assertEqual(cloud._point_map.tolist(), [8, 2])
+        numpy.testing.assert_array_equal(cloud._tree.data, _POSITIONS[[8, 2]])
+
+        with self.assertRaises(ValueError):
+            pointcloud.PointCloud(self.mock_geometry, [3, 10])
+
+    def test___init____ckdtree(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry, backend="ckdtree")
+
+        self.assertIsInstance(cloud._tree, pointcloud.cKDTree)
+
+    def test___init____grid(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry, backend="grid", cell_size=2)
+
+        self.assertIsInstance(cloud._tree, pointcloud.SpatialHashGrid)
+        self.assertEqual(cloud._tree.cell_size, 2)
+        self.assertEqual(cloud.nbytes, cloud._tree.nbytes)
+
+    def test___init____invalid_backend(self):
+        with self.assertRaises(ValueError):
+            pointcloud.PointCloud(self.mock_geometry, backend="octree")
+
+    # filter_attribute
+
+    def _build_filter_cloud(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        # Use the X position as a float attribute value.
+        values = _POSITIONS[:, 0].astype(numpy.float64)
+
+        mock_attrib = MagicMock(spec=hou.Attrib)
+        mock_attrib.dataType.return_value = hou.attribData.Float
+        mock_attrib.size.return_value = 1
+
+        self.mock_geometry.findPointAttrib.return_value = mock_attrib
+        self.mock_geometry.pointFloatAttribValuesAsString.side_effect = None
+        self.mock_geometry.pointFloatAttribValuesAsString.return_value = values.tobytes()
+
+        return cloud
+
+    def test_filter_attribute__num_points(self):
+        cloud = self._build_filter_cloud()
+
+        result = cloud.filter_attribute("foo", [(0.1, 0, 0), (5.2, 0, 0)], num_points=2)
+
+        self.assertEqual(result.shape, (2, 1))
+        numpy.testing.assert_allclose(result[:, 0], [0.5, 5.5])
+
+    def test_filter_attribute__radius(self):
+        cloud = self._build_filter_cloud()
+
+        result = cloud.filter_attribute(
+            "foo",
+            [(4.0, 0, 0), (100, 0, 0)],
+            radius=1.5
+        )
+
+        numpy.testing.assert_allclose(result[:, 0], [4.0, 0.0])
+
+    def test_filter_attribute__inverse(self):
+        cloud = self._build_filter_cloud()
+
+        result = cloud.filter_attribute(
+            "foo",
+            [(0.25, 0, 0)],
+            num_points=2,
+            kernel="inverse"
+        )
+
+        # Weights of 4 and 4/3 for the values 0 and 1.
+        numpy.testing.assert_allclose(result[:, 0], [0.25])
+
+    def test_filter_attribute__gaussian(self):
+        cloud = self._build_filter_cloud()
+
+        result = cloud.filter_attribute(
+            "foo",
+            [(0.25, 0, 0)],
+            radius=1,
+            kernel="gaussian",
+            bandwidth=1
+        )
+
+        weights = numpy.exp(-0.5 * numpy.square([0.25, 0.75]))
+        expected = weights[1] / weights.sum()
+
+        numpy.testing.assert_allclose(result[:, 0], [expected])
+
+    def test_filter_attribute__invalid(self):
+        cloud = self._build_filter_cloud()
+
+        with self.assertRaises(ValueError):
+            cloud.filter_attribute("foo", [(0, 0, 0)], num_points=1, kernel="box")
+
+        with self.assertRaises(ValueError):
+            cloud.filter_attribute("foo", [(0, 0, 0)])
+
+        self.mock_geometry.findPointAttrib.return_value = None
+
+        with self.assertRaises(hou.OperationFailed):
+            cloud.filter_attribute("foo", [(0, 0, 0)], num_points=1)
+
+    # find_all_close_point_numbers
+
+    def test_find_all_close_point_numbers(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        offsets, numbers, distances = cloud.find_all_close_point_numbers(
+            [(0.2, 0, 0), (5.1, 0, 0), (100, 0, 0)],
+            1
+        )
+
+        self.assertEqual(offsets.tolist(), [0, 2, 4, 4])
+        self.assertEqual(sorted(numbers[0:2].tolist()), [0, 1])
+        self.assertEqual(sorted(numbers[2:4].tolist()), [5, 6])
+
+        expected = numpy.abs(_POSITIONS[numbers, 0] - [0.2, 0.2, 5.1, 5.1])
+        numpy.testing.assert_allclose(distances, expected)
+
+    def test_find_all_close_point_numbers__pattern(self):
+        self.mock_geometry.globPoints.return_value = [
+            self.mock_geometry.iterPoints()[i] for i in (2, 4, 6, 8)
+        ]
+
+        cloud = pointcloud.PointCloud(self.mock_geometry, "2-8:2")
+
+        offsets, numbers, _ = cloud.find_all_close_point_numbers([(3, 0, 0)], 1.5)
+
+        self.assertEqual(offsets.tolist(), [0, 2])
+        self.assertEqual(sorted(numbers.tolist()), [2, 4])
+
+    def test_find_all_close_point_numbers__grid(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry, backend="grid", cell_size=1)
+
+        offsets, numbers, distances = cloud.find_all_close_point_numbers(
+            [(0.2, 0, 0), (5.1, 0, 0), (100, 0, 0)],
+            1
+        )
+
+        self.assertEqual(offsets.tolist(), [0, 2, 4, 4])
+        self.assertEqual(sorted(numbers[0:2].tolist()), [0, 1])
+        self.assertEqual(sorted(numbers[2:4].tolist()), [5, 6])
+
+    def test_find_all_close_point_numbers__maxpoints(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        offsets, numbers, distances = cloud.find_all_close_point_numbers(
+            [(4.1, 0, 0), (100, 0, 0), (0, 0, 0)],
+            2,
+            maxpoints=2
+        )
+
+        self.assertEqual(offsets.tolist(), [0, 2, 2, 4])
+        self.assertEqual(numbers.tolist(), [4, 5, 0, 1])
+        numpy.testing.assert_allclose(distances, [0.1, 0.9, 0, 1], atol=1e-6)
+
+    def test_find_all_close_point_numbers__maxpoints_invalid(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        with self.assertRaises(ValueError):
+            cloud.find_all_close_point_numbers([(0, 0, 0)], 1, maxpoints=0)
+
+    def test_find_all_close_point_numbers__eps(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry, backend="ckdtree")
+
+        offsets, numbers, _ = cloud.find_all_close_point_numbers(
+            [(0.2, 0, 0)],
+            1,
+            eps=0.1
+        )
+
+        self.assertEqual(sorted(numbers.tolist()), [0, 1])
+
+    def test_find_all_close_point_numbers__workers(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry, backend="ckdtree")
+
+        positions = [(0.2, 0, 0), (5.1, 0, 0), (100, 0, 0)]
+
+        expected = cloud.find_all_close_point_numbers(positions, 1)
+        result = cloud.find_all_close_point_numbers(positions, 1, workers=2)
+
+        for expected_array, result_array in zip(expected, result):
+            numpy.testing.assert_allclose(result_array, expected_array)
+
+    # find_nearest_point_numbers
+
+    def test_find_nearest_point_numbers(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        distances, numbers = cloud.find_nearest_point_numbers(
+            [(0.1, 0, 0), (8.8, 0, 0)],
+            num_points=2
+        )
+
+        self.assertEqual(numbers.tolist(), [[0, 1], [9, 8]])
+        numpy.testing.assert_allclose(distances, [[0.1, 0.9], [0.2, 0.8]])
+
+    def test_find_nearest_point_numbers__maxdist(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        distances, numbers = cloud.find_nearest_point_numbers(
+            [(0.1, 0, 0)],
+            num_points=3,
+            maxdist=1
+        )
+
+        self.assertEqual(numbers.tolist(), [[0, 1, -1]])
+        self.assertTrue(numpy.isinf(distances[0, 2]))
+
+    def test_find_nearest_point_numbers__too_many(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        distances, numbers = cloud.find_nearest_point_numbers([(0, 0, 0)], 12)
+
+        self.assertEqual(numbers.shape, (1, 12))
+        self.assertEqual(numbers[0, 10:].tolist(), [-1, -1])
+
+    def test_find_nearest_point_numbers__invalid(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        with self.assertRaises(ValueError):
+            cloud.find_nearest_point_numbers([(0, 0, 0)], 0)
+
+    def test_find_nearest_point_numbers__grid(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry, backend="grid")
+
+        distances, numbers = cloud.find_nearest_point_numbers(
+            [(0.1, 0, 0), (8.8, 0, 0), (100, 0, 0)],
+            num_points=2,
+            maxdist=2
+        )
+
+        self.assertEqual(numbers.tolist(), [[0, 1], [9, 8], [-1, -1]])
+        numpy.testing.assert_allclose(distances[:2], [[0.1, 0.9], [0.2, 0.8]], rtol=1e-6)
+
+    def test_find_nearest_point_numbers__workers(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry, backend="ckdtree")
+
+        distances, numbers = cloud.find_nearest_point_numbers(
+            [(0.1, 0, 0), (8.8, 0, 0)],
+            num_points=2,
+            workers=-1
+        )
+
+        self.assertEqual(numbers.tolist(), [[0, 1], [9, 8]])
+        numpy.testing.assert_allclose(distances, [[0.1, 0.9], [0.2, 0.8]], rtol=1e-6)
+
+    def test_find_nearest_point_numbers__invalid_workers(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry, backend="ckdtree")
+
+        with self.assertRaises(ValueError):
+            cloud.find_nearest_point_numbers([(0, 0, 0)], workers=0)
+
+    # find_all_close_points
+
+    def test_find_all_close_points__maxpoints(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        cloud.find_all_close_points((4.1, 0, 0), 3, maxpoints=2)
+
+        self.mock_geometry.globPoints.assert_called_with("4 5")
+
+    # find_nearest_points
+
+    def test_find_nearest_points(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        result = cloud.find_nearest_points(hou.Vector3(3.2, 0, 0), 2)
+
+        self.assertEqual(result, self.mock_geometry.globPoints.return_value)
+        self.mock_geometry.globPoints.assert_called_with("3 4")
+
+    def test_find_nearest_points__maxdist(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        result = cloud.find_nearest_points(hou.Vector3(30, 0, 0), 2, maxdist=1)
+
+        self.assertEqual(result, ())
+
+    # save / load
+
+    def test_save_load(self):
+        self.mock_geometry.globPoints.return_value = [
+            self.mock_geometry.iterPoints()[i] for i in (1, 3, 5, 7)
+        ]
+
+        cloud = pointcloud.PointCloud(self.mock_geometry, "1-7:2", backend="ckdtree")
+
+        temp_dir = tempfile.mkdtemp()
+
+        try:
+            file_path = os.path.join(temp_dir, "cloud.idx")
+
+            cloud.save(file_path)
+
+            loaded = pointcloud.PointCloud.load(file_path, self.mock_geometry)
+
+            self.assertIsInstance(loaded._tree, pointcloud.cKDTree)
+            self.assertEqual(loaded._point_map.tolist(), [1, 3, 5, 7])
+            self.assertEqual(loaded._num_elements, 4)
+
+            distances, numbers = loaded.find_nearest_point_numbers(
+                [(4.1, 0, 0)],
+                num_points=2
+            )
+
+            self.assertEqual(numbers.tolist(), [[5, 3]])
+            numpy.testing.assert_allclose(distances, [[0.9, 1.1]], rtol=1e-6)
+
+            # Free the mapped file before removing it.
+            del loaded
+
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_save_load__kdtree(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        temp_dir = tempfile.mkdtemp()
+
+        try:
+            file_path = os.path.join(temp_dir, "cloud.idx")
+
+            cloud.save(file_path)
+
+            loaded = pointcloud.PointCloud.load(file_path, self.mock_geometry)
+
+            self.assertIs(type(loaded._tree), pointcloud.KDTree)
+
+            distances, numbers = loaded.find_nearest_point_numbers(
+                [(4.1, 0, 0)],
+                num_points=2
+            )
+
+            self.assertEqual(numbers.tolist(), [[4, 5]])
+            numpy.testing.assert_allclose(distances, [[0.1, 0.9]], rtol=1e-6)
+
+            # Free the mapped file before removing it.
+            del loaded
+
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_save_load__grid(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry, backend="grid", cell_size=2)
+
+        temp_dir = tempfile.mkdtemp()
+
+        try:
+            file_path = os.path.join(temp_dir, "cloud.idx")
+
+            cloud.save(file_path)
+
+            loaded = pointcloud.PointCloud.load(file_path, self.mock_geometry)
+
+            # All the grid arrays are mapped from the file.
+            self.assertIsInstance(loaded._tree, pointcloud.SpatialHashGrid)
+            self.assertIsInstance(loaded._tree.data, numpy.memmap)
+            self.assertIsInstance(loaded._tree._cell_keys, numpy.memmap)
+            self.assertEqual(loaded._tree.cell_size, 2)
+
+            offsets, numbers, _ = loaded.find_all_close_point_numbers([(4.1, 0, 0)], 1)
+
+            self.assertEqual(offsets.tolist(), [0, 2])
+            self.assertEqual(sorted(numbers.tolist()), [4, 5])
+
+            # Free the mapped file before removing it.
+            del loaded
+
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_load__invalid(self):
+        handle, file_path = tempfile.mkstemp()
+        os.write(handle, b"not an index")
+        os.close(handle)
+
+        try:
+            with self.assertRaises(ValueError):
+                pointcloud.PointCloud.load(file_path, self.mock_geometry)
+
+        finally:
+            os.remove(file_path)
+
+    # get_neighbour_graph
+
+    def test_get_neighbour_graph__radius(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        indptr, indices, distances = cloud.get_neighbour_graph(radius=1.5)
+
+        self.assertEqual(indptr.tolist(), [0, 1, 3, 5, 7, 9, 11, 13, 15, 17, 18])
+        self.assertEqual(sorted(indices[indptr[4]:indptr[5]].tolist()), [3, 5])
+        numpy.testing.assert_allclose(distances, 1)
+
+    def test_get_neighbour_graph__num_points(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        indptr, indices, distances = cloud.get_neighbour_graph(num_points=1)
+
+        self.assertEqual(indptr.tolist(), list(range(11)))
+        self.assertEqual(indices[0], 1)
+        self.assertEqual(indices[9], 8)
+        numpy.testing.assert_allclose(distances, 1)
+
+    def test_get_neighbour_graph__components(self):
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        self.mock_geometry.globPoints.return_value = [
+            self.mock_geometry.iterPoints()[i] for i in (0, 1, 2, 6, 7)
+        ]
+
+        cloud = pointcloud.PointCloud(self.mock_geometry, "0-2 6-7")
+
+        indptr, indices, distances = cloud.get_neighbour_graph(radius=1.1)
+
+        graph = csr_matrix((distances, indices, indptr), shape=(5, 5))
+
+        num_components, labels = connected_components(graph)
+
+        self.assertEqual(num_components, 2)
+        self.assertEqual(labels.tolist(), [0, 0, 0, 1, 1])
+        self.assertEqual(cloud.point_numbers.tolist(), [0, 1, 2, 6, 7])
+
+    def test_get_neighbour_graph__invalid(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        with self.assertRaises(ValueError):
+            cloud.get_neighbour_graph()
+
+    # get_points
+
+    def test_get_points(self):
+        cloud = pointcloud.PointCloud(self.mock_geometry)
+
+        all_points = self.mock_geometry.iterPoints()
+
+        result = cloud.get_points(numpy.array([[3, -1], [1, 7]]))
+
+        self.assertEqual(result, (all_points[3], all_points[1], all_points[7]))
+
+
+class Test_PointCloudCache(unittest.TestCase):
+    """Test ht.geometry.pointcloud.PointCloudCache object."""
+
+    def setUp(self):
+        super(Test_PointCloudCache, self).setUp()
+
+        self.patcher = patch("ht.geometry.pointcloud._get_geometry_data_id")
+        self.mock_data_id = self.patcher.start()
+        self.mock_data_id.return_value = 1
+
+    def tearDown(self):
+        super(Test_PointCloudCache, self).tearDown()
+
+        self.patcher.stop()
+
+    # get
+
+    @patch("ht.geometry.pointcloud.PointCloud")
+    def test_get__hit(self, mock_cloud):
+        mock_cloud.return_value.nbytes = 10
+        mock_node = MagicMock()
+
+        cache = pointcloud.PointCloudCache(100)
+
+        result1 = cache.get(mock_node, "group1", leaf_size=5)
+        result2 = cache.get(mock_node, "group1", leaf_size=5)
+
+        self.assertEqual(result1, mock_cloud.return_value)
+        self.assertEqual(result2, mock_cloud.return_value)
+        mock_cloud.assert_called_once_with(mock_node.geometry.return_value, "group1", leaf_size=5)
+        self.mock_data_id.assert_called_with(mock_node.geometry.return_value, "group1")
+
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.num_bytes, 10)
+
+    @patch("ht.geometry.pointcloud.PointCloud")
+    def test_get__numbers(self, mock_cloud):
+        mock_cloud.return_value.nbytes = 10
+        mock_node = MagicMock()
+
+        cache = pointcloud.PointCloudCache(100)
+
+        result1 = cache.get(mock_node, numpy.array([0, 2]))
+        result2 = cache.get(mock_node, numpy.array([0, 2]))
+        cache.get(mock_node, [1, 2])
+
+        self.assertIs(result1, result2)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 2)
+
+    @patch("ht.geometry.pointcloud.PointCloud")
+    def test_get__group(self, mock_cloud):
+        mock_cloud.return_value.nbytes = 10
+        mock_node = MagicMock()
+
+        mock_group1 = MagicMock(spec=hou.PointGroup)
+        mock_group1.name.return_value = "group1"
+
+        mock_group2 = MagicMock(spec=hou.PointGroup)
+        mock_group2.name.return_value = "group1"
+
+        cache = pointcloud.PointCloudCache(100)
+
+        result1 = cache.get(mock_node, mock_group1)
+        result2 = cache.get(mock_node, mock_group2)
+
+        # Groups are identified by name rather than the HOM object.
+        self.assertIs(result1, result2)
+        self.assertEqual(cache.hits, 1)
+
+    @patch("ht.geometry.pointcloud.PointCloud")
+    def test_get__changed(self, mock_cloud):
+        mock_cloud.return_value.nbytes = 10
+        mock_node = MagicMock()
+
+        cache = pointcloud.PointCloudCache(100)
+
+        cache.get(mock_node)
+
+        self.mock_data_id.return_value = 2
+
+        cache.get(mock_node)
+
+        self.assertEqual(mock_cloud.call_count, 2)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.num_bytes, 10)
+
+    @patch("ht.geometry.pointcloud.PointCloud")
+    def test_get__evict(self, mock_cloud):
+        mock_cloud.return_value.nbytes = 40
+
+        mock_node1 = MagicMock()
+        mock_node1.path.return_value = "/obj/geo1/node1"
+
+        mock_node2 = MagicMock()
+        mock_node2.path.return_value = "/obj/geo1/node2"
+
+        mock_node3 = MagicMock()
+        mock_node3.path.return_value = "/obj/geo1/node3"
+
+        cache = pointcloud.PointCloudCache(100)
+
+        cache.get(mock_node1)
+        cache.get(mock_node2)
+
+        # Use node1 again so that node2 is the least recently used.
+        cache.get(mock_node1)
+
+        cache.get(mock_node3)
+
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.num_bytes, 80)
+
+        cache.get(mock_node1)
+        cache.get(mock_node2)
+
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 4)
+
+    # max_bytes
+
+    @patch("ht.geometry.pointcloud.PointCloud")
+    def test_max_bytes(self, mock_cloud):
+        mock_cloud.return_value.nbytes = 40
+
+        cache = pointcloud.PointCloudCache(100)
+
+        cache.get(MagicMock(), "1")
+        cache.get(MagicMock(), "2")
+
+        cache.max_bytes = 50
+
+        self.assertEqual(cache.max_bytes, 50)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.evictions, 1)
+
+
+class Test__get_geometry_data_id(unittest.TestCase):
+    """Test ht.geometry.pointcloud._get_geometry_data_id."""
+
+    def setUp(self):
+        super(Test__get_geometry_data_id, self).setUp()
+
+        self.mock_geometry = _build_mock_geometry(_POSITIONS)
+        self.mock_geometry.intrinsicValue.return_value = 10
+        self.mock_geometry.findPointAttrib.return_value.dataId.return_value = 1
+        self.mock_geometry.topologyDataId.return_value = 2
+
+        self.mock_node = self.mock_geometry.sopNode.return_value
+        self.mock_node.cookCount.return_value = 3
+
+    def test(self):
+        result = pointcloud._get_geometry_data_id(self.mock_geometry)
+
+        self.assertEqual(result, (10, 1, 2))
+
+    def test_pattern__group_changed(self):
+        result1 = pointcloud._get_geometry_data_id(self.mock_geometry, "group1")
+
+        # The group membership changes which recooks the node but doesn't
+        # change P or the topology.
+        self.mock_node.cookCount.return_value = 4
+
+        result2 = pointcloud._get_geometry_data_id(self.mock_geometry, "group1")
+
+        self.assertNotEqual(result1, result2)
+
+        # Clouds without a pattern don't depend on the groups.
+        self.assertEqual(
+            pointcloud._get_geometry_data_id(self.mock_geometry),
+            (10, 1, 2)
+        )
+
+    def test_pattern__numbers(self):
+        result = pointcloud._get_geometry_data_id(
+            self.mock_geometry,
+            numpy.array([0, 1])
+        )
+
+        # Point numbers don't depend on the groups.
+        self.assertEqual(result, (10, 1, 2))
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def _build_mock_geometry(positions):
+    """Build a mock hou.Geometry with the supplied point positions."""
+    mock_geometry = MagicMock(spec=hou.Geometry)
+
+    mock_points = []
+
+    for i, position in enumerate(positions):
+        mock_point = MagicMock(spec=hou.Point)
+        mock_point.number.return_value = i
+        mock_point.position.return_value = tuple(position)
+
+        mock_points.append(mock_point)
+
+    mock_geometry.iterPoints.return_value = mock_points
+    mock_geometry.findPointGroup.return_value = None
+
+    def get_positions(name, float_type):
+        if float_type == hou.numericData.Float64:
+            return positions.astype(numpy.float64).tobytes()
+
+        return positions.astype(numpy.float32).tobytes()
+
+    mock_geometry.pointFloatAttribValuesAsString.side_effect = get_positions
+
+    return mock_geometry
+
+# =============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
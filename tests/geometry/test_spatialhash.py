@@ -0,0 +1,143 @@
+"""Test the ht.geometry.spatialhash module."""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Python Imports
+import numpy
+from scipy.spatial import cKDTree
+import unittest
+
+# Houdini Toolbox Imports
+from ht.geometry import spatialhash
+
+reload(spatialhash)
+
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+_POSITIONS = numpy.random.RandomState(0).random_sample((500, 3))
+
+_QUERY_POSITIONS = numpy.random.RandomState(1).random_sample((50, 3)) * 1.2 - 0.1
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+class Test_SpatialHashGrid(unittest.TestCase):
+    """Test ht.geometry.spatialhash.SpatialHashGrid object."""
+
+    def test___init__(self):
+        grid = spatialhash.SpatialHashGrid(_POSITIONS, cell_size=0.25)
+
+        self.assertEqual(len(grid), 500)
+        self.assertEqual(grid.cell_size, 0.25)
+        self.assertEqual(grid._dims.tolist(), [4, 4, 4])
+        self.assertEqual(grid._cell_starts[-1], 500)
+
+    def test___init____default_cell_size(self):
+        grid = spatialhash.SpatialHashGrid(_POSITIONS, leafsize=4)
+
+        # About leafsize points per cell in a roughly unit cube.
+        self.assertAlmostEqual(grid.cell_size, (4 / 500.0) ** (1 / 3.0), places=1)
+
+    def test___init____flat(self):
+        positions = _POSITIONS.copy()
+        positions[:, 2] = 0
+
+        grid = spatialhash.SpatialHashGrid(positions)
+
+        self.assertEqual(grid._dims[2], 1)
+
+    def test___init____invalid(self):
+        with self.assertRaises(ValueError):
+            spatialhash.SpatialHashGrid(_POSITIONS, cell_size=0)
+
+    # query
+
+    def test_query(self):
+        grid = spatialhash.SpatialHashGrid(_POSITIONS, cell_size=0.1)
+        tree = cKDTree(_POSITIONS)
+
+        distances, indexes = grid.query(_QUERY_POSITIONS, 5)
+        expected_distances, expected_indexes = tree.query(_QUERY_POSITIONS, 5)
+
+        numpy.testing.assert_allclose(distances, expected_distances)
+        numpy.testing.assert_array_equal(indexes, expected_indexes)
+
+    def test_query__outside_bounds(self):
+        grid = spatialhash.SpatialHashGrid(_POSITIONS, cell_size=0.01)
+        tree = cKDTree(_POSITIONS)
+
+        positions = [(3, 3, 3), (-50, 0.5, 0.5), (0.5, 0.5, 0.5)]
+
+        distances, indexes = grid.query(positions, 3)
+        expected_distances, expected_indexes = tree.query(positions, 3)
+
+        numpy.testing.assert_allclose(distances, expected_distances)
+        numpy.testing.assert_array_equal(indexes, expected_indexes)
+
+    def test_query__upper_bound(self):
+        grid = spatialhash.SpatialHashGrid(_POSITIONS, cell_size=0.1)
+
+        distances, indexes = grid.query(_QUERY_POSITIONS, 500, distance_upper_bound=0.1)
+
+        found = indexes < 500
+
+        self.assertTrue(numpy.all(distances[found] <= 0.1))
+        self.assertTrue(numpy.all(numpy.isinf(distances[~found])))
+
+    def test_query__too_many(self):
+        grid = spatialhash.SpatialHashGrid(_POSITIONS[:3], cell_size=0.1)
+
+        distances, indexes = grid.query([(0.5, 0.5, 0.5)], 5)
+
+        self.assertEqual(sorted(indexes[0, :3].tolist()), [0, 1, 2])
+        self.assertEqual(indexes[0, 3:].tolist(), [3, 3])
+
+    # query_radius
+
+    def test_query_radius(self):
+        grid = spatialhash.SpatialHashGrid(_POSITIONS)
+        tree = cKDTree(_POSITIONS)
+
+        offsets, indexes, distances = grid.query_radius(_QUERY_POSITIONS, 0.15)
+
+        expected = tree.query_ball_point(_QUERY_POSITIONS, 0.15)
+
+        for i, expected_indexes in enumerate(expected):
+            found = indexes[offsets[i]:offsets[i+1]]
+
+            self.assertEqual(sorted(found.tolist()), sorted(expected_indexes))
+
+        deltas = _POSITIONS[indexes] - numpy.repeat(
+            _QUERY_POSITIONS,
+            numpy.diff(offsets),
+            axis=0
+        )
+
+        numpy.testing.assert_allclose(distances, numpy.sqrt((deltas ** 2).sum(axis=1)))
+
+    def test_query_radius__large_radius(self):
+        grid = spatialhash.SpatialHashGrid(_POSITIONS, cell_size=0.01)
+
+        offsets, indexes, _ = grid.query_radius([(3, 3, 3), (100, 0, 0)], [10, 1])
+
+        self.assertEqual(offsets.tolist(), [0, 500, 500])
+        self.assertEqual(sorted(indexes.tolist()), list(range(500)))
+
+    def test_query_radius__empty(self):
+        grid = spatialhash.SpatialHashGrid(numpy.zeros((0, 3)))
+
+        offsets, indexes, distances = grid.query_radius(_QUERY_POSITIONS, 0.15)
+
+        self.assertEqual(offsets.tolist(), [0] * 51)
+        self.assertEqual(len(indexes), 0)
+        self.assertEqual(len(distances), 0)
+
+# =============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
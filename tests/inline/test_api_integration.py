@@ -13,11 +13,15 @@ have the Houdini environments sourced.
 # =============================================================================
 
 # Python Imports
+from collections import OrderedDict
+import ctypes
+import numpy
 import os
 import unittest
 
 # Houdini Toolbox Imports
 import ht.inline.api
+import ht.inline.profiling
 
 # Houdini Imports
 import hou
@@ -72,6 +76,63 @@ class TestInlineCpp(unittest.TestCase):
 
         self.assertEqual(ht.inline.api.get_variable("awesome"), 22)
 
+    def test_get_variables(self):
+        ht.inline.api.set_variable("bulk1", 22)
+        ht.inline.api.set_variable("bulk2", "value")
+
+        values = ht.inline.api.get_variables(["bulk2", "bulk1", "bulk_missing"])
+
+        self.assertEqual(values.keys(), ["bulk2", "bulk1", "bulk_missing"])
+        self.assertEqual(values.values(), ["value", 22, None])
+
+        # Changing a variable invalidates its cached value.
+        ht.inline.api.set_variable("bulk1", 33)
+
+        self.assertEqual(ht.inline.api.get_variable("bulk1"), 33)
+
+        ht.inline.api.unset_variable("bulk1")
+        ht.inline.api.unset_variable("bulk2")
+
+        self.assertEqual(ht.inline.api.get_variables(["bulk1", "bulk2"]).values(), [None, None])
+
+    def test_clear_variable_cache(self):
+        ht.inline.api.set_variable("cached", 1)
+
+        self.assertEqual(ht.inline.api.get_variables(["cached"])["cached"], 1)
+
+        # Setting through hscript bypasses the cache.
+        hou.hscript("set cached = 2")
+
+        self.assertEqual(ht.inline.api.get_variables(["cached"])["cached"], 1)
+
+        # Single variables and uncached reads are always current.
+        self.assertEqual(ht.inline.api.get_variable("cached"), 2)
+        self.assertEqual(
+            ht.inline.api.get_variables(["cached"], cached=False)["cached"],
+            2
+        )
+
+        hou.hscript("set cached = 3")
+
+        ht.inline.api.clear_variable_cache()
+
+        self.assertEqual(ht.inline.api.get_variables(["cached"])["cached"], 3)
+
+        ht.inline.api.unset_variable("cached")
+
+    def test_variable_cache_hip_event(self):
+        ht.inline.api.get_variables(["HIPNAME"])
+
+        # Saving the hip file should invalidate cached values.
+        hou.hipFile.save(os.path.join(THIS_DIR, "test_inline_cache.hipnc"))
+
+        try:
+            self.assertNotIn("HIPNAME", ht.inline.api._VARIABLE_CACHE)
+
+        finally:
+            hou.hipFile.load(os.path.join(THIS_DIR, "test_inline.hipnc"))
+            os.remove(os.path.join(THIS_DIR, "test_inline_cache.hipnc"))
+
     def test_get_variable_names(self):
         variable_names = ht.inline.api.get_variable_names()
 
@@ -321,6 +382,77 @@ class TestInlineCpp(unittest.TestCase):
             target_geo.primFloatAttribValues("id"),
         )
 
+    def test_sort_by_array_expression_points(self):
+        geo = hou.Geometry()
+
+        positions = numpy.array([(0, 3, 0), (0, 1, 0), (0, 2, 0)], dtype=float)
+        ht.inline.api.create_points_at_positions(geo, positions)
+
+        geo.addAttrib(hou.attribType.Point, "id", 0)
+        geo.setPointIntAttribValues("id", (0, 1, 2))
+
+        ht.inline.api.sort_by_array_expression(
+            geo,
+            hou.geometryType.Points,
+            "P[:, 1]"
+        )
+
+        self.assertEqual(geo.pointIntAttribValues("id"), (1, 2, 0))
+
+    def test_sort_by_array_expression_prims(self):
+        geo = hou.Geometry()
+
+        for _ in range(3):
+            geo.createPolygon()
+
+        geo.addAttrib(hou.attribType.Prim, "id", 0)
+        geo.setPrimIntAttribValues("id", (0, 1, 2))
+
+        ht.inline.api.sort_by_array_expression(
+            geo,
+            hou.geometryType.Primitives,
+            "-primnum"
+        )
+
+        self.assertEqual(geo.primIntAttribValues("id"), (2, 1, 0))
+
+    def test_sort_by_array_expression_invalid(self):
+        geo = hou.Geometry()
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.sort_by_array_expression(
+                geo,
+                hou.geometryType.Vertices,
+                "ptnum"
+            )
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.sort_by_array_expression(
+                geo,
+                hou.geometryType.Points,
+                "P[:"
+            )
+
+    def test_sort_by_array_expression_invalid_result(self):
+        geo = hou.Geometry()
+        ht.inline.api.create_n_points(geo, 3)
+
+        # Unknown names.
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.sort_by_array_expression(
+                geo,
+                hou.geometryType.Points,
+                "missing * 2"
+            )
+
+        # Results which aren't a value per point.
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.sort_by_array_expression(
+                geo,
+                hou.geometryType.Points,
+                "P"
+            )
+
     def test_create_point_at_position(self):
         geo = hou.Geometry()
 
@@ -340,6 +472,47 @@ class TestInlineCpp(unittest.TestCase):
         with self.assertRaises(hou.OperationFailed):
             ht.inline.api.create_n_points(geo, -4)
 
+    def test_create_n_points_sequence(self):
+        geo = hou.Geometry()
+        points = ht.inline.api.create_n_points(geo, 15)
+
+        self.assertIsInstance(points, ht.inline.api.ElementSequence)
+        self.assertEqual(len(points), 15)
+        self.assertEqual(points[3], geo.iterPoints()[3])
+        self.assertEqual(points[-1], geo.iterPoints()[14])
+        self.assertEqual(points[2:5], geo.globPoints("2-4"))
+        self.assertEqual(list(points.numbers), range(15))
+
+        # Sequences behave like the tuples the function used to return.
+        self.assertEqual(points + (), geo.points())
+        self.assertEqual(() + points[:2], geo.globPoints("0-1"))
+        self.assertEqual(points[:2] * 2, geo.globPoints("0-1") * 2)
+        self.assertEqual(hash(points), hash(geo.points()))
+        self.assertNotEqual(points[:2], list(geo.globPoints("0-1")))
+        self.assertTrue(geo.iterPoints()[4] in points)
+
+    def test_create_points_at_positions(self):
+        geo = hou.Geometry()
+        geo.createPoint()
+
+        positions = numpy.arange(30, dtype=numpy.float32).reshape(10, 3)
+
+        points = ht.inline.api.create_points_at_positions(geo, positions)
+
+        self.assertEqual(len(points), 10)
+        self.assertEqual(points[0].number(), 1)
+        self.assertEqual(points[-1].number(), 10)
+        self.assertEqual(points[4].position(), hou.Vector3(12, 13, 14))
+
+    def test_create_points_at_positions_invalid(self):
+        geo = hou.Geometry()
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.create_points_at_positions(geo, numpy.zeros((0, 3)))
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.create_points_at_positions(geo, numpy.zeros((4, 2)))
+
     def test_merge_point_group(self):
         geo = hou.Geometry()
         source_geo = get_obj_geo("test_merge_point_group")
@@ -420,6 +593,145 @@ class TestInlineCpp(unittest.TestCase):
         self.assertEqual(p1.attribValue("prnum"), 1)
         self.assertEqual(p2.attribValue("prnum"), 4)
 
+    def test_batch_copy_attribute_values(self):
+        source = hou.Geometry()
+        source.addAttrib(hou.attribType.Point, "foo", 0.0)
+        source.addAttrib(hou.attribType.Point, "name", "")
+
+        for i in range(4):
+            point = source.createPoint()
+            point.setAttribValue("foo", float(i))
+            point.setAttribValue("name", "point{}".format(i))
+
+        target = hou.Geometry()
+        ht.inline.api.create_n_points(target, 3)
+
+        ht.inline.api.batch_copy_attribute_values(
+            source,
+            hou.geometryType.Points,
+            [3, 1, 0],
+            source.pointAttribs(),
+            target,
+            hou.geometryType.Points,
+            [0, 1, 2]
+        )
+
+        self.assertEqual(target.pointFloatAttribValues("foo"), (3.0, 1.0, 0.0))
+        self.assertEqual(
+            target.pointStringAttribValues("name"),
+            ("point3", "point1", "point0")
+        )
+
+    def test_batch_copy_attribute_values_prims(self):
+        source = hou.Geometry()
+        source.addAttrib(hou.attribType.Point, "foo", 0.0)
+
+        for i in range(2):
+            point = source.createPoint()
+            point.setAttribValue("foo", float(i + 1))
+
+        target = hou.Geometry()
+
+        for _ in range(2):
+            target.createPolygon()
+
+        ht.inline.api.batch_copy_attribute_values(
+            source,
+            hou.geometryType.Points,
+            numpy.array([1, 0]),
+            source.pointAttribs(),
+            target,
+            hou.geometryType.Primitives,
+            numpy.array([0, 1])
+        )
+
+        self.assertEqual(target.primFloatAttribValues("foo"), (2.0, 1.0))
+
+    def test_batch_copy_attribute_values_mismatch(self):
+        source = hou.Geometry()
+        target = hou.Geometry()
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.batch_copy_attribute_values(
+                source,
+                hou.geometryType.Points,
+                [0, 1],
+                [],
+                target,
+                hou.geometryType.Points,
+                [0]
+            )
+
+    def test_batch_copy_attribute_values_invalid_source(self):
+        source = hou.Geometry()
+        ht.inline.api.create_n_points(source, 2)
+
+        target = hou.Geometry()
+        ht.inline.api.create_n_points(target, 2)
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.batch_copy_attribute_values(
+                source,
+                hou.geometryType.Points,
+                [0, 2],
+                source.pointAttribs(),
+                target,
+                hou.geometryType.Points,
+                [0, 1]
+            )
+
+    def test_batch_copy_attribute_values_invalid_target(self):
+        source = hou.Geometry()
+        ht.inline.api.create_n_points(source, 2)
+
+        target = hou.Geometry()
+        ht.inline.api.create_n_points(target, 2)
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.batch_copy_attribute_values(
+                source,
+                hou.geometryType.Points,
+                [0, 1],
+                source.pointAttribs(),
+                target,
+                hou.geometryType.Points,
+                [-1, 1]
+            )
+
+    def test_batch_copy_attribute_values_duplicate_targets(self):
+        source = hou.Geometry()
+        ht.inline.api.create_n_points(source, 2)
+
+        target = hou.Geometry()
+        ht.inline.api.create_n_points(target, 2)
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.batch_copy_attribute_values(
+                source,
+                hou.geometryType.Points,
+                [0, 1],
+                source.pointAttribs(),
+                target,
+                hou.geometryType.Points,
+                [1, 1]
+            )
+
+    def test_batch_copy_attribute_values_overlap(self):
+        geo = hou.Geometry()
+        geo.addAttrib(hou.attribType.Point, "foo", 0.0)
+        ht.inline.api.create_n_points(geo, 3)
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.batch_copy_attribute_values(
+                geo,
+                hou.geometryType.Points,
+                [0, 1],
+                geo.pointAttribs(),
+                geo,
+                hou.geometryType.Points,
+                [1, 2]
+            )
+
     def test_point_adjacent_polygons(self):
         geo = get_obj_geo("test_point_adjacent_polygons")
 
@@ -465,6 +777,58 @@ class TestInlineCpp(unittest.TestCase):
 
         self.assertEqual(verts, target)
 
+    def test_topology_adjacency_point_points(self):
+        geo = get_obj_geo_copy("test_connected_points")
+
+        indptr, indices = ht.inline.api.topology_adjacency(geo, "point_points")
+
+        self.assertEqual(len(indptr), len(geo.iterPoints()) + 1)
+        self.assertEqual(indices[indptr[4]:indptr[5]].tolist(), [1, 3, 5, 7])
+
+    def test_topology_adjacency_prim_prims(self):
+        geo = get_obj_geo_copy("test_point_adjacent_polygons")
+
+        indptr, indices = ht.inline.api.topology_adjacency(geo, "prim_prims")
+
+        self.assertEqual(indices[indptr[0]:indptr[1]].tolist(), [1, 2])
+
+    def test_topology_adjacency_point_vertices(self):
+        geo = get_obj_geo_copy("test_referencing_vertices")
+
+        indptr, indices = ht.inline.api.topology_adjacency(geo, "point_vertices")
+
+        target = sorted(
+            vertex.linearNumber() for vertex in geo.globVertices("0v2 1v3 2v1 3v0")
+        )
+
+        self.assertEqual(indices[indptr[4]:indptr[5]].tolist(), target)
+
+    def test_topology_adjacency_cached(self):
+        geo = get_obj_geo("test_connected_points")
+
+        result = ht.inline.api.topology_adjacency(geo)
+
+        self.assertIs(ht.inline.api.topology_adjacency(geo)[1], result[1])
+
+    def test_topology_adjacency_not_cached(self):
+        # Geometry without a SOP node can't be identified between calls.
+        geo = get_obj_geo_copy("test_connected_points")
+
+        result = ht.inline.api.topology_adjacency(geo)
+
+        geo.createPoint()
+
+        new_result = ht.inline.api.topology_adjacency(geo)
+
+        self.assertIsNot(new_result[1], result[1])
+        self.assertEqual(len(new_result[0]), len(result[0]) + 1)
+
+    def test_topology_adjacency_invalid(self):
+        geo = hou.Geometry()
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.topology_adjacency(geo, "edges")
+
     def test_point_string_table_indices(self):
         geo = get_obj_geo("test_point_string_table_indices")
 
@@ -529,6 +893,54 @@ class TestInlineCpp(unittest.TestCase):
         with self.assertRaises(hou.OperationFailed):
            ht.inline.api.set_vertex_string_attrib_values(geo, "test", target)
 
+    def test_string_attrib_table_values_vertex(self):
+        geo = get_obj_geo("test_vertex_string_attrib_values")
+        attrib = geo.findVertexAttrib("test")
+
+        table, indices = ht.inline.api.string_attrib_table_values(attrib)
+
+        self.assertEqual(
+            tuple(table[index] for index in indices),
+            ht.inline.api.vertex_string_attrib_values(geo, "test")
+        )
+
+    def test_set_string_attrib_table_values_point(self):
+        geo = hou.Geometry()
+        ht.inline.api.create_n_points(geo, 5)
+        attrib = geo.addAttrib(hou.attribType.Point, "test", "")
+
+        ht.inline.api.set_string_attrib_table_values(
+            attrib,
+            ("a", "b"),
+            numpy.array([0, 1, 1, -1, 0])
+        )
+
+        self.assertEqual(
+            geo.pointStringAttribValues("test"),
+            ("a", "b", "b", "", "a")
+        )
+
+        table, indices = ht.inline.api.string_attrib_table_values(attrib)
+
+        self.assertEqual(
+            [table[index] if index >= 0 else "" for index in indices],
+            ["a", "b", "b", "", "a"]
+        )
+
+    def test_set_string_attrib_table_values_invalid(self):
+        geo = hou.Geometry()
+
+        for _ in range(3):
+            geo.createPolygon()
+
+        attrib = geo.addAttrib(hou.attribType.Prim, "test", "")
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.set_string_attrib_table_values(attrib, ("a",), [0, 0])
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.set_string_attrib_table_values(attrib, ("a",), [0, 1, 0])
+
     def test_set_shared_point_string_attrib(self):
         target = ["point0"]*5
         geo = hou.Geometry()
@@ -766,6 +1178,102 @@ class TestInlineCpp(unittest.TestCase):
 
         self.assertEqual(ht.inline.api.primitive_bounding_box(prim), target)
 
+    def test_primitive_areas(self):
+        geo = get_obj_geo_copy("test_primitive_area")
+
+        result = ht.inline.api.primitive_areas(geo)
+
+        target = [ht.inline.api.primitive_area(prim) for prim in geo.prims()]
+
+        numpy.testing.assert_allclose(result, target, rtol=1e-6)
+
+    def test_primitive_areas_attrib(self):
+        geo = get_obj_geo_copy("test_primitive_area")
+
+        result = ht.inline.api.primitive_areas(geo, attrib_name="area")
+
+        values = geo.primFloatAttribValues("area")
+
+        numpy.testing.assert_allclose(values, result, rtol=1e-6)
+
+    def test_primitive_areas_attrib_invalid_type(self):
+        geo = get_obj_geo_copy("test_primitive_area")
+        geo.addAttrib(hou.attribType.Prim, "area", "")
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.primitive_areas(geo, attrib_name="area")
+
+    def test_primitive_bary_centers_attrib_invalid_size(self):
+        geo = get_obj_geo_copy("test_bary_center")
+        geo.addAttrib(hou.attribType.Prim, "center", 0.0)
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.primitive_bary_centers(geo, attrib_name="center")
+
+    def test_primitive_areas_other_group(self):
+        geo = get_obj_geo_copy("test_primitive_area")
+
+        other = hou.Geometry()
+        other.createPolygon()
+        group = other.createPrimGroup("other")
+        group.add(other.iterPrims()[0])
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.primitive_areas(geo, group=group)
+
+    def test_primitive_areas_read_only(self):
+        geo = get_obj_geo("test_primitive_area")
+
+        with self.assertRaises(hou.GeometryPermissionError):
+            ht.inline.api.primitive_areas(geo, attrib_name="area")
+
+    def test_primitive_bary_centers(self):
+        geo = get_obj_geo_copy("test_bary_center")
+
+        result = ht.inline.api.primitive_bary_centers(geo)
+
+        self.assertEqual(result.shape, (len(geo.iterPrims()), 3))
+        self.assertEqual(hou.Vector3(result[0]), hou.Vector3(1.5, 1, -1))
+
+    def test_primitive_bounding_boxes(self):
+        geo = get_obj_geo_copy("test_prim_bounding_box")
+
+        result = ht.inline.api.primitive_bounding_boxes(geo)
+
+        self.assertEqual(
+            hou.BoundingBox(*result[0]),
+            hou.BoundingBox(-0.75, 0, -0.875, 0.75, 1.5, 0.875)
+        )
+
+    def test_primitive_perimeters(self):
+        geo = get_obj_geo_copy("test_perimeter")
+
+        result = ht.inline.api.primitive_perimeters(geo)
+
+        self.assertAlmostEqual(result[0], 6.5, places=5)
+
+    def test_primitive_volumes(self):
+        geo = get_obj_geo_copy("test_volume")
+
+        result = ht.inline.api.primitive_volumes(geo)
+
+        self.assertAlmostEqual(
+            result[0],
+            ht.inline.api.primitive_volume(geo.iterPrims()[0]),
+            places=5
+        )
+
+    def test_primitive_metrics_group(self):
+        geo = get_obj_geo_copy("test_primitive_area")
+
+        group = geo.createPrimGroup("metrics")
+        group.add(geo.iterPrims()[0])
+
+        result = ht.inline.api.primitive_areas(geo, group=group)
+
+        self.assertEqual(result.shape, (1,))
+        self.assertAlmostEqual(result[0], 4.375, places=5)
+
     def test_compute_point_normals(self):
         geo = get_obj_geo_copy("test_compute_point_normals")
 
@@ -1089,6 +1597,75 @@ class TestInlineCpp(unittest.TestCase):
 
         self.assertEquals(len(group.edges()),  20)
 
+    def test_set_group_membership_mask(self):
+        geo = hou.Geometry()
+        ht.inline.api.create_n_points(geo, 10)
+
+        group = geo.createPointGroup("group")
+
+        mask = numpy.arange(10) % 2 == 0
+
+        ht.inline.api.set_group_membership(group, mask)
+
+        self.assertEqual(
+            [point.number() for point in group.points()],
+            [0, 2, 4, 6, 8]
+        )
+
+        ht.inline.api.set_group_membership(group, [1, 3])
+
+        self.assertEqual([point.number() for point in group.points()], [1, 3])
+
+    def test_add_remove_toggle_group_membership(self):
+        geo = hou.Geometry()
+
+        for _ in range(6):
+            geo.createPolygon()
+
+        group = geo.createPrimGroup("group")
+
+        ht.inline.api.add_to_group(group, [0, 1, 2, 3])
+        ht.inline.api.remove_from_group(group, numpy.array([1]))
+        ht.inline.api.toggle_group_membership(group, [3, 4, 4])
+
+        self.assertEqual([prim.number() for prim in group.prims()], [0, 2, 4])
+
+    def test_group_membership_invalid(self):
+        geo = hou.Geometry()
+        ht.inline.api.create_n_points(geo, 5)
+
+        group = geo.createPointGroup("group")
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.add_to_group(group, [True, False])
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.add_to_group(group, [5])
+
+    def test_group_membership_mask(self):
+        geo = hou.Geometry()
+        ht.inline.api.create_n_points(geo, 6)
+
+        group1 = geo.createPointGroup("group1")
+        group1.add(geo.globPoints("0-3"))
+
+        group2 = geo.createPointGroup("group2")
+        group2.add(geo.globPoints("2-5"))
+
+        mask1 = ht.inline.api.group_membership_mask(group1)
+        mask2 = ht.inline.api.group_membership_mask(group2)
+
+        self.assertEqual(mask1.dtype, numpy.bool_)
+        self.assertEqual(
+            mask1.tolist(),
+            [True, True, True, True, False, False]
+        )
+
+        group3 = geo.createPointGroup("group3")
+        ht.inline.api.set_group_membership(group3, mask1 & mask2)
+
+        self.assertEqual([point.number() for point in group3.points()], [2, 3])
+
     def test_copy_point_group(self):
         geo = get_obj_geo_copy("test_copy_point_group")
 
@@ -1175,6 +1752,65 @@ class TestInlineCpp(unittest.TestCase):
 
         self.assertFalse(ht.inline.api.prim_groups_share_primitives(group1, group2))
 
+    def test_group_statistics_points(self):
+        geo = hou.Geometry()
+
+        positions = numpy.array(
+            [(0, 0, 0), (1, 0, 0), (2, 2, 0), (3, 0, 4)],
+            dtype=float
+        )
+        ht.inline.api.create_points_at_positions(geo, positions)
+
+        group1 = geo.createPointGroup("group1")
+        group1.add(geo.globPoints("0 1 2"))
+
+        group2 = geo.createPointGroup("group2")
+        group2.add(geo.globPoints("2 3"))
+
+        groups, sizes, bounds, overlaps = ht.inline.api.group_statistics(
+            geo,
+            hou.geometryType.Points
+        )
+
+        self.assertEqual(groups, (group1, group2))
+        self.assertEqual(sizes.tolist(), [3, 2])
+        self.assertEqual(bounds.tolist(), [[0, 0, 0, 2, 2, 0], [2, 0, 0, 3, 2, 4]])
+        self.assertEqual(overlaps.tolist(), [[3, 1], [1, 2]])
+
+    def test_group_statistics_prims(self):
+        geo = hou.Geometry()
+
+        for _ in range(4):
+            geo.createPolygon()
+
+        group1 = geo.createPrimGroup("group1")
+        group1.add(geo.globPrims("0 1"))
+
+        group2 = geo.createPrimGroup("group2")
+        group2.add(geo.globPrims("2 3"))
+
+        groups, sizes, _, overlaps = ht.inline.api.group_statistics(
+            geo,
+            hou.geometryType.Primitives
+        )
+
+        self.assertEqual(sizes.tolist(), [2, 2])
+        self.assertEqual(overlaps.tolist(), [[2, 0], [0, 2]])
+
+        result = ht.inline.api.group_statistics(
+            geo,
+            hou.geometryType.Primitives,
+            overlaps=False
+        )
+
+        self.assertIsNone(result[3])
+
+    def test_group_statistics_invalid(self):
+        geo = hou.Geometry()
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.group_statistics(geo, hou.geometryType.Vertices)
+
     def test_convert_prim_to_point_group(self):
         geo = get_obj_geo_copy("test_convert_prim_to_point_group")
 
@@ -1616,6 +2252,23 @@ class TestInlineCpp(unittest.TestCase):
 
         self.assertEqual(values, target)
 
+    def test_get_multiparm_columns(self):
+        node = OBJ.node("test_get_multiparm_instance_values/null1")
+
+        target = OrderedDict(
+            (
+                ("foo#", (1, 5)),
+                ("bar#", ((2.0, 3.0, 4.0), (6.0, 7.0, 8.0))),
+                ("hello#", ("foo", "bar")),
+            )
+        )
+
+        parm_tuple = node.parmTuple("things")
+
+        columns = ht.inline.api.get_multiparm_columns(parm_tuple)
+
+        self.assertEqual(columns, target)
+
     # =========================================================================
     # NODES AND NODE TYPES
     # =========================================================================
@@ -1723,6 +2376,33 @@ class TestInlineCpp(unittest.TestCase):
 
         self.assertTrue(ht.inline.api.vector_contains_nans(vec))
 
+    def test_vector_components_along(self):
+        vectors = numpy.array([(1, 2, 3), (4, 5, 6)], dtype=float)
+
+        result = ht.inline.api.vector_components_along(vectors, (0, 0, 15))
+
+        self.assertEqual(result.tolist(), [3.0, 6.0])
+
+    def test_vector_projections_along(self):
+        v3 = hou.Vector3(-1.3, 0.5, 7.6)
+        target = hou.Vector3(2.87, 3.1, -0.5)
+
+        result = ht.inline.api.vector_projections_along([v3], [target])
+
+        proj = ht.inline.api.vector_project_along(v3, target)
+
+        self.assertTrue(numpy.allclose(result[0], proj))
+
+        with self.assertRaises(hou.OperationFailed):
+            ht.inline.api.vector_projections_along([v3], [(0, 0, 0)])
+
+    def test_vectors_contain_nans(self):
+        nan = float('nan')
+
+        result = ht.inline.api.vectors_contain_nans([(6.5, 1, nan), (1, 2, 3)])
+
+        self.assertEqual(result.tolist(), [True, False])
+
     def test_get_vector_dual(self):
         target = hou.Matrix3(((0, -3, 2), (3, 0, -1), (-2, 1, 0)))
 
@@ -1855,6 +2535,76 @@ class TestInlineCpp(unittest.TestCase):
 
         self.assertEqual(mat, target)
 
+    def test_build_lookat_matrices(self):
+        target = ht.inline.api.build_lookat_matrix(
+            hou.Vector3(0, 0, 1),
+            hou.Vector3(1, 0, 0),
+            hou.Vector3(0, 1, 0)
+        )
+
+        result = ht.inline.api.build_lookat_matrices(
+            [(0, 0, 1)],
+            [(1, 0, 0)],
+            (0, 1, 0)
+        )
+
+        self.assertTrue(numpy.allclose(result[0], target.asTupleOfTuples()))
+
+    def test_build_instance_matrices(self):
+        positions = numpy.array([(-1, 2, 4), (1, 0, 0)], dtype=float)
+        directions = numpy.array([(1, 1, 1), (0, 1, 0)], dtype=float)
+
+        result = ht.inline.api.build_instance_matrices(
+            positions,
+            directions,
+            pscales=numpy.array([1.5, 2]),
+            up_vectors=(1, 1, -1)
+        )
+
+        self.assertEqual(result.shape, (2, 4, 4))
+
+        for idx in range(2):
+            target = ht.inline.api.build_instance_matrix(
+                hou.Vector3(positions[idx]),
+                hou.Vector3(directions[idx]),
+                pscale=[1.5, 2][idx],
+                up_vector=hou.Vector3(1, 1, -1)
+            )
+
+            self.assertTrue(
+                numpy.allclose(result[idx], target.asTupleOfTuples())
+            )
+
+    def test_build_instance_matricesOrient(self):
+        orient = hou.Quaternion(0.3, -1.7, -0.9, -2.7)
+
+        target = ht.inline.api.build_instance_matrix(
+            hou.Vector3(-1, 2, 4),
+            orient=orient,
+            rot=hou.Quaternion(0, 0, 0.7071068, 0.7071068),
+            pivot=hou.Vector3(1, 0, 0)
+        )
+
+        result = ht.inline.api.build_instance_matrices(
+            [(-1, 2, 4)],
+            orients=[tuple(orient)],
+            rots=(0, 0, 0.7071068, 0.7071068),
+            pivots=(1, 0, 0)
+        )
+
+        self.assertTrue(numpy.allclose(result[0], target.asTupleOfTuples()))
+
+    def test_build_instance_matricesZeroUp(self):
+        result = ht.inline.api.build_instance_matrices(
+            [(0, 0, 0), (0, 0, 0)],
+            [(1, 0, 0), (0, 0, -1)],
+            up_vectors=(0, 0, 0)
+        )
+
+        # The +Z axis is rotated onto each direction.
+        self.assertTrue(numpy.allclose(result[0, 2, :3], (1, 0, 0)))
+        self.assertTrue(numpy.allclose(result[1, 2, :3], (0, 0, -1)))
+
     # =========================================================================
     # DIGITAL ASSETS
     # =========================================================================
@@ -1905,6 +2655,26 @@ class TestInlineCpp(unittest.TestCase):
 
         self.assertEqual(ht.inline.api.asset_file_meta_source(path), target)
 
+    def test_get_hda_library_index(self):
+        path = hou.expandString("$HH/otls/OPlibSop.hda")
+
+        index = ht.inline.api.get_hda_library_index()
+
+        self.assertIs(ht.inline.api.get_hda_library_index(), index)
+
+        self.assertTrue(path in index.library_paths)
+        self.assertEqual(index.meta_source(path), "Scanned Asset Library Directories")
+        self.assertTrue(path in index.libraries_in_meta_source("Scanned Asset Library Directories"))
+
+        definition = hou.nodeType(hou.sopNodeTypeCategory(), "explodedview").definition()
+
+        self.assertTrue(("Sop", "explodedview") in index.definitions(path))
+        self.assertFalse(index.is_dummy_definition(path, "Sop", "explodedview"))
+        self.assertEqual(index.definition_mod_time(path, "Sop", "explodedview"), definition.modificationTime())
+
+        self.assertIsNone(index.meta_source("/invalid/path.hda"))
+        self.assertEqual(index.definitions("/invalid/path.hda"), ())
+
     def test_get_definition_meta_source(self):
         target = "Scanned Asset Library Directories"
 
@@ -1939,6 +2709,68 @@ class TestInlineCpp(unittest.TestCase):
         # Destroy the dummy definition.
         node_type.definition().destroy()
 
+class TestInlineProfiling(unittest.TestCase):
+    """Test profiling calls to the C++ functions."""
+
+    def tearDown(self):
+        ht.inline.profiling.disable_profiling()
+        ht.inline.profiling.reset_call_stats()
+
+    def test_profile_calls(self):
+        with ht.inline.profiling.profile_calls():
+            self.assertTrue(ht.inline.profiling.is_profiling_enabled())
+
+            ht.inline.api.is_rendering()
+            ht.inline.api.expand_range("0-4")
+
+        self.assertFalse(ht.inline.profiling.is_profiling_enabled())
+
+        report = ht.inline.profiling.get_report()
+
+        self.assertEqual(report["isRendering"]["run_count"], 1)
+        self.assertEqual(report["expandRange"]["total_elements"], 5)
+
+    def test_disabled(self):
+        ht.inline.profiling.reset_call_stats()
+
+        ht.inline.api.is_rendering()
+
+        report = ht.inline.profiling.get_report()
+
+        self.assertEqual(report.get("isRendering", {}).get("run_count", 0), 0)
+
+    def test_failed_call(self):
+        def raise_error(*args):
+            raise hou.OperationFailed()
+
+        wrapper = ht.inline.profiling._wrap_function("raiseError", raise_error)
+
+        with self.assertRaises(hou.OperationFailed):
+            wrapper(1)
+
+        report = ht.inline.profiling.get_report()
+
+        self.assertEqual(report["raiseError"]["run_count"], 1)
+
+    def test_pointer_element_count(self):
+        values = numpy.zeros(10, dtype=numpy.int32)
+        pointer = ht.inline.api._get_numpy_pointer(values, ctypes.c_int)
+
+        count = ht.inline.profiling._get_element_count((2, pointer, 10), None)
+
+        self.assertEqual(count, 10)
+
+    def test_durations_bounded(self):
+        stats = ht.inline.profiling.InlineCallStats("testDurations")
+
+        num_durations = ht.inline.profiling._MAX_DURATIONS
+
+        for _ in range(num_durations + 10):
+            stats.record_call(0.1, 0)
+
+        self.assertEqual(stats.run_count, num_durations + 10)
+        self.assertEqual(len(stats.durations), num_durations)
+
 # =============================================================================
 # FUNCTIONS
 # =============================================================================